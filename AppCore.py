@@ -1,21 +1,102 @@
-from GraphEngine import GraphEngine
-from WeightNormalizer import WeightNormalizer
-from Recommendation import Recommendation  
-from UIDisplay import UIDisplay 
-
-
-class AppCore:
-    def __init__(self):
-        self.normalizer = WeightNormalizer()
-        self.graph_engine = GraphEngine(self.normalizer)
-        self.recommender = None
-        self.ui = UIDisplay()
-
-    def run(self, user_interactions: dict, login_user: str):
-        # user_interactions
-        graph = self.graph_engine.build_graph(user_interactions)
-        self.recommender = Recommendation(graph)
-
-        results = self.recommender.weighted_bfs(login_user)
-
-        self.ui.show_recommendations(login_user, results)
\ No newline at end of file
+import argparse
+import os
+
+from GraphEngine import GraphEngine
+from WeightNormalizer import WeightNormalizer
+from Recommendation import Recommendation
+from UIDisplay import UIDisplay
+
+STRATEGIES = ("tiered", "bfs", "ppr", "ppr_mc")
+
+
+class AppCore:
+    def __init__(self, product_manager, store=None, top_n: int = 10, strategy: str = "tiered", **bfs_options):
+        """
+        store: RecommendationStore (tuỳ chọn) - đề xuất tính sẵn, tra cứu O(1) lúc đăng nhập;
+               chỉ tính trực tiếp cho user chưa có trong kho hoặc đã dirty
+        strategy: "tiered" - get_recommendations (WARM / COLLAB / DISCOVERY, dùng được store)
+                  "bfs"    - weighted_bfs: duyệt đồ thị nhiều bước, luôn tính trực tiếp
+                  "ppr" / "ppr_mc" - Personalized PageRank, luôn tính trực tiếp
+        bfs_options: max_hops, max_frontier, max_fanout, min_score cho weighted_bfs
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy phải là một trong {STRATEGIES}")
+        self.normalizer = WeightNormalizer()
+        self.graph_engine = GraphEngine(self.normalizer)
+        self.product_manager = product_manager
+        self.store = store
+        self.top_n = top_n
+        self.strategy = strategy
+        self.bfs_options = bfs_options
+        self.recommender = None
+        self.ui = UIDisplay()
+
+    def run(self, user_interactions: dict, login_user: str):
+        # Giống BatchRecommender: không đề xuất lại sản phẩm đã mua
+        purchased = {p for p, t in user_interactions.get(login_user, []) if t == "purchase"}
+
+        if self.strategy == "bfs":
+            self._build_recommender(user_interactions)
+            results = self.recommender.weighted_bfs(login_user, self.top_n, purchased, **self.bfs_options)
+            self.ui.show_recommendations(login_user, results)
+            return
+
+        # Kho tính sẵn chỉ chứa kết quả của pipeline 3 tầng
+        store = self.store if self.strategy == "tiered" else None
+        results = store.get(login_user) if store is not None else None
+
+        if results is None:
+            # Fallback: tính trực tiếp rồi lưu lại vào kho cho lần đăng nhập sau
+            self._build_recommender(user_interactions)
+            results = self.recommender.get_recommendations(login_user, self.top_n, purchased, self.strategy)
+            if store is not None:
+                store.put(login_user, results)
+
+        self.ui.show_recommendations(login_user, [(product, score) for product, score, _ in results])
+
+    def _build_recommender(self, user_interactions: dict):
+        graph = self.graph_engine.build_graph(user_interactions, verbose=False)
+        self.recommender = Recommendation(graph, self.product_manager, verbose=False)
+
+
+def main():
+    from DataAccess import DataAccess
+    from ProductManager import ProductManager
+    from InteractionTracker import InteractionTracker
+    from RecommendationStore import RecommendationStore, RECOMMENDATION_FILE
+
+    parser = argparse.ArgumentParser(description="Hiển thị đề xuất cho 1 user khi đăng nhập")
+    parser.add_argument("user", help="username")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="bfs", help="thuật toán đề xuất")
+    parser.add_argument("--top-n", type=int, default=10, help="số đề xuất")
+    parser.add_argument("--store", default=RECOMMENDATION_FILE, help="file JSONL tính sẵn (strategy tiered)")
+    parser.add_argument("--max-hops", type=int, default=3, help="số bước duyệt tối đa (bfs)")
+    parser.add_argument("--max-frontier", type=int, default=2000, help="số node tối đa trong hàng đợi (bfs)")
+    parser.add_argument("--max-fanout", type=int, default=200, help="số cạnh tối đa đi ra từ 1 node (bfs)")
+    parser.add_argument("--min-score", type=float, default=1e-6, help="ngưỡng điểm dừng sớm (bfs)")
+    args = parser.parse_args()
+
+    product_manager = ProductManager(DataAccess().load_products())
+    tracker = InteractionTracker(refresh="manual")
+    try:
+        user_interactions = tracker.get_all_interactions_for_recommendation()
+        store = None
+        if args.strategy == "tiered" and os.path.exists(args.store):
+            # Nạp khi tracker còn mở → users có tương tác sau lần materialize bị đánh dấu dirty
+            store = RecommendationStore.attach(tracker, args.store)
+    finally:
+        tracker.close()
+
+    if args.strategy == "bfs":
+        app = AppCore(
+            product_manager, top_n=args.top_n, strategy="bfs",
+            max_hops=args.max_hops, max_frontier=args.max_frontier,
+            max_fanout=args.max_fanout, min_score=args.min_score
+        )
+    else:
+        app = AppCore(product_manager, store, top_n=args.top_n, strategy=args.strategy)
+    app.run(user_interactions, args.user)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+
+from SparseGraph import SparseGraph
+from WeightNormalizer import WeightNormalizer
+from Recommendation import Recommendation
+from UserProfileStore import UserProfileStore
+from RecommendationStore import interaction_fingerprint
+
+# Trạng thái dùng chung cho worker: gán TRƯỚC khi tạo pool.
+# Với fork, tiến trình con kế thừa nguyên vùng nhớ (copy-on-write) → không pickle đồ thị;
+# mảng CSR của SparseGraph chỉ được đọc nên các trang nhớ không bị sao chép.
+_STATE: Dict = {}
+
+
+def _init_worker(
+    graph: SparseGraph,
+    product_manager,
+    purchased: Dict[str, Set[str]],
+    top_n: int,
+    fingerprints: Dict[str, str]
+):
+    """Khởi tạo worker (dùng trực tiếp khi fork, hoặc làm initializer khi spawn)"""
+    profiles = UserProfileStore(product_manager)
+    profiles.rebuild(graph.as_graph_data())
+    _STATE['recommender'] = Recommendation(graph, product_manager, profiles, verbose=False)
+    _STATE['product_manager'] = product_manager
+    _STATE['purchased'] = purchased
+    _STATE['top_n'] = top_n
+    _STATE['fingerprints'] = fingerprints
+
+
+def _recommend_chunk(usernames: List[str]) -> List[str]:
+    """Đề xuất cho 1 nhóm users → các dòng JSONL đã encode"""
+    recommender = _STATE['recommender']
+    product_manager = _STATE['product_manager']
+    purchased = _STATE['purchased']
+    top_n = _STATE['top_n']
+    fingerprints = _STATE['fingerprints']
+
+    lines = []
+    for username in usernames:
+        results = recommender.get_recommendations(username, top_n, purchased.get(username, set()))
+        items = []
+        for product_name, score, source in results:
+            product = product_manager.get_product_by_name(product_name)
+            items.append({
+                "product_id": product.id if product else None,
+                "product_name": product_name,
+                "score": float(score),
+                "source": source,
+            })
+        row = {"username": username, "fingerprint": fingerprints.get(username), "recommendations": items}
+        lines.append(json.dumps(row, ensure_ascii=False))
+    return lines
+
+
+class BatchRecommender:
+    """
+    Sinh đề xuất cho TẤT CẢ users (chạy đêm cho email / push).
+
+    - Dựng đồ thị 1 lần dạng SparseGraph (mảng CSR, chỉ đọc)
+    - Chia users thành từng nhóm (chunk), phân cho process pool
+      (fork → chia sẻ đồ thị copy-on-write; nền tảng không có fork → mỗi worker nhận 1 bản)
+    - Ghi kết quả dạng stream ra file JSONL (1 dòng / user), không giữ hết trong RAM
+    - Báo cáo users/giây
+    """
+
+    def __init__(
+        self,
+        product_manager,
+        user_interactions: Dict[str, List[Tuple[str, str]]],
+        purchased: Optional[Dict[str, Set[str]]] = None,
+        top_n: int = 10
+    ):
+        """
+        user_interactions: {username: [(product_name, interaction_type)]}
+        purchased: {username: {product_name}} - sản phẩm đã mua sẽ không được đề xuất lại
+        """
+        self.product_manager = product_manager
+        self.user_interactions = user_interactions
+        self.purchased = purchased or {}
+        self.top_n = top_n
+        self.graph = SparseGraph.from_interactions(WeightNormalizer(), user_interactions)
+
+    @classmethod
+    def from_tracker(cls, product_manager, tracker, top_n: int = 10) -> "BatchRecommender":
+        """Lấy tương tác + sản phẩm đã mua (bản ghi 'purchase') từ InteractionTracker"""
+        purchased: Dict[str, Set[str]] = {}
+        for username, records in tracker.get_all_interactions().items():
+            names = {name for _, name, _, _, itype in records if itype == "purchase"}
+            if names:
+                purchased[username] = names
+        return cls(product_manager, tracker.get_all_interactions_for_recommendation(), purchased, top_n)
+
+    @staticmethod
+    def _chunks(usernames: List[str], size: int) -> Iterator[List[str]]:
+        for start in range(0, len(usernames), size):
+            yield usernames[start:start + size]
+
+    def run(
+        self,
+        output_path: str,
+        users: Optional[Iterable[str]] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = 256
+    ) -> Dict[str, float]:
+        """
+        Args:
+            users: danh sách users cần đề xuất (mặc định: mọi user có tương tác)
+            workers: số process (None = số CPU, 1 = chạy trong process hiện tại)
+
+        Returns:
+            {"users", "seconds", "users_per_sec", "workers"}
+        """
+        usernames = sorted(self.user_interactions if users is None else users)
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, (len(usernames) + chunk_size - 1) // chunk_size or 1))
+        # Dấu vân tay lịch sử tương tác → RecommendationStore biết user nào đã đổi sau lần chạy này
+        fingerprints = {
+            username: interaction_fingerprint(self.user_interactions.get(username, []))
+            for username in usernames
+        }
+        args = (self.graph, self.product_manager, self.purchased, self.top_n, fingerprints)
+
+        print(f"\n🚀 Batch đề xuất: {len(usernames)} users, {workers} worker(s), chunk {chunk_size}")
+        start = time.perf_counter()
+        done = 0
+
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            if workers == 1:
+                _init_worker(*args)
+                results = map(_recommend_chunk, self._chunks(usernames, chunk_size))
+                done = self._write(out, results, len(usernames), start)
+            else:
+                if "fork" in mp.get_all_start_methods():
+                    _init_worker(*args)
+                    pool = mp.get_context("fork").Pool(workers)
+                else:
+                    pool = mp.get_context("spawn").Pool(workers, initializer=_init_worker, initargs=args)
+                with pool:
+                    results = pool.imap_unordered(_recommend_chunk, self._chunks(usernames, chunk_size))
+                    done = self._write(out, results, len(usernames), start)
+        os.replace(tmp_path, output_path)
+        _STATE.clear()
+
+        elapsed = time.perf_counter() - start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        print(f"✅ Đã ghi {done} users vào {output_path} trong {elapsed:.2f}s ({rate:,.1f} users/giây)")
+        return {"users": done, "seconds": elapsed, "users_per_sec": rate, "workers": workers}
+
+    @staticmethod
+    def _write(out, results: Iterable[List[str]], total: int, start: float) -> int:
+        done = 0
+        for lines in results:
+            for line in lines:
+                out.write(line + "\n")
+            done += len(lines)
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed if elapsed > 0 else 0.0
+            print(f"   ⏳ {done}/{total} users ({rate:,.1f} users/giây)", end="\r")
+        if done:
+            print()
+        return done
+
+
+def main():
+    from DataAccess import DataAccess
+    from ProductManager import ProductManager
+    from InteractionTracker import InteractionTracker
+
+    parser = argparse.ArgumentParser(description="Sinh đề xuất cho mọi user ra file JSONL")
+    parser.add_argument("--output", default="recommendations.jsonl", help="file JSONL đầu ra")
+    parser.add_argument("--workers", type=int, default=None, help="số process (mặc định: số CPU)")
+    parser.add_argument("--top-n", type=int, default=10, help="số đề xuất mỗi user")
+    parser.add_argument("--chunk-size", type=int, default=256, help="số users mỗi lần giao cho worker")
+    args = parser.parse_args()
+
+    product_manager = ProductManager(DataAccess().load_products())
+    tracker = InteractionTracker(refresh="manual")
+    try:
+        batch = BatchRecommender.from_tracker(product_manager, tracker, top_n=args.top_n)
+    finally:
+        tracker.close()
+    batch.run(args.output, workers=args.workers, chunk_size=args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,187 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from SearchIndex import fold_text
+
+
+def _split(value) -> List[str]:
+    """'XXL,XL' → ['XXL', 'XL']"""
+    if value is None:
+        return []
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+class FacetIndex:
+    """
+    Lọc sản phẩm theo facet bằng bitmap.
+
+    - Mỗi sản phẩm có 1 số hàng (row); mỗi giá trị facet ↔ 1 bitset (int Python)
+      với bit `row` bật nếu sản phẩm có giá trị đó
+    - Facet: category, price (theo khoảng giá), size, color
+    - Lọc: OR các giá trị trong cùng facet, AND giữa các facet
+    - Đếm số sản phẩm mỗi giá trị trên tập kết quả: popcount(bitset & kết quả)
+    """
+
+    FACETS = ("category", "price", "size", "color")
+
+    # (nhãn, giá từ, giá đến) - nửa mở [từ, đến)
+    PRICE_BANDS = (
+        ("0-200k", 0, 200_000),
+        ("200k-500k", 200_000, 500_000),
+        ("500k-1tr", 500_000, 1_000_000),
+        ("1tr-2tr", 1_000_000, 2_000_000),
+        ("2tr+", 2_000_000, float("inf")),
+    )
+
+    def __init__(self, products=None):
+        self._bitmaps: Dict[str, Dict[str, int]] = {facet: {} for facet in self.FACETS}
+        self._row_of: Dict[str, int] = {}           # product_id → row
+        self._slots: Dict[str, int] = {}            # product_id → row đã cấp (kể cả đã xoá)
+        self._products: List = []                   # row → Product (None nếu đã xoá)
+        self._values: Dict[str, Dict[str, List[str]]] = {}  # product_id → giá trị đã index
+        self._alive = 0                             # bitset các row còn hiệu lực
+
+        for p in products or []:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    @classmethod
+    def price_band(cls, price) -> Optional[str]:
+        for label, low, high in cls.PRICE_BANDS:
+            if low <= price < high:
+                return label
+        return None
+
+    def _facet_values(self, product) -> Dict[str, List[str]]:
+        band = self.price_band(product.price)
+        return {
+            "category": [str(product.category)],
+            "price": [band] if band else [],
+            "size": _split(product.sizes),
+            "color": _split(product.colors),
+        }
+
+    def add(self, product):
+        """Thêm hoặc cập nhật 1 sản phẩm (id cũ dùng lại row cũ → giữ thứ tự)"""
+        if product.id in self._row_of:
+            self._clear(product.id)
+        row = self._slots.get(product.id)
+        if row is None:
+            row = len(self._products)
+            self._products.append(product)
+            self._slots[product.id] = row
+        self._products[row] = product
+        self._row_of[product.id] = row
+
+        bit = 1 << row
+        values = self._facet_values(product)
+        for facet, facet_values in values.items():
+            bitmaps = self._bitmaps[facet]
+            for value in facet_values:
+                bitmaps[value] = bitmaps.get(value, 0) | bit
+        self._values[product.id] = values
+        self._alive |= bit
+
+    def _clear(self, product_id: str):
+        bit = 1 << self._row_of[product_id]
+        for facet, facet_values in self._values.pop(product_id, {}).items():
+            bitmaps = self._bitmaps[facet]
+            for value in facet_values:
+                bitmaps[value] &= ~bit
+                if not bitmaps[value]:
+                    del bitmaps[value]
+        self._alive &= ~bit
+
+    def remove(self, product_id: str):
+        if product_id not in self._row_of:
+            return
+        self._clear(product_id)
+        self._products[self._row_of.pop(product_id)] = None
+
+    def update(self, product):
+        self.add(product)
+
+    def bits_of(self, products: Iterable) -> int:
+        """Bitset của 1 danh sách sản phẩm (vd: kết quả tìm kiếm)"""
+        bits = 0
+        for p in products:
+            row = self._row_of.get(p.id)
+            if row is not None:
+                bits |= 1 << row
+        return bits
+
+    def resolve(self, facet: str, text: str) -> List[str]:
+        """Ánh xạ chữ người dùng gõ (không dấu, không phân biệt hoa thường) → giá trị facet"""
+        wanted = fold_text(text).strip()
+        return [v for v in self._bitmaps.get(facet, {}) if fold_text(v) == wanted]
+
+    def match(self, filters: Dict[str, Iterable[str]], base: Optional[int] = None) -> int:
+        """Bitset các sản phẩm thoả mọi facet trong filters"""
+        result = self._alive if base is None else base & self._alive
+        for facet, values in filters.items():
+            bitmaps = self._bitmaps.get(facet)
+            if bitmaps is None:
+                raise ValueError(f"Facet không hợp lệ: {facet}")
+            values = list(values)
+            if not values:
+                continue
+            union = 0
+            for value in values:
+                union |= bitmaps.get(value, 0)
+            result &= union
+        return result
+
+    def counts(self, bits: int) -> Dict[str, Dict[str, int]]:
+        """Số sản phẩm theo từng giá trị facet trong tập `bits`"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for facet in self.FACETS:
+            facet_counts = []
+            for value, bitmap in self._bitmaps[facet].items():
+                n = _popcount(bitmap & bits)
+                if n:
+                    facet_counts.append((value, n))
+            # Khoảng giá theo thứ tự tăng dần, facet khác theo số lượng giảm dần
+            if facet == "price":
+                order = {label: i for i, (label, _, _) in enumerate(self.PRICE_BANDS)}
+                facet_counts.sort(key=lambda x: order[x[0]])
+            else:
+                facet_counts.sort(key=lambda x: -x[1])
+            counts[facet] = dict(facet_counts)
+        return counts
+
+    def products_of(self, bits: int) -> List:
+        """Sản phẩm theo thứ tự row (thứ tự thêm vào)"""
+        products = []
+        while bits:
+            low = bits & -bits
+            products.append(self._products[low.bit_length() - 1])
+            bits ^= low
+        return products
+
+    def filter(
+        self,
+        filters: Dict[str, Iterable[str]],
+        products: Optional[List] = None
+    ) -> Tuple[List, Dict[str, Dict[str, int]]]:
+        """
+        Lọc + đếm facet trên kết quả.
+
+        Args:
+            filters: {facet: [giá trị, ...]}
+            products: giới hạn trong danh sách này (giữ nguyên thứ tự của nó)
+
+        Returns:
+            (sản phẩm thoả điều kiện, {facet: {giá trị: số lượng}})
+        """
+        if products is None:
+            bits = self.match(filters)
+            results = self.products_of(bits)
+        else:
+            bits = self.match(filters, self.bits_of(products))
+            results = [p for p in products if p.id in self._row_of and bits >> self._row_of[p.id] & 1]
+        return results, self.counts(bits)
\ No newline at end of file
@@ -1,76 +1,254 @@
-from typing import Dict, List, Tuple, Set
-from collections import defaultdict
-from WeightNormalizer import WeightNormalizer
-
-
-class GraphEngine:    
-    def __init__(self, normalizer: WeightNormalizer):
-        self.normalizer = normalizer
-    
-    def build_graph(self, user_interactions: Dict[str, List[Tuple[str, str]]]) -> Dict:
-        user_to_products = defaultdict(lambda: defaultdict(float))
-        product_to_users = defaultdict(lambda: defaultdict(float))
-        all_users = set()
-        all_products = set()
-        
-        print(f"\n{'='*70}")
-        print(f"🔨 XÂY DỰNG ĐỒ THỊ (Cộng dồn trọng số)")
-        print(f"{'='*70}")
-        
-        for user, interactions in user_interactions.items():
-            all_users.add(user)
-            
-            product_interaction_count = defaultdict(int)
-            for product, _ in interactions:
-                product_interaction_count[product] += 1
-            
-            for product, interaction_type in interactions:
-                weight = self.normalizer.get_weight(interaction_type)
-                
-                user_to_products[user][product] += weight
-                product_to_users[product][user] += weight
-                
-                all_products.add(product)
-            
-            multi_interaction_products = {
-                p: count for p, count in product_interaction_count.items() 
-                if count > 1
-            }
-            
-            if multi_interaction_products:
-                print(f"\n📊 User '{user}': Phát hiện sản phẩm có nhiều tương tác:")
-                for product, count in multi_interaction_products.items():
-                    total_weight = user_to_products[user][product]
-                    print(f"   - '{product}': {count} tương tác → Tổng điểm: {total_weight:.3f}")
-        
-        user_to_products = {
-            user: dict(products) 
-            for user, products in user_to_products.items()
-        }
-        product_to_users = {
-            product: dict(users) 
-            for product, users in product_to_users.items()
-        }
-        
-        print(f"\n✅ Đã xây dựng đồ thị:")
-        print(f"   👤 Số users: {len(all_users)}")
-        print(f"   📦 Số products: {len(all_products)}")
-        print(f"   🔗 Số cạnh (user→product): {sum(len(v) for v in user_to_products.values())}")
-        
-        sample_users = list(all_users)[:3]
-        for user in sample_users:
-            products = user_to_products.get(user, {})
-            print(f"   📊 User '{user}': {len(products)} sản phẩm")
-            
-            top_products = sorted(products.items(), key=lambda x: x[1], reverse=True)[:3]
-            for product, weight in top_products:
-                print(f"      → '{product}': {weight:.3f}")
-        
-        print(f"{'='*70}\n")
-        
-        return {
-            'user_to_products': user_to_products,
-            'product_to_users': product_to_users,
-            'users': all_users,
-            'products': all_products
-        }
\ No newline at end of file
+from typing import Dict, List, Optional, Tuple, Set
+from collections import defaultdict
+import math
+from WeightNormalizer import WeightNormalizer
+
+
+class GraphEngine:    
+    def __init__(self, normalizer: WeightNormalizer):
+        self.normalizer = normalizer
+    
+    def build_graph(self, user_interactions: Dict[str, List[Tuple[str, str]]], verbose: bool = True) -> Dict:
+        user_to_products = defaultdict(lambda: defaultdict(float))
+        product_to_users = defaultdict(lambda: defaultdict(float))
+        all_users = set()
+        all_products = set()
+        
+        if verbose:
+            print(f"\n{'='*70}")
+            print(f"🔨 XÂY DỰNG ĐỒ THỊ (Cộng dồn trọng số)")
+            print(f"{'='*70}")
+        
+        for user, interactions in user_interactions.items():
+            all_users.add(user)
+            
+            product_interaction_count = defaultdict(int)
+            for product, _ in interactions:
+                product_interaction_count[product] += 1
+            
+            for product, interaction_type in interactions:
+                weight = self.normalizer.get_weight(interaction_type)
+                
+                user_to_products[user][product] += weight
+                product_to_users[product][user] += weight
+                
+                all_products.add(product)
+            
+            multi_interaction_products = {
+                p: count for p, count in product_interaction_count.items() 
+                if count > 1
+            }
+            
+            if verbose and multi_interaction_products:
+                print(f"\n📊 User '{user}': Phát hiện sản phẩm có nhiều tương tác:")
+                for product, count in multi_interaction_products.items():
+                    total_weight = user_to_products[user][product]
+                    print(f"   - '{product}': {count} tương tác → Tổng điểm: {total_weight:.3f}")
+        
+        user_to_products = {
+            user: dict(products) 
+            for user, products in user_to_products.items()
+        }
+        product_to_users = {
+            product: dict(users) 
+            for product, users in product_to_users.items()
+        }
+        
+        if verbose:
+            print(f"\n✅ Đã xây dựng đồ thị:")
+            print(f"   👤 Số users: {len(all_users)}")
+            print(f"   📦 Số products: {len(all_products)}")
+            print(f"   🔗 Số cạnh (user→product): {sum(len(v) for v in user_to_products.values())}")
+            
+            sample_users = list(all_users)[:3]
+            for user in sample_users:
+                products = user_to_products.get(user, {})
+                print(f"   📊 User '{user}': {len(products)} sản phẩm")
+                
+                top_products = sorted(products.items(), key=lambda x: x[1], reverse=True)[:3]
+                for product, weight in top_products:
+                    print(f"      → '{product}': {weight:.3f}")
+            
+            print(f"{'='*70}\n")
+        
+        return {
+            'user_to_products': user_to_products,
+            'product_to_users': product_to_users,
+            'users': all_users,
+            'products': all_products
+        }
+    
+    def build_sparse_graph(self, user_interactions: Dict[str, List[Tuple[str, str]]]):
+        """Dựng đồ thị dạng gọn (CSR + id int) - xem SparseGraph"""
+        from SparseGraph import SparseGraph
+        return SparseGraph.from_interactions(self.normalizer, user_interactions)
+
+
+class InteractionGraph:
+    """
+    Đồ thị user-product sống lâu, cập nhật theo từng sự kiện thay vì
+    build_graph() lại toàn bộ ở mỗi lần đề xuất.
+    
+    - apply_interaction / retract_interaction: cộng / trừ 1 tương tác, O(1)
+    - Đăng ký làm listener của InteractionTracker để tự cập nhật khi có sự kiện
+    - as_graph_data(): cùng cấu trúc với GraphEngine.build_graph(), dùng chung
+      các dict sống (không copy) → Recommendation luôn thấy dữ liệu mới nhất
+    - Listener của đồ thị nhận on_edge_changed(user, product, old, new) mỗi khi
+      trọng số 1 cạnh đổi (None = cạnh chưa có / đã bị xoá) và on_graph_reset(graph)
+    """
+    
+    def __init__(self, normalizer: WeightNormalizer):
+        self.normalizer = normalizer
+        self.user_to_products: Dict[str, Dict[str, float]] = {}
+        self.product_to_users: Dict[str, Dict[str, float]] = {}
+        self.users: Set[str] = set()
+        self.products: Set[str] = set()
+        
+        # (user, product) → {interaction_type: số lần}; trọng số cạnh tính lại từ đây
+        # để trừ đi không bị sai số dồn
+        self._edge_types: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._listeners: List = []
+    
+    @classmethod
+    def from_interactions(
+        cls,
+        normalizer: WeightNormalizer,
+        user_interactions: Dict[str, List[Tuple[str, str]]]
+    ) -> "InteractionGraph":
+        graph = cls(normalizer)
+        graph.load(user_interactions)
+        return graph
+    
+    def load(self, user_interactions: Dict[str, List[Tuple[str, str]]]):
+        """Dựng lại toàn bộ (giữ nguyên các dict để các tham chiếu cũ vẫn dùng được)"""
+        self.user_to_products.clear()
+        self.product_to_users.clear()
+        self.users.clear()
+        self.products.clear()
+        self._edge_types.clear()
+        
+        for user, interactions in user_interactions.items():
+            for product, interaction_type in interactions:
+                self.apply_interaction(user, product, interaction_type, notify=False)
+        
+        for listener in list(self._listeners):
+            listener.on_graph_reset(self)
+    
+    def add_listener(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify_edge(self, user: str, product: str, old: Optional[float], new: Optional[float]):
+        for listener in list(self._listeners):
+            listener.on_edge_changed(user, product, old, new)
+    
+    def as_graph_data(self) -> Dict:
+        return {
+            'user_to_products': self.user_to_products,
+            'product_to_users': self.product_to_users,
+            'users': self.users,
+            'products': self.products
+        }
+    
+    def apply_interaction(self, user: str, product: str, interaction_type: str, notify: bool = True):
+        types = self._edge_types.setdefault((user, product), {})
+        types[interaction_type] = types.get(interaction_type, 0) + 1
+        
+        old = self.user_to_products.get(user, {}).get(product)
+        weight = self._edge_weight(types)
+        self.user_to_products.setdefault(user, {})[product] = weight
+        self.product_to_users.setdefault(product, {})[user] = weight
+        self.users.add(user)
+        self.products.add(product)
+        
+        if notify:
+            self._notify_edge(user, product, old, weight)
+    
+    def retract_interaction(self, user: str, product: str, interaction_type: str):
+        key = (user, product)
+        types = self._edge_types.get(key)
+        if not types or interaction_type not in types:
+            return
+        
+        types[interaction_type] -= 1
+        if types[interaction_type] == 0:
+            del types[interaction_type]
+        
+        old = self.user_to_products[user][product]
+        if types:
+            weight = self._edge_weight(types)
+            self.user_to_products[user][product] = weight
+            self.product_to_users[product][user] = weight
+            self._notify_edge(user, product, old, weight)
+            return
+        
+        # Không còn tương tác nào → xoá cạnh (và đỉnh nếu không còn cạnh)
+        del self._edge_types[key]
+        del self.user_to_products[user][product]
+        del self.product_to_users[product][user]
+        if not self.user_to_products[user]:
+            del self.user_to_products[user]
+            self.users.discard(user)
+        if not self.product_to_users[product]:
+            del self.product_to_users[product]
+            self.products.discard(product)
+        
+        self._notify_edge(user, product, old, None)
+    
+    def _edge_weight(self, types: Dict[str, int]) -> float:
+        return sum(self.normalizer.get_weight(t) * count for t, count in types.items())
+    
+    # ===== Listener của InteractionTracker =====
+    
+    def on_interaction_added(self, username: str, record: Tuple[str, str, int, str, str]):
+        _, product_name, _, _, interaction_type = record
+        self.apply_interaction(username, product_name, interaction_type)
+    
+    def on_interaction_removed(self, username: str, record: Tuple[str, str, int, str, str]):
+        _, product_name, _, _, interaction_type = record
+        self.retract_interaction(username, product_name, interaction_type)
+    
+    def on_interactions_reloaded(self, tracker):
+        self.load(tracker.get_all_interactions_for_recommendation())
+    
+    # ===== Kiểm tra =====
+    
+    def check_consistency(
+        self,
+        user_interactions: Dict[str, List[Tuple[str, str]]],
+        tolerance: float = 1e-9
+    ) -> List[str]:
+        """
+        So sánh với build_graph() dựng lại từ đầu.
+        
+        Returns:
+            Danh sách khác biệt (rỗng = nhất quán)
+        """
+        expected = GraphEngine(self.normalizer).build_graph(user_interactions, verbose=False)
+        problems = []
+        
+        for name, actual_map, expected_map in (
+            ('user_to_products', self.user_to_products, expected['user_to_products']),
+            ('product_to_users', self.product_to_users, expected['product_to_users']),
+        ):
+            for key in set(actual_map) | set(expected_map):
+                actual_edges = actual_map.get(key, {})
+                expected_edges = expected_map.get(key, {})
+                for other in set(actual_edges) | set(expected_edges):
+                    if other not in actual_edges or other not in expected_edges:
+                        problems.append(f"{name}[{key!r}][{other!r}]: thiếu ở một phía")
+                    elif not math.isclose(actual_edges[other], expected_edges[other],
+                                          rel_tol=tolerance, abs_tol=tolerance):
+                        problems.append(
+                            f"{name}[{key!r}][{other!r}]: "
+                            f"{actual_edges[other]} != {expected_edges[other]}"
+                        )
+        
+        if self.products != expected['products']:
+            problems.append("Tập products khác nhau")
+        
+        return problems
@@ -0,0 +1,161 @@
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+import heapq
+import time
+
+
+class WeightedBFS:
+    """
+    Duyệt đồ thị 2 phía user ↔ product theo kiểu best-first (ưu tiên điểm cao).
+
+    - Điểm đường đi = tích xác suất chuyển của từng cạnh:
+          P(x → y) = w(x,y) / Σ_z w(x,z)
+      (giống 1 bước random walk → điểm luôn ≤ 1 và giảm dần theo số bước)
+    - Hàng đợi ưu tiên: luôn mở rộng node có điểm cao nhất trước,
+      mỗi node chỉ mở rộng 1 lần (với điểm tốt nhất)
+    - Sản phẩm ứng viên cộng dồn điểm từ MỌI user đã mở rộng dẫn tới nó
+
+    Giới hạn để độ trễ không phụ thuộc độ dày của đồ thị:
+    - max_hops: số bước tối đa tính từ user (3 = user → sp → user → sp)
+    - max_frontier: số node giữ lại khi hàng đợi vượt 2×max_frontier
+      (cắt bớt node điểm thấp, chi phí cắt được chia đều)
+    - max_fanout: mỗi node chỉ đi theo max_fanout cạnh nặng nhất
+      (sản phẩm "hub" có hàng nghìn users không làm nổ hàng đợi)
+    - min_score: không đi tiếp theo đường có điểm < ngưỡng; vì điểm chỉ giảm
+      theo từng bước nên cả nhánh phía sau bị cắt (dừng sớm)
+
+    Danh sách cạnh đã chuẩn hoá (tổng trọng số + top max_fanout) của mỗi node được
+    cache: hub chỉ tốn O(bậc) ở lần đầu được mở rộng, các lần sau O(max_fanout).
+    Dùng lâu dài trên đồ thị sống → attach(graph): là listener của InteractionGraph,
+    cạnh (u, p) đổi chỉ xoá cache của u và p
+    """
+
+    def __init__(
+        self,
+        user_to_products: Mapping[str, Mapping[str, float]],
+        product_to_users: Mapping[str, Mapping[str, float]],
+        max_hops: int = 3,
+        max_frontier: int = 2000,
+        max_fanout: int = 200,
+        min_score: float = 1e-6
+    ):
+        self.user_to_products = user_to_products
+        self.product_to_users = product_to_users
+        self.max_hops = max_hops
+        self.max_frontier = max_frontier
+        self.max_fanout = max_fanout
+        self.min_score = min_score
+        self.last_stats: Dict = {}
+
+        # (là user?, node) → [(hàng xóm, xác suất chuyển)] của max_fanout cạnh nặng nhất
+        self._edge_cache: Dict[Tuple[bool, str], List[Tuple[str, float]]] = {}
+
+    @classmethod
+    def attach(cls, graph, **options) -> "WeightedBFS":
+        """Dựng trên các dict sống của InteractionGraph và đăng ký nhận cập nhật"""
+        graph_data = graph.as_graph_data()
+        traversal = cls(graph_data['user_to_products'], graph_data['product_to_users'], **options)
+        graph.add_listener(traversal)
+        return traversal
+
+    def _edges(self, node: str, is_user: bool) -> List[Tuple[str, float]]:
+        """max_fanout cạnh nặng nhất của node, trọng số đã chuẩn hoá thành xác suất chuyển"""
+        key = (is_user, node)
+        edges = self._edge_cache.get(key)
+        if edges is not None:
+            return edges
+
+        adjacency = self.user_to_products if is_user else self.product_to_users
+        neighbours = adjacency.get(node)
+        if not neighbours:
+            return []
+
+        items = list(neighbours.items())
+        total = sum(weight for _, weight in items)
+        if total <= 0:
+            return []
+        if len(items) > self.max_fanout:
+            items = heapq.nlargest(self.max_fanout, items, key=lambda x: (x[1], x[0]))
+        edges = [(name, weight / total) for name, weight in items]
+        self._edge_cache[key] = edges
+        return edges
+
+    def _trim(self, heap: List, max_frontier: int) -> List:
+        """Giữ lại max_frontier node điểm cao nhất trong hàng đợi"""
+        heap = heapq.nsmallest(max_frontier, heap)
+        heapq.heapify(heap)
+        return heap
+
+    def run(
+        self,
+        username: str,
+        top_n: int = 10,
+        exclude: Optional[Set[str]] = None,
+        max_hops: Optional[int] = None,
+        max_frontier: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        max_hops / max_frontier / min_score: ghi đè giá trị của instance cho lần chạy này
+        (max_fanout cố định theo instance vì cache cạnh phụ thuộc vào nó)
+
+        Returns:
+            List[(product_name, score)] - sắp xếp theo điểm giảm dần
+        Thống kê lần chạy (số node đã mở rộng, lý do dừng, thời gian) ở self.last_stats
+        """
+        start = time.perf_counter()
+        exclude = exclude or set()
+        max_hops = self.max_hops if max_hops is None else max_hops
+        max_frontier = self.max_frontier if max_frontier is None else max_frontier
+        min_score = self.min_score if min_score is None else min_score
+        stats = {"expanded": 0, "pushed": 0, "pruned": 0, "trimmed": 0, "candidates": 0}
+
+        if username not in self.user_to_products:
+            stats["ms"] = (time.perf_counter() - start) * 1000
+            self.last_stats = stats
+            return []
+
+        # Hàng đợi: (-điểm, số bước, là user?, tên) - heapq là min-heap nên lưu điểm âm
+        heap = [(-1.0, 0, True, username)]
+        expanded: Set[Tuple[bool, str]] = set()
+        candidate_scores: Dict[str, float] = {}
+
+        while heap:
+            neg_score, hops, is_user, node = heapq.heappop(heap)
+            if (is_user, node) in expanded:
+                continue
+            expanded.add((is_user, node))
+            stats["expanded"] += 1
+            score = -neg_score
+            # Node ở bước cuối chỉ cộng điểm ứng viên, không cần vào hàng đợi
+            push = hops + 1 < max_hops
+
+            for neighbour, probability in self._edges(node, is_user):
+                next_score = score * probability
+                if next_score < min_score:
+                    stats["pruned"] += 1
+                    continue
+                if is_user and hops > 0 and neighbour not in exclude:
+                    candidate_scores[neighbour] = candidate_scores.get(neighbour, 0.0) + next_score
+                if push and (not is_user, neighbour) not in expanded:
+                    heapq.heappush(heap, (-next_score, hops + 1, not is_user, neighbour))
+                    stats["pushed"] += 1
+
+            if len(heap) > 2 * max_frontier:
+                stats["trimmed"] += len(heap) - max_frontier
+                heap = self._trim(heap, max_frontier)
+
+        ranked = sorted(candidate_scores.items(), key=lambda x: (-x[1], x[0]))[:top_n]
+        stats["candidates"] = len(candidate_scores)
+        stats["ms"] = (time.perf_counter() - start) * 1000
+        self.last_stats = stats
+        return ranked
+
+    # ===== Listener của InteractionGraph =====
+
+    def on_edge_changed(self, user: str, product: str, old: Optional[float], new: Optional[float]):
+        # Trọng số (u, p) đổi → tổng và top cạnh của đúng 2 đầu mút đổi
+        self._edge_cache.pop((True, user), None)
+        self._edge_cache.pop((False, product), None)
+
+    def on_graph_reset(self, graph):
+        self._edge_cache.clear()
@@ -0,0 +1,281 @@
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+import json
+import os
+import time
+
+import numpy as np
+
+from SparseGraph import SparseGraph
+
+ALS_MODEL_DIR = "als_model"
+
+
+class ImplicitALS:
+    """
+    Matrix factorization cho implicit feedback (ALS - Hu, Koren & Volinsky 2008), chỉ dùng NumPy.
+
+    - Ma trận đầu vào: trọng số cạnh user×product của SparseGraph (đã qua WeightNormalizer)
+          preference p(u,i) = 1 nếu w(u,i) > 0
+          confidence c(u,i) = 1 + alpha × w(u,i)
+    - Luân phiên giải bình phương tối thiểu cho user / product embeddings:
+          x_u = (YᵀY + Yᵀ(C_u − I)Y + λI)⁻¹ Yᵀ C_u p_u
+      YᵀY tính 1 lần mỗi nửa vòng, phần còn lại chỉ duyệt các cạnh của user
+      → giải theo lô bằng np.linalg.solve (nhiều hệ f×f cùng lúc)
+    - Phục vụ: điểm = item_factors @ x_u, lấy top-k bằng argpartition
+    - Lưu embeddings ra thư mục .npy → load lại bằng memory map (không đọc hết vào RAM)
+    - User có tương tác mới sau lần train (hoặc chưa từng train): fold-in
+      = giải 1 hệ f×f với product embeddings cố định, không cần train lại
+    - Là listener của InteractionTracker: đánh dấu user cần fold-in
+    """
+
+    def __init__(
+        self,
+        factors: int = 32,
+        regularization: float = 0.1,
+        alpha: float = 40.0,
+        iterations: int = 15,
+        seed: int = 0
+    ):
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.seed = seed
+
+        self.user_factors = np.zeros((0, factors), dtype=np.float32)
+        self.item_factors = np.zeros((0, factors), dtype=np.float32)
+        self.user_ids: Dict[str, int] = {}
+        self.product_names: List[str] = []
+        self.product_ids: Dict[str, int] = {}
+
+        self._stale: Set[str] = set()          # users có tương tác mới từ lần train
+        self._yty: Optional[np.ndarray] = None  # YᵀY của item_factors (dùng cho fold-in)
+
+    # ===== Train =====
+
+    def _solve(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        data: np.ndarray,
+        fixed: np.ndarray,
+        max_block_cells: int = 65536
+    ) -> np.ndarray:
+        """
+        1 nửa vòng ALS: giải embeddings cho mọi hàng của CSR (indptr, indices, data) với `fixed` cố định.
+
+        Hàng được xếp theo số cạnh rồi chia lô; mỗi lô đệm về cùng độ dài D
+        (lô × D ≤ max_block_cells) → A_u, b_u của cả lô là 1 phép nhân ma trận theo lô.
+        """
+        n_rows = len(indptr) - 1
+        f = self.factors
+        base = fixed.T @ fixed + self.regularization * np.eye(f)
+        result = np.zeros((n_rows, f))
+
+        degrees = np.diff(indptr)
+        order = np.argsort(degrees, kind='stable')
+        order = order[degrees[order] > 0]          # hàng không có cạnh: x = 0
+        sorted_degrees = degrees[order]
+
+        start = 0
+        while start < len(order):
+            # Lô dài nhất sao cho (số hàng) × (số cạnh lớn nhất trong lô) ≤ max_block_cells
+            cells = np.arange(1, len(order) - start + 1) * sorted_degrees[start:]
+            size = max(1, int(np.searchsorted(cells, max_block_cells, side='right')))
+            rows = order[start:start + size]
+            width = int(sorted_degrees[start + size - 1])
+
+            lengths = degrees[rows]
+            positions = np.repeat(indptr[rows] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            row_of_edge = np.repeat(np.arange(size), lengths)
+            slot = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+            weights = data[positions]
+            padded = np.zeros((size, width, f))
+            padded[row_of_edge, slot] = fixed[indices[positions]]
+            confidence = np.zeros((size, width))       # c − 1
+            confidence[row_of_edge, slot] = self.alpha * weights
+            target = np.zeros((size, width))           # c · p
+            target[row_of_edge, slot] = (1.0 + self.alpha * weights) * (weights > 0)
+
+            # A_u = YᵀY + λI + Σ_i (c−1) y_i y_iᵀ ;  b_u = Σ_i c · p · y_i
+            A = base + np.matmul(padded.transpose(0, 2, 1) * confidence[:, None, :], padded)
+            b = np.matmul(target[:, None, :], padded)[:, 0, :]
+            result[rows] = np.linalg.solve(A, b[:, :, None])[:, :, 0]
+            start += size
+        return result
+
+    def fit(self, graph: SparseGraph, verbose: bool = True) -> "ImplicitALS":
+        rng = np.random.default_rng(self.seed)
+        users = rng.normal(0, 0.01, (graph.n_users, self.factors))
+        items = rng.normal(0, 0.01, (graph.n_products, self.factors))
+
+        if verbose:
+            print(f"\n🧮 Train ALS: {graph.n_users} users × {graph.n_products} products, "
+                  f"{graph.nnz} cạnh, {self.factors} chiều, {self.iterations} vòng")
+        start = time.perf_counter()
+        for iteration in range(1, self.iterations + 1):
+            users = self._solve(graph.up_indptr, graph.up_indices, graph.up_data, items)
+            items = self._solve(graph.pu_indptr, graph.pu_indices, graph.pu_data, users)
+            if verbose:
+                print(f"   ⏳ Vòng {iteration}/{self.iterations} ({time.perf_counter() - start:.1f}s)", end="\r")
+        if verbose:
+            print(f"\n✅ Train xong trong {time.perf_counter() - start:.2f}s")
+
+        self.user_factors = users.astype(np.float32)
+        self.item_factors = items.astype(np.float32)
+        self.user_ids = dict(graph.user_ids)
+        self.product_names = list(graph.product_names)
+        self.product_ids = dict(graph.product_ids)
+        self._stale.clear()
+        self._yty = None
+        return self
+
+    # ===== Fold-in + phục vụ =====
+
+    def fold_in(self, interactions: Mapping[str, float]) -> np.ndarray:
+        """Embedding cho 1 user từ {product_name: trọng số} (product chưa có trong model bị bỏ qua)"""
+        pairs = [(self.product_ids[p], w) for p, w in interactions.items() if p in self.product_ids]
+        if not pairs:
+            return np.zeros(self.factors, dtype=np.float32)
+
+        if self._yty is None:
+            items = np.asarray(self.item_factors, dtype=np.float64)
+            self._yty = items.T @ items
+        ids = np.array([i for i, _ in pairs])
+        weights = np.array([w for _, w in pairs], dtype=np.float64)
+        y = np.asarray(self.item_factors[ids], dtype=np.float64)
+        confidence = self.alpha * weights
+
+        A = self._yty + self.regularization * np.eye(self.factors) + (y.T * confidence) @ y
+        b = ((1.0 + confidence) * (weights > 0)) @ y
+        return np.linalg.solve(A, b).astype(np.float32)
+
+    def user_vector(self, username: str, interactions: Optional[Mapping[str, float]] = None) -> Optional[np.ndarray]:
+        """Embedding đã train; user mới / có tương tác mới → fold-in từ `interactions` (nếu có)"""
+        uid = self.user_ids.get(username)
+        if uid is not None and username not in self._stale:
+            return self.user_factors[uid]
+        if interactions is None:
+            return None if uid is None else self.user_factors[uid]
+        return self.fold_in(interactions)
+
+    def recommend(
+        self,
+        username: str,
+        exclude: Set[str],
+        k: int = 10,
+        interactions: Optional[Mapping[str, float]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns:
+            List[(product_name, score)] - top-k theo tích vô hướng, bỏ qua `exclude`
+        """
+        vector = self.user_vector(username, interactions)
+        # Vector 0: user chỉ tương tác với sản phẩm model chưa biết → không có tín hiệu
+        if vector is None or k <= 0 or not np.any(vector):
+            return []
+
+        scores = self.item_factors @ vector
+        for name in exclude:
+            pid = self.product_ids.get(name)
+            if pid is not None:
+                scores[pid] = -np.inf
+
+        candidates = np.flatnonzero(np.isfinite(scores))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return [(self.product_names[i], float(scores[i])) for i in candidates[order]]
+
+    # ===== Lưu / đọc =====
+
+    def save(self, path: str = ALS_MODEL_DIR):
+        """Ghi vào thư mục: user_factors.npy, item_factors.npy (memory-map được) + meta.json"""
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "user_factors.npy"), np.ascontiguousarray(self.user_factors))
+        np.save(os.path.join(path, "item_factors.npy"), np.ascontiguousarray(self.item_factors))
+
+        user_names = [None] * len(self.user_ids)
+        for name, uid in self.user_ids.items():
+            user_names[uid] = name
+        meta = {
+            "factors": self.factors,
+            "regularization": self.regularization,
+            "alpha": self.alpha,
+            "iterations": self.iterations,
+            "seed": self.seed,
+            "users": user_names,
+            "products": self.product_names,
+        }
+        tmp_path = os.path.join(path, "meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+    @classmethod
+    def load(cls, path: str = ALS_MODEL_DIR, mmap: bool = True) -> "ImplicitALS":
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        model = cls(meta["factors"], meta["regularization"], meta["alpha"], meta["iterations"], meta["seed"])
+        mode = 'r' if mmap else None
+        model.user_factors = np.load(os.path.join(path, "user_factors.npy"), mmap_mode=mode)
+        model.item_factors = np.load(os.path.join(path, "item_factors.npy"), mmap_mode=mode)
+        model.user_ids = {name: i for i, name in enumerate(meta["users"])}
+        model.product_names = meta["products"]
+        model.product_ids = {name: i for i, name in enumerate(model.product_names)}
+        return model
+
+    @classmethod
+    def load_if_exists(cls, path: str = ALS_MODEL_DIR) -> Optional["ImplicitALS"]:
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            return None
+        try:
+            model = cls.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Không đọc được model ALS ở {path}: {e}")
+            return None
+        print(f"✅ Đã load model ALS ({len(model.user_ids)} users, {len(model.product_names)} products)")
+        return model
+
+    # ===== Listener của InteractionTracker =====
+
+    def on_interaction_added(self, username: str, record: Tuple[str, str, int, str, str]):
+        self._stale.add(username)
+
+    def on_interaction_removed(self, username: str, record: Tuple[str, str, int, str, str]):
+        self._stale.add(username)
+
+    def on_interactions_reloaded(self, tracker):
+        self._stale.update(self.user_ids)
+
+
+def main():
+    import argparse
+    from WeightNormalizer import WeightNormalizer
+    from InteractionTracker import InteractionTracker
+
+    parser = argparse.ArgumentParser(description="Train model ALS (implicit feedback) từ log tương tác")
+    parser.add_argument("--output", default=ALS_MODEL_DIR, help="thư mục lưu model")
+    parser.add_argument("--factors", type=int, default=32, help="số chiều embedding")
+    parser.add_argument("--iterations", type=int, default=15, help="số vòng ALS")
+    parser.add_argument("--regularization", type=float, default=0.1, help="hệ số λ")
+    parser.add_argument("--alpha", type=float, default=40.0, help="confidence = 1 + alpha × trọng số")
+    args = parser.parse_args()
+
+    tracker = InteractionTracker(refresh="manual")
+    try:
+        user_interactions = tracker.get_all_interactions_for_recommendation()
+    finally:
+        tracker.close()
+
+    graph = SparseGraph.from_interactions(WeightNormalizer(), user_interactions)
+    model = ImplicitALS(args.factors, args.regularization, args.alpha, args.iterations)
+    model.fit(graph)
+    model.save(args.output)
+    print(f"💾 Đã lưu model vào {args.output}/")
+
+
+if __name__ == "__main__":
+    main()
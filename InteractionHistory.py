@@ -0,0 +1,84 @@
+from typing import Iterator, List, Optional, Tuple
+from collections import OrderedDict
+
+# (product_id, product_name, price, category, interaction_type)
+Interaction = Tuple[str, str, int, str, str]
+
+# product_id của bản ghi cũ (định dạng [tên, loại]) chưa có id
+UNKNOWN_ID = "UNKNOWN"
+
+
+class InteractionHistory:
+    """
+    Lịch sử tương tác của 1 user, có giới hạn độ dài.
+
+    - Khoá (product_id, interaction_type): mỗi cặp chỉ giữ bản ghi mới nhất;
+      bản ghi cũ có product_id UNKNOWN_ID được khoá theo tên sản phẩm (xem key_of)
+      để các sản phẩm khác nhau không gộp thành 1
+    - Duyệt theo thứ tự mới nhất → cũ nhất (giống list cũ, insert(0, ...))
+    - Thêm / đưa lên đầu / loại bỏ bản ghi cũ nhất đều O(1)
+    """
+
+    __slots__ = ("maxlen", "_items")
+
+    def __init__(self, maxlen: int = 100):
+        if maxlen <= 0:
+            raise ValueError("maxlen phải lớn hơn 0")
+        self.maxlen = maxlen
+        # Cuối OrderedDict = mới nhất
+        self._items: "OrderedDict[Tuple[str, str], Interaction]" = OrderedDict()
+
+    @staticmethod
+    def key_of(record: Interaction) -> Tuple[str, str]:
+        product_id = record[0]
+        if product_id == UNKNOWN_ID:
+            product_id = f"{UNKNOWN_ID}:{record[1]}"
+        return product_id, record[4]
+
+    def add(self, record: Interaction) -> Tuple[bool, Optional[Interaction]]:
+        """
+        Thêm tương tác mới nhất.
+
+        Returns:
+            (replaced, evicted)
+            replaced: True nếu đã có tương tác cùng (product_id, type) → được đưa lên đầu
+            evicted: bản ghi cũ nhất bị loại khi vượt maxlen (None nếu không có)
+        """
+        key = self.key_of(record)
+        replaced = key in self._items
+
+        self._items[key] = record
+        if replaced:
+            self._items.move_to_end(key)
+
+        evicted = None
+        if len(self._items) > self.maxlen:
+            _, evicted = self._items.popitem(last=False)
+
+        return replaced, evicted
+
+    def get(self, product_id: str, interaction_type: str) -> Optional[Interaction]:
+        return self._items.get((product_id, interaction_type))
+
+    def remove(self, product_id: str, interaction_type: str) -> Optional[Interaction]:
+        return self._items.pop((product_id, interaction_type), None)
+
+    def to_list(self) -> List[Interaction]:
+        return list(reversed(self._items.values()))
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Interaction]:
+        # Mới nhất trước
+        return reversed(self._items.values())
+
+    def __reversed__(self) -> Iterator[Interaction]:
+        # Cũ nhất trước (thứ tự phát lại event log)
+        return iter(self._items.values())
+
+    def __repr__(self) -> str:
+        return f"InteractionHistory({len(self._items)}/{self.maxlen})"
@@ -1,196 +1,662 @@
-from typing import Dict, List, Tuple, Optional
-import json
-import os
-
-class InteractionTracker:
-    INTERACTION_FILE = "user_interactions.json"
-    
-    def __init__(self):
-        self.interactions: Dict[str, List[Tuple[str, str, int, str, str]]] = {}
-        self.load_interactions()
-    
-    def load_interactions(self):
-        # Đọc dữ liệu tương tác từ file
-        try:
-            if os.path.exists(self.INTERACTION_FILE):
-                with open(self.INTERACTION_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    self.interactions = {}
-                    for user, items in data.items():
-                        self.interactions[user] = []
-                        for item in items:
-                            if len(item) == 2:
-                                self.interactions[user].append((
-                                    "UNKNOWN", 
-                                    item[0],    
-                                    0,         
-                                    "Unknown",  
-                                    item[1]     
-                                ))
-                            elif len(item) >= 5:
-                                self.interactions[user].append(tuple(item[:5]))
-                            else:
-                                continue
-                
-                print(f"✅ Đã load {len(self.interactions)} user interactions từ file")
-        except Exception as e:
-            print(f"⚠️ Không thể đọc file tương tác: {e}")
-            self.interactions = {}
-    
-    def save_interactions(self):
-        try:
-            data_to_save = {}
-            for user, items in self.interactions.items():
-                data_to_save[user] = [
-                    [pid, name, price, category, itype]
-                    for pid, name, price, category, itype in items
-                ]
-            
-            with open(self.INTERACTION_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-            
-        except Exception as e:
-            print(f"⚠️ Không thể lưu file tương tác: {e}")
-    
-    def add_interaction(
-        self, 
-        username: str, 
-        product_id: str,
-        product_name: str, 
-        price: int,
-        category: str,
-        interaction_type: str
-    ):
-        if username not in self.interactions:
-            self.interactions[username] = []
-        
-        existing_same_type = None
-        for i, (pid, pname, p, cat, itype) in enumerate(self.interactions[username]):
-            if pid == product_id and itype == interaction_type:
-                existing_same_type = i
-                break
-        
-        if existing_same_type is not None:
-            #xoá tương tác cũ
-            self.interactions[username].pop(existing_same_type)
-            print(f"🔄 Cập nhật: {product_name} (ID: {product_id}) - {interaction_type}")
-        else:
-            #Thêm tương tác mới
-            print(f"➕ Thêm mới: {product_name} (ID: {product_id}) - {interaction_type}")
-        
-        # Thêm tương tác mới vào đầu
-        self.interactions[username].insert(0, (
-            product_id,
-            product_name,
-            price,
-            category,
-            interaction_type
-        ))
-        
-        # Giới hạn số lượng tương tác
-        if len(self.interactions[username]) > 100:
-            self.interactions[username] = self.interactions[username][:100]
-        
-        self.save_interactions()
-    
-    def get_user_interactions(self, username: str) -> List[Tuple[str, str, int, str, str]]:
-        self.load_interactions()
-        return self.interactions.get(username, [])
-    
-    def get_all_interactions(self) -> Dict[str, List[Tuple[str, str, int, str, str]]]:
-        self.load_interactions()
-        return self.interactions
-    
-    def get_interactions_for_recommendation(self, username: str) -> List[Tuple[str, str]]:
-        self.load_interactions()
-        if username not in self.interactions:
-            return []
-        
-        return [(name, itype) for _, name, _, _, itype in self.interactions[username]]
-    
-    def get_all_interactions_for_recommendation(self) -> Dict[str, List[Tuple[str, str]]]:
-        self.load_interactions()
-        result = {}
-        for username, interactions in self.interactions.items():
-            result[username] = [(name, itype) for _, name, _, _, itype in interactions]
-        return result
-    
-    def track_view(self, username: str, product):
-        self.add_interaction(
-            username, 
-            product.id, 
-            product.name, 
-            product.price, 
-            product.category, 
-            "view"
-        )
-    
-    def track_cart(self, username: str, product):
-        self.add_interaction(
-            username,
-            product.id,
-            product.name,
-            product.price,
-            product.category,
-            "cart"
-        )
-    
-    def track_purchase(self, username: str, product):
-        self.add_interaction(
-            username,
-            product.id,
-            product.name,
-            product.price,
-            product.category,
-            "purchase"
-        )
-    
-    def track_like(self, username: str, product):
-        self.add_interaction(
-            username,
-            product.id,
-            product.name,
-            product.price,
-            product.category,
-            "like"
-        )
-    
-    def track_skip(self, username: str, product):
-        self.add_interaction(
-            username,
-            product.id,
-            product.name,
-            product.price,
-            product.category,
-            "skip"
-        )
-    
-    def _print_interactions(self, username: str):
-        print(f"\n{'='*90}")
-        print(f"🔍 LỊCH SỬ TƯƠNG TÁC CỦA: {username}")
-        print(f"{'='*90}")
-        
-        self.load_interactions()
-        
-        if username in self.interactions and self.interactions[username]:
-            print(f"\nTổng số tương tác: {len(self.interactions[username])}\n")
-            print(f"{'#':<4} {'ID':<8} {'Tên sản phẩm':<30} {'Giá':<15} {'Loại':<12} {'Danh mục':<15}")
-            print("-"*90)
-            
-            for i, (pid, name, price, category, itype) in enumerate(self.interactions[username], 1):
-                icon = {
-                    "purchase": " 🛒 ",
-                    "cart": " 🛍️ ",
-                    "like": " ❤️ ",
-                    "view": " 👁️ ",
-                    "skip": " ⏭️ "
-                }.get(itype, " ❓ ")
-                
-                display_name = name if len(name) <= 28 else name[:27] + "…"
-                
-                print(f"{i:<4} {pid:<8} {display_name:<30} {price:>12,}đ {icon} {itype:<10} {category:<15}")
-        else:
-            print("\n❌ Chưa có tương tác nào!")
-        
-        print(f"{'='*90}\n")
\ No newline at end of file
+from typing import Any, Dict, Iterable, List, Tuple, Optional, Union
+import json
+import os
+import threading
+import time
+from InteractionHistory import InteractionHistory, UNKNOWN_ID
+
+class InteractionTracker:
+    INTERACTION_FILE = "user_interactions.json"
+    INTERACTION_LOG = "user_interactions.jsonl"
+    MAX_INTERACTIONS_PER_USER = 100
+    VALID_INTERACTION_TYPES = ("purchase", "cart", "like", "view", "skip")
+    
+    def __init__(
+        self,
+        storage: str = "log",
+        refresh: str = "stat",
+        max_per_user: int = MAX_INTERACTIONS_PER_USER,
+        write_behind: bool = False,
+        batch_size: int = 64,
+        flush_interval: float = 1.0
+    ):
+        """
+        storage:
+            "log"  - Event log append-only (mỗi dòng 1 sự kiện JSON), mặc định
+            "json" - Ghi đè toàn bộ user_interactions.json mỗi lần (kiểu cũ)
+        refresh:
+            "stat"   - Dữ liệu trong bộ nhớ là chuẩn; chỉ đọc lại khi mtime/size
+                       của file thay đổi (do tiến trình khác ghi), mặc định
+            "manual" - Không bao giờ tự đọc lại, chỉ khi gọi reload()
+        max_per_user:
+            Số tương tác tối đa giữ lại cho mỗi user (bỏ bớt cũ nhất)
+        write_behind:
+            True → không ghi đĩa trên luồng xử lý UI. Sự kiện được xếp hàng trong
+            bộ nhớ và một luồng nền ghi theo lô (đủ batch_size sự kiện hoặc sau
+            flush_interval giây), fsync 1 lần mỗi lô. Chỉ hỗ trợ storage="log".
+            Phải gọi flush()/close() trước khi thoát để không mất sự kiện.
+        """
+        if storage not in ("log", "json"):
+            raise ValueError(f"storage không hợp lệ: {storage}")
+        if refresh not in ("stat", "manual"):
+            raise ValueError(f"refresh không hợp lệ: {refresh}")
+        if write_behind and storage != "log":
+            raise ValueError("write_behind chỉ hỗ trợ storage=\"log\"")
+        
+        self.storage = storage
+        self.refresh = refresh
+        self.max_per_user = max_per_user
+        self.interactions: Dict[str, InteractionHistory] = {}
+        
+        # Trạng thái file đã đồng bộ: (mtime_ns, size) và vị trí đã đọc tới trong log
+        self._file_state: Optional[Tuple[int, int]] = None
+        self._log_offset = 0
+        
+        # Tăng mỗi khi dữ liệu thay đổi → dùng để cache kết quả dẫn xuất
+        self._version = 0
+        self._recommendation_view: Optional[Tuple[int, Dict[str, List[Tuple[str, str]]]]] = None
+        self._list_view: Optional[Tuple[int, Dict[str, List[Tuple[str, str, int, str, str]]]]] = None
+        
+        # Các đối tượng nhận thay đổi theo từng sự kiện (xem add_listener)
+        self._listeners: List[Any] = []
+        
+        # Khoá cho mọi thao tác ghi file / cập nhật trạng thái file
+        self._io_lock = threading.RLock()
+        
+        # Write-behind: hàng đợi sự kiện chờ ghi + luồng nền
+        self.write_behind = write_behind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: List[Tuple[str, Tuple[str, str, int, str, str]]] = []
+        self._queue_cond = threading.Condition()
+        self._queued_count = 0
+        self._flushed_count = 0
+        self._flush_requested = False
+        self._closing = False
+        self._flusher: Optional[threading.Thread] = None
+        self.stats = {
+            "batches": 0,
+            "flushed_events": 0,
+            "failed_events": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+        
+        self.load_interactions()
+        
+        if self.write_behind:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="InteractionFlusher", daemon=True
+            )
+            self._flusher.start()
+    
+    @property
+    def _data_file(self) -> str:
+        return self.INTERACTION_LOG if self.storage == "log" else self.INTERACTION_FILE
+    
+    def load_interactions(self):
+        if self.storage == "json":
+            self._load_json()
+        elif os.path.exists(self.INTERACTION_LOG):
+            self._replay_log()
+        elif os.path.exists(self.INTERACTION_FILE):
+            # Chuyển dữ liệu cũ (JSON) sang event log - chỉ khi đọc được file cũ,
+            # nếu không event log rỗng sẽ che mất dữ liệu JSON ở các lần chạy sau
+            if self._load_json():
+                self.compact()
+                print(f"✅ Đã chuyển {self.INTERACTION_FILE} sang {self.INTERACTION_LOG}")
+            else:
+                print(f"⚠️ Chưa chuyển {self.INTERACTION_FILE} sang event log, sẽ thử lại lần sau")
+        else:
+            self.interactions = {}
+        
+        self._version += 1
+        self._remember_file_state()
+        
+        for listener in self._listeners:
+            listener.on_interactions_reloaded(self)
+    
+    def add_listener(self, listener):
+        """
+        Đăng ký nhận thay đổi dữ liệu tương tác. listener cần có:
+            on_interaction_added(username, record)   - có cặp (product, type) mới
+            on_interaction_removed(username, record) - bản ghi bị đẩy ra khỏi lịch sử
+            on_interactions_reloaded(tracker)        - dữ liệu được đọc lại toàn bộ
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+    
+    def reload(self):
+        """Bỏ dữ liệu trong bộ nhớ và đọc lại toàn bộ từ file"""
+        # Ghi hết sự kiện đang chờ trước, nếu không sẽ mất khỏi bộ nhớ
+        self.flush()
+        self.load_interactions()
+    
+    def _remember_file_state(self):
+        try:
+            st = os.stat(self._data_file)
+            self._file_state = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            self._file_state = None
+    
+    def _refresh_if_changed(self):
+        """
+        Kiểm tra rẻ bằng os.stat thay vì parse lại file ở mỗi lần đọc.
+        
+        - File không đổi → dùng dữ liệu trong bộ nhớ
+        - Event log chỉ dài thêm → đọc tiếp phần đuôi mới
+        - Các trường hợp khác (bị gom/ghi đè/xoá) → đọc lại toàn bộ
+        """
+        if self.refresh == "manual":
+            return
+        
+        # Luồng nền đang ghi → file đang đổi do chính mình, bỏ qua lần kiểm tra này
+        if not self._io_lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                st = os.stat(self._data_file)
+                current = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                current = None
+            
+            if current == self._file_state:
+                return
+            
+            if (self.storage == "log" and current is not None 
+                    and self._file_state is not None and current[1] > self._log_offset):
+                self._log_offset, _, _ = self._read_log_from(self._log_offset)
+                self._version += 1
+                self._remember_file_state()
+                return
+        finally:
+            self._io_lock.release()
+        
+        self.reload()
+    
+    def _load_json(self) -> bool:
+        """Đọc dữ liệu tương tác từ file JSON. Returns: False nếu đọc/parse lỗi"""
+        try:
+            if os.path.exists(self.INTERACTION_FILE):
+                with open(self.INTERACTION_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                    
+                    self.interactions = {}
+                    for user, items in data.items():
+                        self.interactions[user] = InteractionHistory(self.max_per_user)
+                        # File lưu mới nhất trước → thêm từ cũ nhất để giữ đúng thứ tự
+                        for item in reversed(items):
+                            if len(item) == 2:
+                                self.interactions[user].add((
+                                    UNKNOWN_ID,
+                                    item[0],    
+                                    0,         
+                                    "Unknown",  
+                                    item[1]     
+                                ))
+                            elif len(item) >= 5:
+                                self.interactions[user].add(tuple(item[:5]))
+                            else:
+                                continue
+                
+                print(f"✅ Đã load {len(self.interactions)} user interactions từ file")
+            return True
+        except Exception as e:
+            print(f"⚠️ Không thể đọc file tương tác: {e}")
+            self.interactions = {}
+            return False
+    
+    def _read_log_from(self, offset: int, notify: bool = True) -> Tuple[int, int, int]:
+        """
+        Phát lại các dòng hoàn chỉnh của event log kể từ byte offset.
+        
+        Returns:
+            (offset mới, số dòng đã đọc, số dòng lỗi)
+        """
+        total_lines = 0
+        bad_lines = 0
+        with open(self.INTERACTION_LOG, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # Dòng cuối chưa ghi xong → để lần sau đọc tiếp
+                    break
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                total_lines += 1
+                try:
+                    username, pid, name, price, category, itype = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    bad_lines += 1
+                    continue
+                self._apply(username, (pid, name, price, category, itype), notify)
+        return offset, total_lines, bad_lines
+    
+    def _replay_log(self):
+        # Dựng lại index trong bộ nhớ bằng cách phát lại event log theo thứ tự thời gian
+        self.interactions = {}
+        try:
+            self._log_offset, total_lines, bad_lines = self._read_log_from(0, notify=False)
+        except Exception as e:
+            print(f"⚠️ Không thể đọc event log: {e}")
+            self.interactions = {}
+            return
+        
+        # Dòng cuối chưa có "\n" (tiến trình khác đang ghi dở) không tính là dòng lỗi:
+        # _log_offset dừng trước nó → lần đọc phần đuôi sau sẽ đọc lại khi ghi xong.
+        # Nếu gom log lúc này, sự kiện đó sẽ bị mất vĩnh viễn.
+        pending_tail = self._log_offset < os.path.getsize(self.INTERACTION_LOG)
+        if pending_tail:
+            print(f"ℹ️ Dòng cuối của {self.INTERACTION_LOG} chưa ghi xong, sẽ đọc lại sau")
+        
+        if bad_lines:
+            print(f"⚠️ Bỏ qua {bad_lines} dòng lỗi trong {self.INTERACTION_LOG}")
+        print(f"✅ Đã load {len(self.interactions)} user interactions từ event log")
+        
+        # Log chỉ tăng → gom lại khi số dòng vượt xa số tương tác còn hiệu lực
+        live = sum(len(items) for items in self.interactions.values())
+        if not pending_tail and (bad_lines or total_lines > 2 * live + 1000):
+            self.compact()
+    
+    def save_interactions(self):
+        try:
+            data_to_save = {}
+            for user, items in self.interactions.items():
+                data_to_save[user] = [
+                    [pid, name, price, category, itype]
+                    for pid, name, price, category, itype in items
+                ]
+            
+            with open(self.INTERACTION_FILE, 'w', encoding='utf-8') as f:
+                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
+            self._remember_file_state()
+            
+        except Exception as e:
+            print(f"⚠️ Không thể lưu file tương tác: {e}")
+    
+    def compact(self):
+        """Ghi lại event log chỉ gồm các tương tác còn hiệu lực (ghi file tạm rồi thay thế)"""
+        tmp_path = self.INTERACTION_LOG + ".tmp"
+        self.flush()
+        try:
+            with self._io_lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for user, items in self.interactions.items():
+                        # Danh sách lưu mới nhất trước → ghi ngược lại để phát lại đúng thứ tự
+                        for record in reversed(items):
+                            f.write(self._encode_event(user, record))
+                    self._log_offset = f.tell()
+                os.replace(tmp_path, self.INTERACTION_LOG)
+                self._remember_file_state()
+        except Exception as e:
+            print(f"⚠️ Không thể gom event log: {e}")
+    
+    def _encode_event(self, username: str, record: Tuple[str, str, int, str, str]) -> str:
+        return json.dumps([username, *record], ensure_ascii=False) + "\n"
+    
+    def _append_events(
+        self,
+        events: List[Tuple[str, Tuple[str, str, int, str, str]]],
+        fsync: bool = False
+    ) -> bool:
+        try:
+            data = "".join(self._encode_event(user, record) for user, record in events)
+            with self._io_lock:
+                with open(self.INTERACTION_LOG, 'ab') as f:
+                    f.write(data.encode('utf-8'))
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._log_offset = f.tell()
+                self._remember_file_state()
+            return True
+        except Exception as e:
+            print(f"⚠️ Không thể ghi event log: {e}")
+            return False
+    
+    def _flush_loop(self):
+        # Luồng nền: gom sự kiện thành lô (theo số lượng hoặc thời gian) rồi ghi 1 lần
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._closing:
+                    self._queue_cond.wait()
+                if not self._queue and self._closing:
+                    return
+                
+                deadline = time.monotonic() + self.flush_interval
+                while (len(self._queue) < self.batch_size 
+                       and not self._closing and not self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._queue_cond.wait(remaining)
+                
+                batch = self._queue
+                self._queue = []
+                self._flush_requested = False
+            
+            start = time.perf_counter()
+            ok = self._append_events(batch, fsync=True)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            with self._queue_cond:
+                if ok:
+                    self.stats["batches"] += 1
+                    self.stats["flushed_events"] += len(batch)
+                    self.stats["last_flush_ms"] = elapsed_ms
+                    self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed_ms)
+                    self.stats["total_flush_ms"] += elapsed_ms
+                else:
+                    self.stats["failed_events"] += len(batch)
+                self._flushed_count += len(batch)
+                self._queue_cond.notify_all()
+    
+    def _enqueue(self, username: str, record: Tuple[str, str, int, str, str]):
+        with self._queue_cond:
+            self._queue.append((username, record))
+            self._queued_count += 1
+            self._queue_cond.notify_all()
+    
+    def flush(self):
+        """Chờ tới khi mọi sự kiện đang xếp hàng đã được ghi xuống đĩa"""
+        if not self.write_behind:
+            return
+        
+        with self._queue_cond:
+            target = self._queued_count
+            while self._flushed_count < target:
+                if self._flusher is None or not self._flusher.is_alive():
+                    break
+                self._flush_requested = True
+                self._queue_cond.notify_all()
+                self._queue_cond.wait(0.1)
+    
+    def close(self):
+        """Ghi nốt sự kiện đang chờ và dừng luồng nền. Gọi nhiều lần không sao."""
+        if not self.write_behind or self._flusher is None:
+            return
+        
+        self.flush()
+        with self._queue_cond:
+            self._closing = True
+            self._queue_cond.notify_all()
+        self._flusher.join()
+        self._flusher = None
+        
+        # Sự kiện đến sau khi close() (nếu có) được ghi trực tiếp
+        self.write_behind = False
+    
+    def get_stats(self) -> Dict[str, float]:
+        """Bộ đếm write-behind: độ sâu hàng đợi và độ trễ ghi lô"""
+        with self._queue_cond:
+            stats = dict(self.stats)
+            stats["queue_depth"] = len(self._queue)
+            stats["queued_events"] = self._queued_count
+        stats["avg_flush_ms"] = (
+            stats["total_flush_ms"] / stats["batches"] if stats["batches"] else 0.0
+        )
+        return stats
+    
+    def _apply(
+        self,
+        username: str,
+        record: Tuple[str, str, int, str, str],
+        notify: bool = True
+    ) -> bool:
+        """Cập nhật index trong bộ nhớ. Trả về True nếu là cập nhật tương tác đã có."""
+        self._version += 1
+        history = self.interactions.get(username)
+        if history is None:
+            history = self.interactions[username] = InteractionHistory(self.max_per_user)
+        
+        # Trùng (product_id, type) → đưa lên đầu; vượt giới hạn → bỏ cũ nhất
+        replaced, evicted = history.add(record)
+        
+        if notify:
+            for listener in self._listeners:
+                if not replaced:
+                    listener.on_interaction_added(username, record)
+                if evicted is not None:
+                    listener.on_interaction_removed(username, evicted)
+        
+        return replaced
+    
+    def add_interaction(
+        self, 
+        username: str, 
+        product_id: str,
+        product_name: str, 
+        price: int,
+        category: str,
+        interaction_type: str
+    ):
+        record = (product_id, product_name, price, category, interaction_type)
+        
+        # Nhận các thay đổi từ tiến trình khác trước khi ghi tiếp
+        self._refresh_if_changed()
+        
+        if self._apply(username, record):
+            print(f"🔄 Cập nhật: {product_name} (ID: {product_id}) - {interaction_type}")
+        else:
+            print(f"➕ Thêm mới: {product_name} (ID: {product_id}) - {interaction_type}")
+        
+        if self.write_behind:
+            self._enqueue(username, record)
+        elif self.storage == "log":
+            self._append_events([(username, record)])
+        else:
+            self.save_interactions()
+    
+    def add_interactions_bulk(
+        self,
+        events: Union[str, os.PathLike, Iterable[Any]]
+    ) -> Dict[str, int]:
+        """
+        Nạp hàng loạt tương tác (ví dụ backfill từ kênh khác).
+        
+        events có thể là:
+            - Đường dẫn tới file JSONL (mỗi dòng 1 sự kiện)
+            - File/stream đã mở hoặc iterable các dòng JSON
+            - Iterable các sự kiện dạng list/tuple
+              [username, product_id, product_name, price, category, interaction_type]
+              (cùng định dạng với event log) hoặc dict cùng các khoá đó
+              ("user"/"name"/"type" cũng được chấp nhận)
+        
+        Dedup + giới hạn theo từng user được áp dụng trong 1 lượt duyệt,
+        chỉ ghi xuống đĩa 1 lần ở cuối.
+        
+        Returns:
+            {"accepted", "skipped", "written", "users"}
+        """
+        if isinstance(events, (str, os.PathLike)):
+            with open(events, 'r', encoding='utf-8') as f:
+                return self.add_interactions_bulk(f)
+        
+        self._refresh_if_changed()
+        
+        accepted: List[Tuple[str, Tuple[str, str, int, str, str]]] = []
+        last_seen: Dict[Tuple[str, str, str], int] = {}
+        skipped = 0
+        
+        for event in events:
+            parsed = self._parse_bulk_event(event)
+            if parsed is None:
+                skipped += 1
+                continue
+            
+            username, record = parsed
+            self._apply(username, record)
+            last_seen[(username, *InteractionHistory.key_of(record))] = len(accepted)
+            accepted.append(parsed)
+        
+        # Chỉ ghi những sự kiện còn hiệu lực: bản cuối của mỗi (user, product, type)
+        # và chưa bị đẩy ra khỏi giới hạn. Phát lại log vẫn cho đúng trạng thái hiện tại.
+        survivors = [
+            (username, record) for i, (username, record) in enumerate(accepted)
+            if last_seen[(username, *InteractionHistory.key_of(record))] == i
+            and self.interactions[username].get(*InteractionHistory.key_of(record)) is record
+        ]
+        
+        if survivors:
+            if self.storage == "log":
+                # Giữ đúng thứ tự với các sự kiện write-behind đang chờ
+                self.flush()
+                self._append_events(survivors, fsync=True)
+            else:
+                self.save_interactions()
+        
+        summary = {
+            "accepted": len(accepted),
+            "skipped": skipped,
+            "written": len(survivors),
+            "users": len({username for username, _ in accepted}),
+        }
+        print(f"✅ Nạp hàng loạt: {summary['accepted']} sự kiện của {summary['users']} users "
+              f"(bỏ qua {summary['skipped']}, ghi {summary['written']})")
+        return summary
+    
+    def _parse_bulk_event(self, event: Any) -> Optional[Tuple[str, Tuple[str, str, int, str, str]]]:
+        try:
+            if isinstance(event, (str, bytes)):
+                if not event.strip():
+                    return None
+                event = json.loads(event)
+            
+            if isinstance(event, dict):
+                username = event.get("username", event.get("user"))
+                product_id = event["product_id"]
+                product_name = event.get("product_name", event.get("name"))
+                price = event.get("price", 0)
+                category = event.get("category", "Unknown")
+                interaction_type = event.get("interaction_type", event.get("type"))
+            else:
+                username, product_id, product_name, price, category, interaction_type = event
+            
+            price = int(price)
+        except (ValueError, TypeError, KeyError):
+            return None
+        
+        if not username or not product_id or not product_name:
+            return None
+        if interaction_type not in self.VALID_INTERACTION_TYPES:
+            return None
+        
+        return username, (product_id, product_name, price, category, interaction_type)
+    
+    def get_user_interactions(self, username: str) -> List[Tuple[str, str, int, str, str]]:
+        self._refresh_if_changed()
+        history = self.interactions.get(username)
+        return history.to_list() if history is not None else []
+    
+    def get_all_interactions(self) -> Dict[str, List[Tuple[str, str, int, str, str]]]:
+        """Kết quả được cache theo version dữ liệu - không sửa trực tiếp dict trả về"""
+        self._refresh_if_changed()
+        if self._list_view and self._list_view[0] == self._version:
+            return self._list_view[1]
+        
+        result = {user: history.to_list() for user, history in self.interactions.items()}
+        self._list_view = (self._version, result)
+        return result
+    
+    def get_interactions_for_recommendation(self, username: str) -> List[Tuple[str, str]]:
+        self._refresh_if_changed()
+        if username not in self.interactions:
+            return []
+        
+        return [(name, itype) for _, name, _, _, itype in self.interactions[username]]
+    
+    def get_all_interactions_for_recommendation(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Kết quả được cache theo version dữ liệu - không sửa trực tiếp dict trả về"""
+        self._refresh_if_changed()
+        if self._recommendation_view and self._recommendation_view[0] == self._version:
+            return self._recommendation_view[1]
+        
+        result = {}
+        for username, interactions in self.interactions.items():
+            result[username] = [(name, itype) for _, name, _, _, itype in interactions]
+        self._recommendation_view = (self._version, result)
+        return result
+    
+    def track_view(self, username: str, product):
+        self.add_interaction(
+            username, 
+            product.id, 
+            product.name, 
+            product.price, 
+            product.category, 
+            "view"
+        )
+    
+    def track_cart(self, username: str, product):
+        self.add_interaction(
+            username,
+            product.id,
+            product.name,
+            product.price,
+            product.category,
+            "cart"
+        )
+    
+    def track_purchase(self, username: str, product):
+        self.add_interaction(
+            username,
+            product.id,
+            product.name,
+            product.price,
+            product.category,
+            "purchase"
+        )
+    
+    def track_like(self, username: str, product):
+        self.add_interaction(
+            username,
+            product.id,
+            product.name,
+            product.price,
+            product.category,
+            "like"
+        )
+    
+    def track_skip(self, username: str, product):
+        self.add_interaction(
+            username,
+            product.id,
+            product.name,
+            product.price,
+            product.category,
+            "skip"
+        )
+    
+    def _print_interactions(self, username: str):
+        print(f"\n{'='*90}")
+        print(f"🔍 LỊCH SỬ TƯƠNG TÁC CỦA: {username}")
+        print(f"{'='*90}")
+        
+        self._refresh_if_changed()
+        
+        if username in self.interactions and self.interactions[username]:
+            print(f"\nTổng số tương tác: {len(self.interactions[username])}\n")
+            print(f"{'#':<4} {'ID':<8} {'Tên sản phẩm':<30} {'Giá':<15} {'Loại':<12} {'Danh mục':<15}")
+            print("-"*90)
+            
+            for i, (pid, name, price, category, itype) in enumerate(self.interactions[username], 1):
+                icon = {
+                    "purchase": " 🛒 ",
+                    "cart": " 🛍️ ",
+                    "like": " ❤️ ",
+                    "view": " 👁️ ",
+                    "skip": " ⏭️ "
+                }.get(itype, " ❓ ")
+                
+                display_name = name if len(name) <= 28 else name[:27] + "…"
+                
+                print(f"{i:<4} {pid:<8} {display_name:<30} {price:>12,}đ {icon} {itype:<10} {category:<15}")
+        else:
+            print("\n❌ Chưa có tương tác nào!")
+        
+        print(f"{'='*90}\n")
@@ -0,0 +1,211 @@
+from typing import Dict, List, Optional, Set, Tuple
+import math
+import threading
+import time
+
+import numpy as np
+
+
+class ItemNeighborTable:
+    """
+    Bảng "Khách hàng cũng xem": top-K sản phẩm tương tự cho mỗi product id.
+
+    - Độ tương tự = cosine đồng xuất hiện trên đồ thị tương tác, trọng số
+      lấy từ WeightNormalizer (đã có sẵn trên cạnh của đồ thị):
+          sim(i, j) = Σ_u w(u,i)·w(u,j) / (‖i‖·‖j‖)
+    - Lưu gọn trong 2 mảng NumPy (n × K): chỉ số hàng hàng xóm và điểm
+      → similar(product_id) là tra cứu O(1) + K
+    - Làm mới tăng dần: là listener của InteractionTracker, chỉ tính lại
+      các sản phẩm bị ảnh hưởng kể từ lần chạy trước
+    - start(): luồng nền làm mới mỗi refresh_interval giây → đường UI chỉ đọc similar().
+      Luồng nền đọc đồ thị qua bản sao từng dict (list(...) là nguyên tử dưới GIL);
+      cạnh đổi giữa chừng thì sản phẩm đó đã bị đánh dấu lại và được tính lần sau.
+      Ghi / đọc bảng kết quả và tập dirty giữ self._lock (ngắn, không gồm phần tính)
+    """
+
+    def __init__(self, graph, product_manager, k: int = 10, refresh_interval: float = 60.0):
+        """
+        graph: InteractionGraph (hoặc dict graph_data cùng cấu trúc)
+        refresh_interval: số giây tối thiểu giữa 2 lần maybe_refresh()
+        """
+        self.graph = graph.as_graph_data() if hasattr(graph, 'as_graph_data') else graph
+        self.product_manager = product_manager
+        self.k = k
+        self.refresh_interval = refresh_interval
+
+        self._ids: List[str] = []                 # hàng → product id
+        self._row_of: Dict[str, int] = {}         # product id → hàng
+        self._neighbors = np.full((0, k), -1, dtype=np.int32)
+        self._scores = np.zeros((0, k), dtype=np.float32)
+
+        self._dirty: Set[str] = set()             # tên sản phẩm cần tính lại
+        self._full_rebuild = True
+        self._last_refresh = 0.0
+
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    # ===== Tra cứu =====
+
+    def similar(self, product_id: str, n: Optional[int] = None) -> List[Tuple[str, float]]:
+        """[(product_id, score)] giảm dần theo độ tương tự"""
+        with self._lock:
+            row = self._row_of.get(product_id)
+            if row is None:
+                return []
+            neighbors = self._neighbors[row].copy()
+            scores = self._scores[row].copy()
+        result = [
+            (self._ids[j], float(s))
+            for j, s in zip(neighbors.tolist(), scores.tolist())
+            if j >= 0
+        ]
+        return result[:n] if n is not None else result
+
+    # ===== Tính toán =====
+
+    def refresh(self) -> int:
+        """
+        Tính lại các sản phẩm bị đánh dấu (hoặc toàn bộ nếu cần).
+
+        Returns:
+            Số sản phẩm đã tính lại
+        """
+        with self._lock:
+            names = list(self.graph['product_to_users']) if self._full_rebuild else list(self._dirty)
+            self._dirty = set()
+            self._full_rebuild = False
+            self._last_refresh = time.monotonic()
+
+        norms: Dict[str, float] = {}
+        computed = []
+        for name in names:
+            pid = self._product_id(name)
+            if pid is None:
+                continue
+            ranked = [
+                (self._product_id(j), s)
+                for j, s in self._compute_neighbors(name, norms)
+                if self._product_id(j) is not None
+            ]
+            computed.append((pid, ranked[:self.k]))
+
+        with self._lock:
+            for pid, ranked in computed:
+                self._store(pid, ranked)
+
+        return len(names)
+
+    def maybe_refresh(self) -> int:
+        """Làm mới định kỳ: chỉ chạy khi có thay đổi và đã quá refresh_interval giây"""
+        if not (self._dirty or self._full_rebuild):
+            return 0
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return 0
+        return self.refresh()
+
+    def start(self):
+        """Chạy maybe_refresh() trong luồng nền mỗi refresh_interval giây"""
+        if self._refresher is not None:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="ItemNeighborRefresher", daemon=True
+        )
+        self._refresher.start()
+
+    def stop(self):
+        """Dừng luồng nền (chờ lần làm mới đang chạy xong). Gọi nhiều lần không sao."""
+        if self._refresher is None:
+            return
+        self._stop.set()
+        self._refresher.join()
+        self._refresher = None
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.maybe_refresh()
+            except Exception as e:
+                print(f"⚠️ Không thể làm mới bảng sản phẩm tương tự: {e}")
+
+    def _product_id(self, name: str) -> Optional[str]:
+        # Đồ thị dùng tên sản phẩm làm khoá
+        product = self.product_manager.get_product_by_name(name)
+        return product.id if product else None
+
+    def _norm(self, name: str, cache: Dict[str, float]) -> float:
+        if name not in cache:
+            users = self.graph['product_to_users'].get(name, {})
+            cache[name] = math.sqrt(sum(w * w for w in list(users.values())))
+        return cache[name]
+
+    def _compute_neighbors(self, name: str, norms: Dict[str, float]) -> List[Tuple[str, float]]:
+        user_to_products = self.graph['user_to_products']
+        users = self.graph['product_to_users'].get(name, {})
+
+        dot: Dict[str, float] = {}
+        for user, w_ui in list(users.items()):
+            for other, w_uj in list(user_to_products.get(user, {}).items()):
+                if other != name:
+                    dot[other] = dot.get(other, 0.0) + w_ui * w_uj
+
+        norm_i = self._norm(name, norms)
+        scored = []
+        for other, value in dot.items():
+            denom = norm_i * self._norm(other, norms)
+            if denom > 0 and value > 0:
+                scored.append((other, value / denom))
+
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored
+
+    def _row(self, product_id: str) -> int:
+        row = self._row_of.get(product_id)
+        if row is not None:
+            return row
+
+        row = len(self._ids)
+        if row >= len(self._neighbors):
+            # Tăng gấp đôi dung lượng → thêm hàng trung bình O(1)
+            capacity = max(16, 2 * len(self._neighbors))
+            neighbors = np.full((capacity, self.k), -1, dtype=np.int32)
+            scores = np.zeros((capacity, self.k), dtype=np.float32)
+            neighbors[:row] = self._neighbors[:row]
+            scores[:row] = self._scores[:row]
+            self._neighbors, self._scores = neighbors, scores
+
+        self._ids.append(product_id)
+        self._row_of[product_id] = row
+        return row
+
+    def _store(self, product_id: str, ranked: List[Tuple[str, float]]):
+        row = self._row(product_id)
+        rows = [self._row(pid) for pid, _ in ranked]
+        self._neighbors[row] = -1
+        self._scores[row] = 0.0
+        self._neighbors[row, :len(rows)] = rows
+        self._scores[row, :len(rows)] = [s for _, s in ranked]
+
+    # ===== Listener của InteractionTracker =====
+
+    def _mark_dirty(self, username: str, product_name: str):
+        # Cạnh (u, p) đổi → tích vô hướng đổi với mọi j user u đã tương tác, và ‖p‖
+        # đổi → sim(j, p) đổi với MỌI j đồng xuất hiện với p qua bất kỳ user nào
+        user_to_products = self.graph['user_to_products']
+        with self._lock:
+            self._dirty.add(product_name)
+            self._dirty.update(user_to_products.get(username, {}))
+            for user in self.graph['product_to_users'].get(product_name, {}):
+                self._dirty.update(user_to_products.get(user, {}))
+
+    def on_interaction_added(self, username: str, record: Tuple[str, str, int, str, str]):
+        self._mark_dirty(username, record[1])
+
+    def on_interaction_removed(self, username: str, record: Tuple[str, str, int, str, str]):
+        self._mark_dirty(username, record[1])
+
+    def on_interactions_reloaded(self, tracker):
+        with self._lock:
+            self._full_rebuild = True
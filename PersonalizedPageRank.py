@@ -0,0 +1,317 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import math
+import random
+import time
+
+import numpy as np
+
+from SparseGraph import SparseGraph
+
+MODES = ("power", "monte_carlo")
+
+
+class PersonalizedPageRank:
+    """
+    Personalized PageRank (random walk with restart) trên đồ thị 2 phía user ↔ product.
+
+    Người đi bộ xuất phát từ user đang đăng nhập; mỗi bước:
+        - với xác suất restart: quay về user gốc
+        - còn lại: đi theo 1 cạnh, xác suất tỉ lệ trọng số w(x,y) / Σ_z w(x,z)
+    Điểm của product = xác suất dừng ở product đó → nhìn xa hơn 2 bước của CF
+    (user → product → user → product → ...), hub bị chia nhỏ xác suất tự nhiên.
+
+    2 chế độ:
+    - "power": lặp luỹ thừa, mỗi vòng là 2 phép nhân ma trận thưa (gather + bincount
+      trên mảng CSR của SparseGraph), dừng khi thay đổi L1 < tol → kết quả chính xác
+    - "monte_carlo": chạy num_walks bước đi ngẫu nhiên song song (vector hoá),
+      đếm số lần ghé product → ước lượng; chi phí cố định theo ngân sách walk
+
+    Dùng lâu dài trên đồ thị sống → attach(graph): là listener của InteractionGraph,
+    cạnh đổi chỉ đánh dấu dirty; snapshot CSR + ma trận chuyển được dựng lại (O(E))
+    tối đa 1 lần mỗi refresh_interval giây, hoặc ngay khi user được hỏi chưa có trong snapshot
+    """
+
+    def __init__(
+        self,
+        graph: SparseGraph,
+        restart: float = 0.15,
+        tol: float = 1e-6,
+        max_iter: int = 50,
+        num_walks: int = 2000,
+        max_walk_length: int = 20,
+        seed: Optional[int] = None,
+        refresh_interval: float = 60.0
+    ):
+        """refresh_interval: số giây tối thiểu giữa 2 lần dựng lại snapshot (chỉ khi attach)"""
+        self.restart = restart
+        self.tol = tol
+        self.max_iter = max_iter
+        self.num_walks = num_walks
+        self.max_walk_length = max_walk_length
+        self._rng = np.random.default_rng(seed)
+        self.last_stats: Dict = {}
+
+        self.refresh_interval = refresh_interval
+        self._source = None                       # InteractionGraph khi attach
+        self._dirty = False
+        self._last_refresh = time.monotonic()
+        self._set_graph(graph)
+
+    @classmethod
+    def attach(cls, graph, **options) -> "PersonalizedPageRank":
+        """Dựng snapshot từ InteractionGraph hiện tại và đăng ký nhận cập nhật"""
+        ppr = cls(SparseGraph.from_graph_data(graph.as_graph_data()), **options)
+        ppr._source = graph
+        graph.add_listener(ppr)
+        return ppr
+
+    def _set_graph(self, graph: SparseGraph):
+        self.graph = graph
+        # Xác suất chuyển trên từng cạnh (chuẩn hoá theo tổng trọng số của hàng)
+        self._up_prob, self._up_rows, self._up_cum, self._user_has_edges = self._transitions(
+            graph.up_indptr, graph.up_data, graph.n_users
+        )
+        self._pu_prob, self._pu_rows, self._pu_cum, self._product_has_edges = self._transitions(
+            graph.pu_indptr, graph.pu_data, graph.n_products
+        )
+
+    @staticmethod
+    def _transitions(indptr: np.ndarray, data: np.ndarray, n_rows: int):
+        """
+        (xác suất mỗi cạnh, hàng của mỗi cạnh, tổng tích luỹ toàn mảng để lấy mẫu,
+         mask hàng có cạnh trọng số > 0 - hàng còn lại là node "cụt", walk dừng ở đó)
+        """
+        rows = np.repeat(np.arange(n_rows), np.diff(indptr))
+        totals = np.bincount(rows, weights=data, minlength=n_rows)
+        prob = data / np.where(totals > 0, totals, 1.0)[rows]
+        return prob, rows, np.cumsum(prob), totals > 0
+
+    def refresh(self):
+        """Dựng lại snapshot từ đồ thị nguồn (O(E))"""
+        if self._source is not None:
+            self._set_graph(SparseGraph.from_graph_data(self._source.as_graph_data()))
+        self._dirty = False
+        self._last_refresh = time.monotonic()
+
+    def maybe_refresh(self, username: Optional[str] = None) -> bool:
+        """
+        Dựng lại khi có thay đổi và đã quá refresh_interval giây, hoặc khi username
+        đã có cạnh trong đồ thị sống nhưng chưa có trong snapshot (user mới)
+        """
+        if not self._dirty:
+            return False
+        stale = time.monotonic() - self._last_refresh >= self.refresh_interval
+        missing = (
+            username is not None
+            and self.graph.user_id(username) is None
+            and username in self._source.user_to_products
+        )
+        if not (stale or missing):
+            return False
+        self.refresh()
+        return True
+
+    # ===== Power iteration =====
+
+    def _power(self, uid: int) -> np.ndarray:
+        g = self.graph
+        alpha = self.restart
+        x_users = np.zeros(g.n_users)
+        x_users[uid] = 1.0
+        x_products = np.zeros(g.n_products)
+
+        iterations = 0
+        for iterations in range(1, self.max_iter + 1):
+            # user → product và product → user: mỗi chiều 1 gather + bincount
+            to_products = np.bincount(
+                g.up_indices, weights=x_users[self._up_rows] * self._up_prob, minlength=g.n_products
+            )
+            to_users = np.bincount(
+                g.pu_indices, weights=x_products[self._pu_rows] * self._pu_prob, minlength=g.n_users
+            )
+            new_users = (1 - alpha) * to_users
+            new_products = (1 - alpha) * to_products
+            # Khối xác suất còn lại (restart + node không có cạnh) quay về user gốc
+            new_users[uid] += 1.0 - new_users.sum() - new_products.sum()
+
+            delta = np.abs(new_users - x_users).sum() + np.abs(new_products - x_products).sum()
+            x_users, x_products = new_users, new_products
+            if delta < self.tol:
+                break
+
+        self.last_stats = {"mode": "power", "iterations": iterations, "delta": float(delta)}
+        return x_products
+
+    # ===== Monte Carlo =====
+
+    def _step(self, positions: np.ndarray, indptr: np.ndarray, cum: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """1 bước có trọng số cho mọi walk: chọn cạnh bằng searchsorted trên tổng tích luỹ"""
+        starts = indptr[positions]
+        base = np.where(starts > 0, cum[np.maximum(starts - 1, 0)], 0.0)
+        targets = np.searchsorted(cum, base + self._rng.random(len(positions)), side='right')
+        targets = np.minimum(targets, indptr[positions + 1] - 1)
+        return indices[targets]
+
+    def _monte_carlo(self, uid: int) -> np.ndarray:
+        g = self.graph
+        visits = np.zeros(g.n_products)
+        if not self._user_has_edges[uid]:
+            self.last_stats = {"mode": "monte_carlo", "walks": 0, "steps": 0}
+            return visits
+
+        # Mỗi walk: user gốc → product → user → ... ; dừng với xác suất restart mỗi bước
+        users = np.full(self.num_walks, uid, dtype=np.int64)
+        steps = 0
+        for _ in range(self.max_walk_length):
+            users = users[(self._rng.random(len(users)) >= self.restart) & self._user_has_edges[users]]
+            if len(users) == 0:
+                break
+            products = self._step(users, g.up_indptr, self._up_cum, g.up_indices)
+            visits += np.bincount(products, minlength=g.n_products)
+            steps += len(users)
+
+            products = products[(self._rng.random(len(products)) >= self.restart) & self._product_has_edges[products]]
+            if len(products) == 0:
+                break
+            users = self._step(products, g.pu_indptr, self._pu_cum, g.pu_indices)
+            steps += len(products)
+
+        self.last_stats = {"mode": "monte_carlo", "walks": self.num_walks, "steps": steps}
+        total = visits.sum()
+        return visits / total if total > 0 else visits
+
+    # ===== API =====
+
+    def scores(self, username: str, mode: str = "power") -> Optional[np.ndarray]:
+        """Điểm PPR cho mọi product (theo product id của SparseGraph); None nếu user không có trong đồ thị"""
+        if mode not in MODES:
+            raise ValueError(f"mode phải là một trong {MODES}")
+        start = time.perf_counter()
+        refreshed = self.maybe_refresh(username)
+        uid = self.graph.user_id(username)
+        if uid is None:
+            return None
+        result = self._power(uid) if mode == "power" else self._monte_carlo(uid)
+        self.last_stats["refreshed"] = refreshed
+        self.last_stats["ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def top_k(
+        self,
+        username: str,
+        exclude: Set[str],
+        k: int = 10,
+        mode: str = "power"
+    ) -> List[Tuple[str, float]]:
+        scores = self.scores(username, mode) if k > 0 else None
+        if scores is None:
+            return []
+
+        scores = scores.copy()
+        for name in exclude:
+            pid = self.graph.product_id(name)
+            if pid is not None:
+                scores[pid] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        order = np.lexsort((candidates, -scores[candidates]))
+        return [(self.graph.product_names[i], float(scores[i])) for i in candidates[order]]
+
+    # ===== Listener của InteractionGraph =====
+
+    def on_edge_changed(self, user: str, product: str, old: Optional[float], new: Optional[float]):
+        self._dirty = True
+
+    def on_graph_reset(self, graph):
+        self._dirty = True
+
+
+def evaluate_strategies(
+    product_manager,
+    user_interactions: Dict[str, List[Tuple[str, str]]],
+    strategies: Iterable[str] = ("tiered", "ppr", "ppr_mc"),
+    top_n: int = 10,
+    max_users: int = 200,
+    seed: int = 42
+) -> Dict[str, Dict[str, float]]:
+    """
+    So sánh độ trễ + recall@top_n giữa các strategy (leave-one-out):
+    mỗi user bị giấu 1 sản phẩm đã tương tác, dựng đồ thị từ phần còn lại,
+    rồi xem strategy có đề xuất lại được sản phẩm bị giấu hay không.
+
+    Returns:
+        {strategy: {"recall": ..., "avg_ms": ..., "p95_ms": ..., "users": ...}}
+    """
+    from WeightNormalizer import WeightNormalizer
+    from Recommendation import Recommendation
+
+    rng = random.Random(seed)
+    eligible = sorted(u for u, items in user_interactions.items() if len({p for p, _ in items}) >= 2)
+    users = rng.sample(eligible, min(max_users, len(eligible)))
+
+    # Giấu MỌI tương tác với 1 sản phẩm ngẫu nhiên của mỗi user được chọn
+    held_out: Dict[str, str] = {}
+    train = dict(user_interactions)
+    for user in users:
+        items = user_interactions[user]
+        hidden = rng.choice(sorted({p for p, _ in items}))
+        held_out[user] = hidden
+        train[user] = [(p, t) for p, t in items if p != hidden]
+
+    graph = SparseGraph.from_interactions(WeightNormalizer(), train)
+    recommender = Recommendation(graph, product_manager, verbose=False)
+
+    report = {}
+    for strategy in strategies:
+        hits = 0
+        latencies = []
+        for user in users:
+            purchased = {p for p, t in train[user] if t == "purchase"}
+            start = time.perf_counter()
+            results = recommender.get_recommendations(user, top_n, purchased, strategy=strategy)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += any(name == held_out[user] for name, _, _ in results)
+
+        latencies.sort()
+        report[strategy] = {
+            "recall": hits / len(users) if users else 0.0,
+            "avg_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            # nearest-rank: phần tử thứ ⌈0.95·n⌉ (n nhỏ vẫn là giá trị cao, không rơi về trung vị)
+            "p95_ms": latencies[math.ceil(0.95 * len(latencies)) - 1] if latencies else 0.0,
+            "users": len(users),
+        }
+    return report
+
+
+def main():
+    import argparse
+    from DataAccess import DataAccess
+    from ProductManager import ProductManager
+    from InteractionTracker import InteractionTracker
+
+    parser = argparse.ArgumentParser(description="So sánh PPR với pipeline 3 tầng (recall@N, độ trễ)")
+    parser.add_argument("--users", type=int, default=200, help="số users đánh giá")
+    parser.add_argument("--top-n", type=int, default=10, help="N trong recall@N")
+    args = parser.parse_args()
+
+    product_manager = ProductManager(DataAccess().load_products())
+    tracker = InteractionTracker(refresh="manual")
+    try:
+        user_interactions = tracker.get_all_interactions_for_recommendation()
+    finally:
+        tracker.close()
+
+    report = evaluate_strategies(product_manager, user_interactions, top_n=args.top_n, max_users=args.users)
+    print(f"\n{'='*70}")
+    print(f"📊 SO SÁNH STRATEGY (leave-one-out, recall@{args.top_n})")
+    print(f"{'='*70}")
+    for strategy, row in report.items():
+        print(f"   {strategy:<8} recall {row['recall']:.3f} | "
+              f"trung bình {row['avg_ms']:.2f}ms | p95 {row['p95_ms']:.2f}ms | {row['users']} users")
+    print(f"{'='*70}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,102 @@
-class Product:
-    def __init__(self, pid, name, category, price, stock, sizes, colors, sold_count=0):
-        self.id = pid
-        self.name = name
-        self.category = category
-        self.price = price
-        self.stock = stock
-        self.sizes = sizes
-        self.colors = colors
-        self.sold_count = sold_count
\ No newline at end of file
+from ProductTable import ProductTable
+
+# Bảng chung cho các Product tạo lẻ (không truyền table): mỗi hàng chỉ vài chục byte
+# trong các cột đã cấp phát sẵn, thay vì 1 ProductTable riêng (8 mảng NumPy) mỗi sản phẩm.
+# Hàng không được thu hồi → catalog lớn / tạo lại nhiều lần nên truyền bảng riêng
+_shared_table = None
+
+
+def _default_table() -> ProductTable:
+    global _shared_table
+    if _shared_table is None:
+        _shared_table = ProductTable()
+    return _shared_table
+
+
+class Product:
+    """
+    View __slots__ trỏ vào 1 hàng của ProductTable (thuộc tính đọc/ghi như trước).
+    Không truyền table → dùng bảng chung của module;
+    catalog nên truyền chung 1 bảng để scorer dùng được nguyên cột.
+    """
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, pid, name, category, price, stock, sizes, colors, sold_count=0, table=None):
+        self._table = table if table is not None else _default_table()
+        self._row = self._table.append(pid, name, category, price, stock, sizes, colors, sold_count)
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def id(self):
+        return self._table.ids[self._row]
+
+    @id.setter
+    def id(self, value):
+        self._table.ids[self._row] = value
+
+    @property
+    def name(self):
+        return self._table.names[self._row]
+
+    @name.setter
+    def name(self, value):
+        self._table.names[self._row] = value
+
+    @property
+    def category(self):
+        return self._table.categories[self._table.category[self._row]]
+
+    @category.setter
+    def category(self, value):
+        self._table.category[self._row] = self._table.intern_category(value)
+
+    @property
+    def price(self):
+        return int(self._table.price[self._row])
+
+    @price.setter
+    def price(self, value):
+        self._table.price[self._row] = value
+
+    @property
+    def stock(self):
+        return int(self._table.stock[self._row])
+
+    @stock.setter
+    def stock(self, value):
+        self._table.stock[self._row] = value
+
+    @property
+    def sold_count(self):
+        return int(self._table.sold_count[self._row])
+
+    @sold_count.setter
+    def sold_count(self, value):
+        self._table.set_sold_count(self._row, value)
+
+    @property
+    def sizes(self):
+        return self._table.sizes_of(self._row)
+
+    @sizes.setter
+    def sizes(self, value):
+        self._table.set_sizes(self._row, value)
+
+    @property
+    def colors(self):
+        return self._table.colors_of(self._row)
+
+    @colors.setter
+    def colors(self, value):
+        self._table.set_colors(self._row, value)
+
+    def __repr__(self):
+        return f"Product({self.id!r}, {self.name!r}, {self.category!r}, {self.price})"
\ No newline at end of file
@@ -1,16 +1,190 @@
-class ProductManager:
-    def __init__(self, products=None):
-        self.products = products if products else []
-
-    def search_products(self, keyword):
-        keyword = keyword.lower()
-        return [p for p in self.products if keyword in p.name.lower()]
-
-    def get_top_selling(self, n=10):
-        return sorted(self.products, key=lambda p: p.sold_count, reverse=True)[:n]
-
-    def get_product_by_id(self, pid):
-        for p in self.products:
-            if p.id == pid:
-                return p
-        return None
\ No newline at end of file
+from types import MappingProxyType
+
+import numpy as np
+
+from SearchIndex import SearchIndex
+from Typeahead import PrefixTrie
+from FacetIndex import FacetIndex
+from TopSellingIndex import TopSellingIndex
+
+
+class ProductManager:
+    def __init__(self, products=None):
+        self.products = products if products else []
+        self._listeners = []
+        self._rebuild_indexes()
+
+    def add_listener(self, listener):
+        """
+        Đăng ký nhận thay đổi catalog. listener cần có:
+            on_product_changed(old_name, product) - sản phẩm được thêm (old_name=None),
+                sửa thông tin, hoặc bị xoá (product=None)
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def _notify_product(self, old_name, product):
+        for listener in self._listeners:
+            listener.on_product_changed(old_name, product)
+
+    def _rebuild_indexes(self):
+        # id/tên → Product; trùng khoá → sản phẩm đứng trước thắng (giống duyệt tuần tự)
+        self._by_id = {}
+        self._by_name = {}
+        self._by_category = {}
+        self._search = SearchIndex()
+        self._typeahead = PrefixTrie()
+        self._facets = FacetIndex()
+        self._top = TopSellingIndex()
+        self._category_rows = {}   # category → (sản phẩm, mảng số hàng trong table), tính lười
+        self._table = None
+        self._table_dirty = True
+        for p in self.products:
+            self._index(p)
+
+    def _index(self, p):
+        # sold_count đổi ở bất kỳ đâu (OrderManager, script...) → bảng xếp hạng tự cập nhật
+        p.table.add_listener(self)
+        if self._by_id.setdefault(p.id, p) is p:
+            self._search.add(p)
+            self._typeahead.add(p)
+            self._facets.add(p)
+            self._top.add(p)
+        self._by_name.setdefault(p.name, []).append(p)
+        self._by_category.setdefault(p.category, []).append(p)
+        self._category_rows.pop(p.category, None)
+        self._table_dirty = True
+
+    def _unindex(self, p):
+        if self._by_id.get(p.id) is p:
+            del self._by_id[p.id]
+            self._search.remove(p.id)
+            self._typeahead.remove(p.id)
+            self._facets.remove(p.id)
+            self._top.remove(p.id)
+            # Sản phẩm trùng id (nếu có) đứng sau sẽ thay chỗ
+            for other in self.products:
+                if other.id == p.id and other is not p:
+                    self._by_id[p.id] = other
+                    self._search.add(other)
+                    self._typeahead.add(other)
+                    self._facets.add(other)
+                    self._top.add(other)
+                    break
+        for index, key in ((self._by_name, p.name), (self._by_category, p.category)):
+            bucket = index.get(key, [])
+            if p in bucket:
+                bucket.remove(p)
+                if not bucket:
+                    del index[key]
+        self._category_rows.pop(p.category, None)
+        self._table_dirty = True
+
+    def add_product(self, product):
+        if product.id in self._by_id:
+            return False
+        self.products.append(product)
+        self._index(product)
+        self._notify_product(None, product)
+        return True
+
+    def remove_product(self, pid):
+        product = self._by_id.get(pid)
+        if product is None:
+            return None
+        self.products.remove(product)
+        self._unindex(product)
+        self._notify_product(product.name, None)
+        return product
+
+    def update_product(self, pid, **fields):
+        product = self._by_id.get(pid)
+        if product is None:
+            return None
+        for field in fields:
+            if not hasattr(product, field):
+                raise AttributeError(f"Product không có thuộc tính '{field}'")
+        # Các trường có trong index → gỡ ra, sửa, rồi đánh lại
+        reindex = any(f in fields for f in ("id", "name", "category", "price", "sizes", "colors"))
+        old_name = product.name
+        if reindex:
+            self._unindex(product)
+        for field, value in fields.items():
+            setattr(product, field, value)
+        if reindex:
+            self._index(product)
+            self._notify_product(old_name, product)
+        return product
+
+    def search_products(self, keyword):
+        return self._search.search(keyword)
+
+    def filter_products(self, filters, products=None):
+        """
+        Lọc theo facet: {'category'|'price'|'size'|'color': [giá trị, ...]}
+        Trả về (sản phẩm, số lượng theo từng giá trị facet trên kết quả)
+        """
+        return self._facets.filter(filters, products)
+
+    def resolve_facet_value(self, facet, text):
+        return self._facets.resolve(facet, text)
+
+    def suggest(self, prefix, k=5):
+        return self._typeahead.suggest(prefix, k)
+
+    def on_sold_count_changed(self, table, row):
+        product = self._by_id.get(table.ids[row])
+        if product is not None and product.table is table and product.row == row:
+            self.reindex_product(product)
+
+    def reindex_product(self, product):
+        # Gọi sau khi sold_count thay đổi (bán hàng) để xếp hạng / cache gợi ý luôn đúng
+        if self._by_id.get(product.id) is product:
+            self._typeahead.update(product)
+            self._top.update(product)
+
+    def get_top_selling(self, n=10):
+        return self._top.top(n)
+
+    def get_top_selling_by_category(self, category, n=10):
+        return self._top.top_by_category(category, n)
+
+    @property
+    def table(self):
+        """ProductTable chung của catalog (None nếu sản phẩm nằm ở nhiều bảng khác nhau)"""
+        if self._table_dirty:
+            tables = {id(p.table): p.table for p in self.products}
+            self._table = next(iter(tables.values())) if len(tables) == 1 else None
+            self._table_dirty = False
+        return self._table
+
+    def category_rows(self, category):
+        """(sản phẩm của category, mảng số hàng tương ứng trong self.table) - cùng thứ tự"""
+        cached = self._category_rows.get(category)
+        if cached is None:
+            products = list(self._by_category.get(category, []))
+            rows = np.fromiter((p.row for p in products), dtype=np.int64, count=len(products))
+            cached = self._category_rows[category] = (products, rows)
+        return cached
+
+    def rows_of_names(self, names):
+        """Số hàng của mọi sản phẩm có tên thuộc `names`"""
+        rows = [p.row for name in names for p in self._by_name.get(name, ())]
+        return np.array(rows, dtype=np.int64)
+
+    @property
+    def products_by_id(self):
+        # View chỉ đọc, luôn khớp với index id → Product
+        return MappingProxyType(self._by_id)
+
+    def get_product_by_id(self, pid):
+        return self._by_id.get(pid)
+
+    def get_product_by_name(self, name):
+        bucket = self._by_name.get(name)
+        return bucket[0] if bucket else None
+
+    def get_products_by_category(self, category):
+        return list(self._by_category.get(category, []))
\ No newline at end of file
@@ -0,0 +1,282 @@
+from typing import Dict, List
+import sys
+
+import numpy as np
+
+
+class ProductTable:
+    """
+    Catalog dạng cột (columnar) cho số lượng sản phẩm lớn.
+
+    - price / stock / sold_count: mảng NumPy int64
+    - category: mã int (intern) + bảng categories
+    - sizes / colors: bitmask int64 theo bộ từ vựng (mặc định lấy từ Creatproduct.py,
+      giá trị lạ được thêm vào cuối) + cột int64 thứ tự hiển thị: hạng hoán vị
+      (Lehmer code) của các giá trị so với thứ tự bộ từ vựng, 0 = đúng thứ tự chuẩn
+      → đọc/ghi file trả lại đúng chuỗi ban đầu ("L,XL,M,S") mà không lưu chuỗi.
+      Chỉ chuỗi không phải hoán vị (trùng lặp, khoảng trắng, > MAX_ORDERED giá trị)
+      mới được giữ nguyên văn theo hàng
+    - Product là view __slots__ trỏ vào 1 hàng → code cũ đọc p.price, p.category...
+      vẫn chạy, còn scorer có thể dùng nguyên cột
+    - Listener nhận on_sold_count_changed(table, row) mỗi khi sold_count của 1 hàng
+      đổi qua set_sold_count (ProductManager dùng để giữ bảng xếp hạng bán chạy đúng
+      dù ai là người ghi sold_count)
+    """
+
+    SIZE_VOCAB = ("S", "M", "L", "XL", "XXL")
+    COLOR_VOCAB = ("Đỏ", "Đen", "Trắng", "Xanh", "Vàng", "Xám", "Hồng", "Tím", "Nâu", "Cam")
+    MAX_VOCAB = 63   # số bit dùng được của int64
+    MAX_ORDERED = 20   # 20! < 2^63 → hạng hoán vị của ≤ 20 giá trị vừa 1 ô int64
+
+    _COLUMNS = (
+        "category", "price", "stock", "sold_count",
+        "size_mask", "color_mask", "size_order", "color_order",
+    )
+
+    def __init__(self, capacity: int = 256):
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        self.category_ids: Dict[str, int] = {}
+        self.sizes_vocab: List[str] = list(self.SIZE_VOCAB)
+        self.colors_vocab: List[str] = list(self.COLOR_VOCAB)
+        self._size_bits = {v: i for i, v in enumerate(self.sizes_vocab)}
+        self._color_bits = {v: i for i, v in enumerate(self.colors_vocab)}
+        # hàng → chuỗi gốc, chỉ khi không biểu diễn được bằng mask + hạng hoán vị
+        self._size_text: Dict[int, str] = {}
+        self._color_text: Dict[int, str] = {}
+
+        self.category = np.zeros(capacity, dtype=np.int32)
+        self.price = np.zeros(capacity, dtype=np.int64)
+        self.stock = np.zeros(capacity, dtype=np.int64)
+        self.sold_count = np.zeros(capacity, dtype=np.int64)
+        self.size_mask = np.zeros(capacity, dtype=np.int64)
+        self.color_mask = np.zeros(capacity, dtype=np.int64)
+        self.size_order = np.zeros(capacity, dtype=np.int64)
+        self.color_order = np.zeros(capacity, dtype=np.int64)
+        self._listeners: List = []
+
+    def add_listener(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def set_sold_count(self, row: int, value: int):
+        old = int(self.sold_count[row])
+        self.sold_count[row] = value
+        if int(self.sold_count[row]) != old:
+            for listener in list(self._listeners):
+                listener.on_sold_count_changed(self, row)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def capacity(self) -> int:
+        return len(self.price)
+
+    def _grow(self):
+        capacity = max(256, 2 * self.capacity)
+        for column in self._COLUMNS:
+            old = getattr(self, column)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def intern_category(self, category: str) -> int:
+        code = self.category_ids.get(category)
+        if code is None:
+            code = self.category_ids[category] = len(self.categories)
+            self.categories.append(category)
+        return code
+
+    @staticmethod
+    def _encode(value, vocab: List[str], bits: Dict[str, int]) -> int:
+        if not isinstance(value, str):
+            return 0
+        mask = 0
+        for item in value.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            bit = bits.get(item)
+            if bit is None:
+                if len(vocab) >= ProductTable.MAX_VOCAB:
+                    raise ValueError(f"Quá {ProductTable.MAX_VOCAB} giá trị khác nhau: {item}")
+                bit = bits[item] = len(vocab)
+                vocab.append(item)
+            mask |= 1 << bit
+        return mask
+
+    @staticmethod
+    def _decode(mask: int, vocab: List[str]) -> str:
+        return ",".join(v for i, v in enumerate(vocab) if mask >> i & 1)
+
+    def encode_sizes(self, sizes) -> int:
+        return self._encode(sizes, self.sizes_vocab, self._size_bits)
+
+    def encode_colors(self, colors) -> int:
+        return self._encode(colors, self.colors_vocab, self._color_bits)
+
+    def decode_sizes(self, mask: int) -> str:
+        return self._decode(mask, self.sizes_vocab)
+
+    def decode_colors(self, mask: int) -> str:
+        return self._decode(mask, self.colors_vocab)
+
+    @staticmethod
+    def _order_rank(bits: List[int]) -> int:
+        """Hạng hoán vị (cơ số hỗn hợp k, k-1, ..., 1) của thứ tự bits so với thứ tự tăng dần"""
+        remaining = sorted(bits)
+        rank = 0
+        for bit in bits:
+            i = remaining.index(bit)
+            rank = rank * len(remaining) + i
+            remaining.pop(i)
+        return rank
+
+    @staticmethod
+    def _ordered_bits(mask: int, rank: int) -> List[int]:
+        """Ngược của _order_rank: các bit của mask theo thứ tự hiển thị"""
+        remaining = [i for i in range(mask.bit_length()) if mask >> i & 1]
+        digits = []
+        for radix in range(1, len(remaining) + 1):
+            rank, digit = divmod(rank, radix)
+            digits.append(digit)
+        return [remaining.pop(d) for d in reversed(digits)]
+
+    def _set_list(self, row: int, value, vocab: List[str], bits: Dict[str, int],
+                  masks: np.ndarray, orders: np.ndarray, texts: Dict[int, str]):
+        masks[row] = mask = self._encode(value, vocab, bits)
+        orders[row] = 0
+        texts.pop(row, None)
+        if not isinstance(value, str) or value == self._decode(mask, vocab):
+            return
+        items = value.split(",")
+        if len(items) == bin(mask).count("1") <= self.MAX_ORDERED and all(i in bits for i in items):
+            orders[row] = self._order_rank([bits[i] for i in items])
+        else:
+            texts[row] = value
+
+    def _list_of(self, row: int, vocab: List[str], masks: np.ndarray, orders: np.ndarray,
+                 texts: Dict[int, str]) -> str:
+        text = texts.get(row)
+        if text is not None:
+            return text
+        mask, rank = int(masks[row]), int(orders[row])
+        if not rank:
+            return self._decode(mask, vocab)
+        return ",".join(vocab[i] for i in self._ordered_bits(mask, rank))
+
+    def set_sizes(self, row: int, sizes):
+        self._set_list(row, sizes, self.sizes_vocab, self._size_bits,
+                       self.size_mask, self.size_order, self._size_text)
+
+    def set_colors(self, row: int, colors):
+        self._set_list(row, colors, self.colors_vocab, self._color_bits,
+                       self.color_mask, self.color_order, self._color_text)
+
+    def sizes_of(self, row: int) -> str:
+        """Chuỗi sizes như lúc ghi vào (lọc facet dùng size_mask)"""
+        return self._list_of(row, self.sizes_vocab, self.size_mask, self.size_order, self._size_text)
+
+    def colors_of(self, row: int) -> str:
+        return self._list_of(row, self.colors_vocab, self.color_mask, self.color_order, self._color_text)
+
+    def append(self, pid, name, category, price, stock, sizes, colors, sold_count=0) -> int:
+        """Thêm 1 hàng, trả về số hàng"""
+        row = len(self.ids)
+        if row >= self.capacity:
+            self._grow()
+
+        self.ids.append(pid)
+        self.names.append(name)
+        self.category[row] = self.intern_category(category)
+        self.price[row] = price
+        self.stock[row] = stock
+        self.sold_count[row] = sold_count
+        self.set_sizes(row, sizes)
+        self.set_colors(row, colors)
+        return row
+
+    def column(self, name: str) -> np.ndarray:
+        """Cột đã cắt đúng số hàng (view, không copy)"""
+        return getattr(self, name)[:len(self.ids)]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Số byte: mảng cột (theo số hàng thực) + danh sách id/tên/bộ từ vựng"""
+        n = len(self.ids)
+        arrays = sum(getattr(self, c).itemsize * n for c in self._COLUMNS)
+        strings = (
+            sys.getsizeof(self.ids) + sys.getsizeof(self.names)
+            + sum(sys.getsizeof(s) for s in self.ids) + sum(sys.getsizeof(s) for s in self.names)
+            + sum(sys.getsizeof(s) for s in self.categories)
+            + sum(sys.getsizeof(s) for s in self._size_text.values())
+            + sum(sys.getsizeof(s) for s in self._color_text.values())
+        )
+        return {"arrays": arrays, "strings": strings, "total": arrays + strings}
+
+
+if __name__ == "__main__":
+    # Báo cáo bộ nhớ: 100k sản phẩm, object có __dict__ (cũ) vs ProductTable + view __slots__
+    import random
+    import tracemalloc
+
+    from Product import Product
+
+    class _DictProduct:
+        def __init__(self, pid, name, category, price, stock, sizes, colors, sold_count=0):
+            self.id = pid
+            self.name = name
+            self.category = category
+            self.price = price
+            self.stock = stock
+            self.sizes = sizes
+            self.colors = colors
+            self.sold_count = sold_count
+
+    N = 100_000
+    categories = ["Áo", "Quần", "Giày", "Mũ", "Phụ kiện"]
+
+    def generate_rows():
+        # Tạo lại chuỗi mỗi lần (như đọc từ Excel) → cả 2 cách đều trả giá chuỗi id/tên
+        random.seed(0)
+        for i in range(N):
+            yield (
+                f"P{i:06d}",
+                f"Sản phẩm {i}",
+                random.choice(categories),
+                random.randint(2, 40) * 50000,
+                random.randint(10, 100),
+                ",".join(random.sample(ProductTable.SIZE_VOCAB, random.randint(1, 5))),
+                ",".join(random.sample(ProductTable.COLOR_VOCAB, random.randint(1, 10))),
+                random.randint(0, 500),
+            )
+
+    def measure(build):
+        tracemalloc.start()
+        objects = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return objects, current
+
+    dict_products, before = measure(lambda: [_DictProduct(*r) for r in generate_rows()])
+    del dict_products
+
+    def build_table():
+        table = ProductTable(capacity=N)
+        return table, [Product(*r, table=table) for r in generate_rows()]
+
+    (table, products), after = measure(build_table)
+
+    print(f"\n{'='*70}")
+    print(f"💾 BỘ NHỚ CATALOG ({N:,} sản phẩm)")
+    print(f"{'='*70}")
+    print(f"   Object __dict__     : {before / 1024 / 1024:>8.1f} MB")
+    print(f"   ProductTable + view : {after / 1024 / 1024:>8.1f} MB "
+          f"(cột NumPy {table.memory_usage()['arrays'] / 1024 / 1024:.1f} MB)")
+    print(f"   Tiết kiệm           : {before / after:>8.1f}x")
+    print(f"{'='*70}\n")
\ No newline at end of file
@@ -1,515 +1,986 @@
-from typing import Dict, List, Tuple, Set, Optional
-from collections import defaultdict
-import random
-
-
-class Recommendation:
-    """
-    HỆ THỐNG ĐỀ XUẤT TỐI ƯU - Phiên bản cuối cùng
-    
-    CHIẾN LƯỢC 3 TẦNG:
-    1. WARM Products (1-3): Sản phẩm đã tương tác - chưa mua (Conversion 15-40%)
-    2. COLLABORATIVE (4-7): Từ users tương tự (Conversion 8-15%)
-    3. DISCOVERY (8-10): Content-Based + Popularity (Conversion 3-8%)
-    
-    CẢI TIẾN:
-    - ✅ Đề xuất lại sản phẩm đã view/like/cart (chỉ loại đã mua)
-    - ✅ Boost điểm cho sản phẩm WARM
-    - ✅ Scoring thông minh (category + popularity + price similarity)
-    - ✅ KHÔNG random - sắp xếp theo chất lượng
-    - ✅ Phân tầng rõ ràng với tag nguồn gốc
-    """
-    
-    def __init__(self, graph_data: Dict, product_manager):
-        self.user_to_products = graph_data['user_to_products']
-        self.product_to_users = graph_data['product_to_users']
-        self.all_users = graph_data['users']
-        self.all_products = graph_data['products']
-        self.product_manager = product_manager
-        
-        # Tham số tối ưu
-        self.WARM_BOOST = 1.5           # Boost 50% cho sản phẩm đã tương tác
-        self.CATEGORY_WEIGHT = 0.6      # 60% từ category score
-        self.POPULARITY_WEIGHT = 0.3    # 30% từ popularity
-        self.PRICE_SIMILARITY_WEIGHT = 0.1  # 10% từ price similarity
-        
-        print(f"✅ Recommendation TỐI ƯU khởi tạo:")
-        print(f"   - {len(self.all_users)} users")
-        print(f"   - {len(self.all_products)} products trong đồ thị")
-        print(f"   - {len(self.product_manager.products)} products trong database")
-    
-    def get_recommendations(
-        self,
-        username: str,
-        top_n: int = 10,
-        purchased_products: Optional[Set[str]] = None
-    ) -> List[Tuple[str, float, str]]:
-        """
-        Lấy đề xuất TỐI ƯU với phân tầng rõ ràng
-        
-        Returns:
-            List[(product_name, score, source_tag)]
-            source_tag: "WARM" | "COLLAB" | "CONTENT" | "POPULAR"
-        """
-        if purchased_products is None:
-            purchased_products = set()
-        
-        print(f"\n{'='*70}")
-        print(f"🎯 ĐỀ XUẤT TỐI ƯU CHO USER: {username}")
-        print(f"{'='*70}")
-        
-        # Kiểm tra user
-        if username not in self.user_to_products:
-            print(f"⚠️ User mới → Dùng Popularity")
-            results = self._get_popularity_recommendations(top_n, purchased_products)
-            return [(p, s, "POPULAR") for p, s in results]
-        
-        # ========================================
-        # TẦNG 1: WARM Products (Đã tương tác - Chưa mua)
-        # ========================================
-        print(f"\n🔹 TẦNG 1: WARM Products (Đã tương tác - Chưa mua)")
-        warm_results = self._get_warm_recommendations(username, purchased_products)
-        print(f"   ✅ {len(warm_results)} sản phẩm WARM")
-        
-        used_products = {p for p, _, _ in warm_results}
-        
-        # ========================================
-        # TẦNG 2: Collaborative Filtering
-        # ========================================
-        print(f"\n🔹 TẦNG 2: Collaborative Filtering")
-        collab_results = self._collaborative_filtering_optimized(
-            username, 
-            purchased_products | used_products
-        )
-        print(f"   ✅ {len(collab_results)} sản phẩm từ Collaborative")
-        
-        used_products.update(p for p, _, _ in collab_results)
-        
-        # ========================================
-        # TẦNG 3: Discovery (Content + Popularity)
-        # ========================================
-        print(f"\n🔹 TẦNG 3: Discovery (Content-Based + Popularity)")
-        discovery_results = self._get_discovery_recommendations(
-            username,
-            purchased_products | used_products
-        )
-        print(f"   ✅ {len(discovery_results)} sản phẩm khám phá")
-        
-        # ========================================
-        # Kết hợp và cân bằng
-        # ========================================
-        final_results = self._balance_recommendations(
-            warm_results,
-            collab_results,
-            discovery_results,
-            top_n
-        )
-        
-        print(f"\n✅ TỔNG: {len(final_results)} sản phẩm đề xuất")
-        print(f"   - WARM: {sum(1 for _, _, t in final_results if t == 'WARM')}")
-        print(f"   - COLLAB: {sum(1 for _, _, t in final_results if t == 'COLLAB')}")
-        print(f"   - CONTENT: {sum(1 for _, _, t in final_results if t == 'CONTENT')}")
-        print(f"   - POPULAR: {sum(1 for _, _, t in final_results if t == 'POPULAR')}")
-        print(f"{'='*70}\n")
-        
-        return final_results
-    
-    def _get_warm_recommendations(
-        self,
-        username: str,
-        exclude: Set[str]
-    ) -> List[Tuple[str, float, str]]:
-        """
-        TẦNG 1: Sản phẩm WARM (Đã tương tác - Chưa mua)
-        
-        Ưu tiên:
-        - Cart (0.775) → Conversion rate 40%
-        - Like (0.575) → Conversion rate 15%
-        - View (0.375) → Conversion rate 8%
-        
-        Boost điểm 50% để ưu tiên cao
-        """
-        user_products = self.user_to_products[username]
-        
-        warm_products = []
-        for product, weight in user_products.items():
-            # Chỉ loại sản phẩm ĐÃ MUA (không loại view/like/cart)
-            if product not in exclude:
-                # BOOST điểm 50%
-                boosted_score = weight * self.WARM_BOOST
-                warm_products.append((product, boosted_score, "WARM"))
-        
-        # Sắp xếp theo điểm (cao → thấp)
-        warm_products.sort(key=lambda x: x[1], reverse=True)
-        
-        return warm_products[:3]  # Chỉ lấy top 3
-    
-    def _collaborative_filtering_optimized(
-        self,
-        username: str,
-        exclude: Set[str]
-    ) -> List[Tuple[str, float, str]]:
-        """
-        TẦNG 2: Collaborative Filtering có tối ưu
-        
-        Cải tiến:
-        - Tính user confidence (users mua nhiều → đáng tin hơn)
-        - Tính nhiều con đường
-        """
-        user_products = self.user_to_products[username]
-        candidate_scores = defaultdict(float)
-        similar_users = set()
-        
-        # Duyệt qua các sản phẩm user đã tương tác
-        for product_a, weight_ua in user_products.items():
-            if product_a not in self.product_to_users:
-                continue
-            
-            other_users = self.product_to_users[product_a]
-            
-            for other_user, weight_other in other_users.items():
-                if other_user == username:
-                    continue
-                
-                similar_users.add(other_user)
-                
-                # Tính similarity
-                similarity = min(weight_ua, weight_other)
-                
-                # Tính user confidence (users mua nhiều → tin hơn)
-                user_confidence = self._get_user_confidence(other_user)
-                
-                # Lấy sản phẩm của other_user
-                if other_user not in self.user_to_products:
-                    continue
-                
-                other_user_products = self.user_to_products[other_user]
-                
-                for product_b, weight_b in other_user_products.items():
-                    if product_b in exclude:
-                        continue
-                    
-                    # Tính điểm CÓ user confidence
-                    score = similarity * weight_b * user_confidence
-                    candidate_scores[product_b] += score
-        
-        if similar_users:
-            print(f"   👥 {len(similar_users)} users tương tự")
-        
-        # Sắp xếp
-        sorted_candidates = sorted(
-            candidate_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
-        return [(p, s, "COLLAB") for p, s in sorted_candidates[:5]]  # Top 5
-    
-    def _get_user_confidence(self, username: str) -> float:
-        """
-        Tính độ tin cậy của user
-        
-        Users mua nhiều → đề xuất đáng tin hơn
-        Users chỉ view → ít tin hơn
-        """
-        if username not in self.user_to_products:
-            return 1.0
-        
-        user_products = self.user_to_products[username]
-        
-        # Đếm số lượng purchase
-        purchase_count = 0
-        for product, weight in user_products.items():
-            if weight >= 0.9:  # Purchase weight ≈ 0.975
-                purchase_count += 1
-        
-        # Tính confidence
-        if purchase_count >= 5:
-            return 1.5  # Heavy buyer: +50%
-        elif purchase_count >= 2:
-            return 1.2  # Regular buyer: +20%
-        else:
-            return 1.0  # Window shopper: normal
-    
-    def _get_discovery_recommendations(
-        self,
-        username: str,
-        exclude: Set[str]
-    ) -> List[Tuple[str, float, str]]:
-        """
-        TẦNG 3: Discovery (Content-Based + Popularity)
-        
-        Ưu tiên Content-Based, fallback sang Popularity
-        """
-        # Thử Content-Based trước
-        content_results = self._content_based_filtering_optimized(username, exclude)
-        
-        if len(content_results) >= 3:
-            return content_results[:3]
-        
-        # Nếu không đủ, thêm Popularity
-        popularity_results = self._get_popularity_recommendations(5, exclude)
-        popularity_tagged = [(p, s, "POPULAR") for p, s in popularity_results]
-        
-        # Kết hợp
-        combined = content_results + popularity_tagged
-        
-        # Loại trùng
-        seen = set()
-        unique = []
-        for p, s, t in combined:
-            if p not in seen:
-                seen.add(p)
-                unique.append((p, s, t))
-        
-        return unique[:3]
-    
-    def _content_based_filtering_optimized(
-        self,
-        username: str,
-        exclude: Set[str]
-    ) -> List[Tuple[str, float, str]]:
-        """
-        Content-Based CẢI TIẾN:
-        
-        KHÔNG random - Tính điểm kết hợp:
-        1. Category score (60%)
-        2. Popularity score (30%)
-        3. Price similarity (10%)
-        """
-        user_products = self.user_to_products[username]
-        
-        # Đếm category
-        category_scores = defaultdict(float)
-        for product_name, weight in user_products.items():
-            product_obj = self._find_product_by_name(product_name)
-            if product_obj:
-                category_scores[product_obj.category] += weight
-        
-        if not category_scores:
-            return []
-        
-        # Top categories
-        top_categories = sorted(
-            category_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:2]  # Chỉ lấy 2 category ưa thích nhất
-        
-        print(f"   📂 Top categories: {[cat for cat, _ in top_categories]}")
-        
-        # Tính giá trung bình user quan tâm
-        avg_price = self._get_user_avg_price(username)
-        
-        recommendations = []
-        
-        for category, cat_score in top_categories:
-            # Lấy sản phẩm cùng category
-            category_products = [
-                p for p in self.product_manager.products
-                if p.category == category and p.name not in exclude
-            ]
-            
-            # TÍNH ĐIỂM KẾT HỢP (KHÔNG random!)
-            scored_products = []
-            for product in category_products:
-                # 1. Category score (60%)
-                base_score = cat_score * self.CATEGORY_WEIGHT
-                
-                # 2. Popularity score (30%)
-                # Normalize: 500 sold = max
-                popularity = min(1.0, product.sold_count / 500)
-                popularity_score = popularity * self.POPULARITY_WEIGHT
-                
-                # 3. Price similarity (10%)
-                if avg_price > 0:
-                    price_diff = abs(product.price - avg_price) / avg_price
-                    price_similarity = 1 - min(1.0, price_diff)
-                else:
-                    price_similarity = 0.5
-                
-                price_score = price_similarity * self.PRICE_SIMILARITY_WEIGHT
-                
-                # Tổng điểm
-                final_score = base_score + popularity_score + price_score
-                scored_products.append((product, final_score))
-            
-            # SẮP XẾP theo điểm (KHÔNG random!)
-            scored_products.sort(key=lambda x: x[1], reverse=True)
-            
-            # Lấy top 5 mỗi category
-            for product, score in scored_products[:5]:
-                recommendations.append((product.name, score, "CONTENT"))
-        
-        # Sắp xếp tổng thể
-        recommendations.sort(key=lambda x: x[1], reverse=True)
-        
-        return recommendations
-    
-    def _get_user_avg_price(self, username: str) -> float:
-        """Tính giá trung bình sản phẩm user quan tâm"""
-        user_products = self.user_to_products.get(username, {})
-        if not user_products:
-            return 500000  # Default
-        
-        prices = []
-        for product_name in user_products.keys():
-            product = self._find_product_by_name(product_name)
-            if product:
-                prices.append(product.price)
-        
-        return sum(prices) / len(prices) if prices else 500000
-    
-    def _get_popularity_recommendations(
-        self,
-        top_n: int,
-        exclude: Set[str]
-    ) -> List[Tuple[str, float]]:
-        """Popularity-Based fallback"""
-        top_selling = self.product_manager.get_top_selling(50)
-        
-        recommendations = []
-        for product in top_selling:
-            if product.name not in exclude:
-                score = min(0.3, product.sold_count / 2000)
-                recommendations.append((product.name, score))
-        
-        return recommendations[:top_n]
-    
-    def _balance_recommendations(
-        self,
-        warm: List[Tuple[str, float, str]],
-        collab: List[Tuple[str, float, str]],
-        discovery: List[Tuple[str, float, str]],
-        top_n: int
-    ) -> List[Tuple[str, float, str]]:
-        """
-        Cân bằng đề xuất theo chiến lược 3 tầng
-        
-        Mục tiêu:
-        - Vị trí 1-3: WARM (nếu có)
-        - Vị trí 4-7: COLLAB (nếu có)
-        - Vị trí 8-10: DISCOVERY
-        """
-        final = []
-        
-        # TẦNG 1: WARM (tối đa 3)
-        final.extend(warm[:3])
-        
-        # TẦNG 2: COLLAB (tối đa 5, điền đủ top_n nếu thiếu)
-        remaining = top_n - len(final)
-        if remaining > 0:
-            final.extend(collab[:min(5, remaining)])
-        
-        # TẦNG 3: DISCOVERY (điền cho đủ)
-        remaining = top_n - len(final)
-        if remaining > 0:
-            final.extend(discovery[:remaining])
-        
-        return final[:top_n]
-    
-    def _find_product_by_name(self, product_name: str):
-        """Tìm product object từ tên"""
-        for p in self.product_manager.products:
-            if p.name == product_name:
-                return p
-        return None
-    
-    def explain_recommendation(self, username: str, product_name: str) -> str:
-        """
-        Giải thích CẢI TIẾN - Có tag nguồn gốc
-        """
-        if username not in self.user_to_products:
-            return f"❌ User '{username}' chưa có tương tác"
-        
-        explanation = []
-        explanation.append(f"\n{'='*70}")
-        explanation.append(f"📊 GIẢI THÍCH: Tại sao đề xuất '{product_name}'?")
-        explanation.append(f"{'='*70}\n")
-        
-        user_products = self.user_to_products[username]
-        
-        # Kiểm tra WARM
-        if product_name in user_products:
-            weight = user_products[product_name]
-            interaction_type = self._guess_interaction_type(weight)
-            explanation.append(f"🔥 WARM Product (Bạn đã tương tác)")
-            explanation.append(f"   ✓ Bạn đã {interaction_type} sản phẩm này")
-            explanation.append(f"   ✓ Điểm gốc: {weight:.3f}")
-            explanation.append(f"   ✓ Điểm sau boost (+50%): {weight * 1.5:.3f}")
-            explanation.append(f"   💡 Nhắc nhở: Bạn quan tâm nhưng chưa mua!")
-            explanation.append("")
-        
-        # Kiểm tra Collaborative
-        collab_score = 0.0
-        collab_paths = []
-        
-        for product_a, weight_ua in user_products.items():
-            if product_a in self.product_to_users:
-                other_users = self.product_to_users[product_a]
-                
-                for other_user, weight_other in other_users.items():
-                    if other_user == username:
-                        continue
-                    
-                    similarity = min(weight_ua, weight_other)
-                    confidence = self._get_user_confidence(other_user)
-                    
-                    if other_user in self.user_to_products:
-                        other_products = self.user_to_products[other_user]
-                        
-                        if product_name in other_products:
-                            score = similarity * other_products[product_name] * confidence
-                            collab_score += score
-                            
-                            confidence_label = "Heavy buyer" if confidence >= 1.5 else "Regular buyer" if confidence >= 1.2 else "User"
-                            
-                            collab_paths.append(
-                                f"  ✓ {confidence_label} '{other_user}' (tương tự qua '{product_a}') "
-                                f"→ '{product_name}' (+{score:.3f})"
-                            )
-        
-        if collab_score > 0:
-            explanation.append(f"🤝 Collaborative Score: {collab_score:.3f}")
-            for path in collab_paths[:5]:
-                explanation.append(path)
-            explanation.append("")
-        
-        # Kiểm tra Content-Based
-        product_obj = self._find_product_by_name(product_name)
-        if product_obj:
-            user_same_category = [
-                p for p in user_products.keys()
-                if self._find_product_by_name(p) and 
-                   self._find_product_by_name(p).category == product_obj.category
-            ]
-            
-            if user_same_category and product_name not in user_products:
-                explanation.append(f"📂 Content-Based: Category '{product_obj.category}'")
-                explanation.append(f"  ✓ Bạn quan tâm đến {len(user_same_category)} sản phẩm cùng category")
-                explanation.append(f"  ✓ Popularity: {product_obj.sold_count} đã bán")
-                
-                avg_price = self._get_user_avg_price(username)
-                price_diff_pct = abs(product_obj.price - avg_price) / avg_price * 100
-                explanation.append(f"  ✓ Giá phù hợp: {product_obj.price:,}đ (chênh {price_diff_pct:.0f}% so với sở thích)")
-                explanation.append("")
-        
-        if not collab_score and product_name not in user_products:
-            explanation.append("⭐ Sản phẩm phổ biến (Top bán chạy)")
-        
-        explanation.append(f"{'='*70}")
-        
-        return "\n".join(explanation)
-    
-    def _guess_interaction_type(self, weight: float) -> str:
-        """Đoán loại tương tác từ weight"""
-        if weight >= 0.9:
-            return "MUA"
-        elif weight >= 0.7:
-            return "THÊM VÀO GIỎ"
-        elif weight >= 0.5:
-            return "THÍCH"
-        elif weight >= 0.3:
-            return "XEM"
-        else:
+from typing import Dict, List, Tuple, Set, Optional
+from collections import defaultdict
+import random
+import time
+
+import numpy as np
+
+from SparseGraph import SparseGraph
+from VectorizedCF import VectorizedCF
+from GraphTraversal import WeightedBFS
+from PersonalizedPageRank import PersonalizedPageRank
+
+# "tiered": pipeline 3 tầng; "ppr" / "ppr_mc": Personalized PageRank (lặp luỹ thừa / Monte Carlo)
+STRATEGIES = ("tiered", "ppr", "ppr_mc")
+
+
+class Recommendation:
+    """
+    HỆ THỐNG ĐỀ XUẤT TỐI ƯU - Phiên bản cuối cùng
+    
+    CHIẾN LƯỢC 3 TẦNG:
+    1. WARM Products (1-3): Sản phẩm đã tương tác - chưa mua (Conversion 15-40%)
+    2. COLLABORATIVE (4-7): Từ users tương tự (Conversion 8-15%)
+    3. DISCOVERY (8-10): Content-Based + Popularity (Conversion 3-8%)
+    
+    CẢI TIẾN:
+    - ✅ Đề xuất lại sản phẩm đã view/like/cart (chỉ loại đã mua)
+    - ✅ Boost điểm cho sản phẩm WARM
+    - ✅ Scoring thông minh (category + popularity + price similarity)
+    - ✅ KHÔNG random - sắp xếp theo chất lượng
+    - ✅ Phân tầng rõ ràng với tag nguồn gốc
+    """
+    
+    def __init__(
+        self,
+        graph_data,
+        product_manager,
+        profile_store=None,
+        cache=None,
+        verbose: bool = True,
+        collab_model=None,
+        neighbor_index=None,
+        traversal=None,
+        ppr=None
+    ):
+        """
+        graph_data: dict của GraphEngine.build_graph() / InteractionGraph,
+                    hoặc SparseGraph (dạng CSR gọn)
+        profile_store: UserProfileStore (tuỳ chọn) - category affinity, giá trung bình,
+                       confidence đã tính sẵn thay vì quét lại mỗi request
+        cache: RecommendationCache (tuỳ chọn) - trả lại kết quả cũ nếu user chưa có gì mới
+        verbose: False → không in log từng bước (chạy batch)
+        collab_model: ImplicitALS (tuỳ chọn) - tầng COLLAB lấy từ embeddings đã train
+                      (tích vô hướng + argpartition) thay vì duyệt đồ thị mỗi request
+        neighbor_index: UserLSH (tuỳ chọn) - CF chỉ tính trên users ứng viên của LSH
+                        thay vì mọi user có chung sản phẩm
+        traversal: WeightedBFS.attach(graph) (tuỳ chọn) - weighted_bfs dùng lại cache
+                   cạnh của node giữa các request thay vì dựng WeightedBFS mới mỗi lần
+        ppr: PersonalizedPageRank.attach(graph) (tuỳ chọn) - strategy PPR dùng chung 1 snapshot
+             cấp ứng dụng (làm mới theo sự kiện của đồ thị) thay vì dựng lại O(E) mỗi instance
+        """
+        self.verbose = verbose
+        
+        # SparseGraph → dùng các view dạng dict, scorer không cần thay đổi
+        self.sparse_graph = graph_data if isinstance(graph_data, SparseGraph) else None
+        self._vectorized_cf = None
+        if self.sparse_graph is not None:
+            graph_data = self.sparse_graph.as_graph_data()
+            self._vectorized_cf = VectorizedCF(self.sparse_graph)
+        self._ppr = ppr
+        
+        self.user_to_products = graph_data['user_to_products']
+        self.product_to_users = graph_data['product_to_users']
+        self.all_users = graph_data['users']
+        self.all_products = graph_data['products']
+        self.product_manager = product_manager
+        self.profile_store = profile_store
+        self.cache = cache
+        self.collab_model = collab_model
+        self.neighbor_index = neighbor_index
+        self.traversal = traversal
+        
+        # Trạng thái từng tầng của lần get_recommendations gần nhất (theo dõi suy giảm khi quá tải):
+        # {"deadline_ms", "elapsed_ms", "cached", "tiers": {tầng: "completed" | "truncated" | "skipped"}}
+        self.last_tier_status: Dict = {"deadline_ms": None, "elapsed_ms": 0.0, "cached": False, "tiers": {}}
+        
+        # Tham số tối ưu
+        self.WARM_BOOST = 1.5           # Boost 50% cho sản phẩm đã tương tác
+        self.CATEGORY_WEIGHT = 0.6      # 60% từ category score
+        self.POPULARITY_WEIGHT = 0.3    # 30% từ popularity
+        self.PRICE_SIMILARITY_WEIGHT = 0.1  # 10% từ price similarity
+        
+        self._log(f"✅ Recommendation TỐI ƯU khởi tạo:")
+        self._log(f"   - {len(self.all_users)} users")
+        self._log(f"   - {len(self.all_products)} products trong đồ thị")
+        self._log(f"   - {len(self.product_manager.products)} products trong database")
+    
+    def _log(self, message: str = ""):
+        if self.verbose:
+            print(message)
+    
+    def get_recommendations(
+        self,
+        username: str,
+        top_n: int = 10,
+        purchased_products: Optional[Set[str]] = None,
+        strategy: str = "tiered",
+        deadline_ms: Optional[float] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Lấy đề xuất TỐI ƯU với phân tầng rõ ràng
+        
+        strategy: "tiered" (mặc định) | "ppr" | "ppr_mc" - xem STRATEGIES
+        deadline_ms: ngân sách thời gian cho strategy "tiered" (None = không giới hạn).
+                     Chạy tầng rẻ trước: WARM → POPULAR → CONTENT → COLLAB; hết giờ thì
+                     bỏ qua tầng còn lại, CF dừng giữa chừng và trả top-k tạm thời.
+                     Kịp giờ → kết quả giống hệt khi không có deadline.
+                     Trạng thái từng tầng ghi ở self.last_tier_status
+        
+        Returns:
+            List[(product_name, score, source_tag)]
+            source_tag: "WARM" | "COLLAB" | "CONTENT" | "POPULAR" | "PPR"
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy phải là một trong {STRATEGIES}")
+        if purchased_products is None:
+            purchased_products = set()
+        
+        start = time.perf_counter()
+        deadline = None if deadline_ms is None else start + deadline_ms / 1000
+        self.last_tier_status = {"deadline_ms": deadline_ms, "elapsed_ms": 0.0, "cached": False, "tiers": {}}
+        
+        if self.cache is None:
+            results = self._compute_recommendations(username, top_n, purchased_products, strategy, deadline)
+        else:
+            key = self.cache.make_key(username, top_n, purchased_products, strategy)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._log(f"\n⚡ Dùng lại {len(cached)} đề xuất đã cache cho {username}")
+                self.last_tier_status["cached"] = True
+                self.last_tier_status["elapsed_ms"] = (time.perf_counter() - start) * 1000
+                return cached
+            
+            results = self._compute_recommendations(username, top_n, purchased_products, strategy, deadline)
+            # Kết quả bị cắt do hết giờ không được cache (lần sau còn cơ hội tính đủ)
+            if all(status == "completed" for status in self.last_tier_status["tiers"].values()):
+                self.cache.put(key, results)
+        
+        self.last_tier_status["elapsed_ms"] = (time.perf_counter() - start) * 1000
+        return results
+    
+    def _mark_tier(self, tier: str, status: str):
+        """Ghi trạng thái 1 tầng; lần ghi đầu tiên được giữ (tầng tự ghi "truncated" trước khi trả về)"""
+        self.last_tier_status["tiers"].setdefault(tier, status)
+    
+    @staticmethod
+    def _expired(deadline: Optional[float]) -> bool:
+        return deadline is not None and time.perf_counter() >= deadline
+    
+    def _compute_recommendations(
+        self,
+        username: str,
+        top_n: int,
+        purchased_products: Set[str],
+        strategy: str = "tiered",
+        deadline: Optional[float] = None
+    ) -> List[Tuple[str, float, str]]:
+        """Chạy đủ pipeline 3 tầng (không qua cache); deadline: mốc time.perf_counter()"""
+        self._log(f"\n{'='*70}")
+        self._log(f"🎯 ĐỀ XUẤT TỐI ƯU CHO USER: {username}")
+        self._log(f"{'='*70}")
+        
+        # Kiểm tra user
+        if username not in self.user_to_products:
+            self._log(f"⚠️ User mới → Dùng Popularity")
+            # Đồ thị chưa có user nhưng profile (cập nhật theo sự kiện) có thể đã có category
+            results = self._get_profile_popularity(username, top_n, purchased_products)
+            self._mark_tier("POPULAR", "completed")
+            return [(p, s, "POPULAR") for p, s in results]
+        
+        if strategy != "tiered":
+            results = self._get_ppr_recommendations(username, top_n, purchased_products, strategy)
+            self._mark_tier("PPR", "completed")
+            return results
+        
+        if deadline is not None:
+            return self._compute_anytime(username, top_n, purchased_products, deadline)
+        
+        # ========================================
+        # TẦNG 1: WARM Products (Đã tương tác - Chưa mua)
+        # ========================================
+        self._log(f"\n🔹 TẦNG 1: WARM Products (Đã tương tác - Chưa mua)")
+        warm_results = self._get_warm_recommendations(username, purchased_products)
+        self._log(f"   ✅ {len(warm_results)} sản phẩm WARM")
+        
+        used_products = {p for p, _, _ in warm_results}
+        
+        # ========================================
+        # TẦNG 2: Collaborative Filtering
+        # ========================================
+        self._log(f"\n🔹 TẦNG 2: Collaborative Filtering")
+        collab_results = self._collaborative_filtering_optimized(
+            username, 
+            purchased_products | used_products
+        )
+        self._log(f"   ✅ {len(collab_results)} sản phẩm từ Collaborative")
+        
+        used_products.update(p for p, _, _ in collab_results)
+        
+        # ========================================
+        # TẦNG 3: Discovery (Content + Popularity)
+        # ========================================
+        self._log(f"\n🔹 TẦNG 3: Discovery (Content-Based + Popularity)")
+        discovery_results = self._get_discovery_recommendations(
+            username,
+            purchased_products | used_products
+        )
+        self._log(f"   ✅ {len(discovery_results)} sản phẩm khám phá")
+        
+        # ========================================
+        # Kết hợp và cân bằng
+        # ========================================
+        final_results = self._balance_recommendations(
+            warm_results,
+            collab_results,
+            discovery_results,
+            top_n
+        )
+        for tier in ("WARM", "COLLAB", "CONTENT", "POPULAR"):
+            self._mark_tier(tier, "completed")
+        
+        self._log_summary(final_results)
+        return final_results
+    
+    def _compute_anytime(
+        self,
+        username: str,
+        top_n: int,
+        purchased_products: Set[str],
+        deadline: float
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Pipeline 3 tầng có deadline: chạy tầng rẻ trước (WARM → POPULAR → CONTENT → COLLAB).
+        
+        POPULAR / CONTENT được tính TRƯỚC CF nên chưa biết sản phẩm COLLAB để loại;
+        lấy dư (mỗi danh sách tới 10 = 5 + tối đa 5 COLLAB) rồi lọc sau
+        → kịp giờ thì kết quả trùng khớp với _compute_recommendations.
+        """
+        self._log(f"\n⏱️ Chế độ deadline: WARM → POPULAR → CONTENT → COLLAB")
+        
+        warm_results = self._get_warm_recommendations(username, purchased_products)
+        self._mark_tier("WARM", "completed")
+        used_products = {p for p, _, _ in warm_results}
+        exclude = purchased_products | used_products
+        
+        popularity_results: List[Tuple[str, float]] = []
+        if self._expired(deadline):
+            self._mark_tier("POPULAR", "skipped")
+        else:
+            popularity_results = self._get_profile_popularity(username, 10, exclude)
+            self._mark_tier("POPULAR", "completed")
+        
+        content_results: List[Tuple[str, float, str]] = []
+        if self._expired(deadline):
+            self._mark_tier("CONTENT", "skipped")
+        else:
+            content_results = self._content_based_filtering_optimized(
+                username, exclude, per_category=10, deadline=deadline
+            )
+            self._mark_tier("CONTENT", "completed")
+        
+        collab_results: List[Tuple[str, float, str]] = []
+        if self._expired(deadline):
+            self._mark_tier("COLLAB", "skipped")
+        else:
+            collab_results = self._collaborative_filtering_optimized(username, exclude, deadline)
+            self._mark_tier("COLLAB", "completed")
+        used_products.update(p for p, _, _ in collab_results)
+        
+        content_results = [r for r in content_results if r[0] not in used_products]
+        popularity_results = [r for r in popularity_results if r[0] not in used_products][:5]
+        
+        # Thiếu COLLAB vì hết giờ → Discovery chỉ lấp đúng số chỗ COLLAB còn trống
+        # (giữ tỉ lệ các tầng của _balance_recommendations thay vì để Discovery chiếm hết)
+        discovery_limit = 3
+        if self.last_tier_status["tiers"].get("COLLAB") != "completed":
+            collab_slots = min(5, max(0, top_n - min(3, len(warm_results))))
+            discovery_limit += max(0, collab_slots - len(collab_results))
+        discovery_results = self._combine_discovery(
+            content_results, popularity_results, limit=discovery_limit
+        )
+        
+        final_results = self._balance_recommendations(
+            warm_results,
+            collab_results,
+            discovery_results,
+            top_n
+        )
+        self._log(f"   📋 Trạng thái: {self.last_tier_status['tiers']}")
+        self._log_summary(final_results)
+        return final_results
+    
+    def _log_summary(self, final_results: List[Tuple[str, float, str]]):
+        self._log(f"\n✅ TỔNG: {len(final_results)} sản phẩm đề xuất")
+        self._log(f"   - WARM: {sum(1 for _, _, t in final_results if t == 'WARM')}")
+        self._log(f"   - COLLAB: {sum(1 for _, _, t in final_results if t == 'COLLAB')}")
+        self._log(f"   - CONTENT: {sum(1 for _, _, t in final_results if t == 'CONTENT')}")
+        self._log(f"   - POPULAR: {sum(1 for _, _, t in final_results if t == 'POPULAR')}")
+        self._log(f"{'='*70}\n")
+    
+    def _get_ppr_recommendations(
+        self,
+        username: str,
+        top_n: int,
+        purchased_products: Set[str],
+        strategy: str
+    ) -> List[Tuple[str, float, str]]:
+        """Personalized PageRank từ user - thay cho cả 3 tầng (chỉ loại sản phẩm đã mua)"""
+        if self._ppr is None:
+            # Không có PPR dùng chung → dựng 1 lần cho instance này (snapshot tại thời điểm dựng)
+            graph = self.sparse_graph or SparseGraph.from_graph_data(
+                {'user_to_products': self.user_to_products}
+            )
+            self._ppr = PersonalizedPageRank(graph)
+        
+        mode = "power" if strategy == "ppr" else "monte_carlo"
+        results = self._ppr.top_k(username, purchased_products, top_n, mode)
+        
+        stats = self._ppr.last_stats
+        self._log(f"\n🚶 Personalized PageRank ({mode}): {len(results)} sản phẩm, {stats['ms']:.1f}ms")
+        return [(p, s, "PPR") for p, s in results]
+    
+    def _get_warm_recommendations(
+        self,
+        username: str,
+        exclude: Set[str]
+    ) -> List[Tuple[str, float, str]]:
+        """
+        TẦNG 1: Sản phẩm WARM (Đã tương tác - Chưa mua)
+        
+        Ưu tiên:
+        - Cart (0.775) → Conversion rate 40%
+        - Like (0.575) → Conversion rate 15%
+        - View (0.375) → Conversion rate 8%
+        
+        Boost điểm 50% để ưu tiên cao
+        """
+        user_products = self.user_to_products[username]
+        
+        warm_products = []
+        for product, weight in user_products.items():
+            # Chỉ loại sản phẩm ĐÃ MUA (không loại view/like/cart)
+            if product not in exclude:
+                # BOOST điểm 50%
+                boosted_score = weight * self.WARM_BOOST
+                warm_products.append((product, boosted_score, "WARM"))
+        
+        # Sắp xếp theo điểm (cao → thấp)
+        warm_products.sort(key=lambda x: x[1], reverse=True)
+        
+        return warm_products[:3]  # Chỉ lấy top 3
+    
+    def _collaborative_filtering_optimized(
+        self,
+        username: str,
+        exclude: Set[str],
+        deadline: Optional[float] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        TẦNG 2: Collaborative Filtering có tối ưu
+        
+        Cải tiến:
+        - Tính user confidence (users mua nhiều → đáng tin hơn)
+        - Tính nhiều con đường
+        - Có SparseGraph → tính bằng phép toán ma trận thưa (VectorizedCF)
+        - Có collab_model → lấy top-k từ embeddings (user mới / có tương tác mới: fold-in)
+        - Có neighbor_index (và nhiều users hơn max_candidates) → chỉ xét users ứng viên của LSH
+        - deadline: vòng lặp Python dừng khi hết giờ, trả về top-k tạm thời (đánh dấu "truncated");
+          embeddings (fold-in O(f²·n_items)) / LSH query() / VectorizedCF chạy trọn, nên deadline
+          được kiểm tra trước ALS, sau ALS, sau query() và trước khi chấm điểm
+          (hết giờ trước khi tính → trả rỗng; ALS xong nhưng quá giờ → trả kết quả đã tính;
+          cả 2 trường hợp đánh dấu "truncated")
+        """
+        if self.collab_model is not None:
+            if self._expired(deadline):
+                self._mark_tier("COLLAB", "truncated")
+                return []
+            top = self.collab_model.recommend(
+                username, exclude, k=5, interactions=self.user_to_products[username]
+            )
+            if self._expired(deadline):
+                self._mark_tier("COLLAB", "truncated")
+                return [(p, s, "COLLAB") for p, s in top]
+            if top:
+                return [(p, s, "COLLAB") for p, s in top]
+        
+        neighbours = None
+        index = self.neighbor_index
+        if index is not None and len(index) > index.max_candidates:
+            neighbours = index.query(username)
+        
+        # ALS / query() không ngắt giữa chừng được → kiểm tra lại trước khi chấm điểm
+        if self._expired(deadline):
+            self._mark_tier("COLLAB", "truncated")
+            return []
+        
+        if self._vectorized_cf is not None:
+            top, n_similar = self._vectorized_cf.top_k(username, exclude, k=5, neighbours=neighbours)
+            if n_similar:
+                self._log(f"   👥 {n_similar} users tương tự")
+            return [(p, s, "COLLAB") for p, s in top]
+        
+        if neighbours is not None:
+            return self._collaborative_filtering_candidates(username, exclude, neighbours, deadline)
+        
+        user_products = self.user_to_products[username]
+        candidate_scores = defaultdict(float)
+        similar_users = set()
+        steps = 0
+        interrupted = False
+        
+        # Duyệt qua các sản phẩm user đã tương tác
+        for product_a, weight_ua in user_products.items():
+            if product_a not in self.product_to_users:
+                continue
+            
+            other_users = self.product_to_users[product_a]
+            
+            for other_user, weight_other in other_users.items():
+                if other_user == username:
+                    continue
+                
+                # Kiểm tra deadline mỗi 64 users (gọi đồng hồ mỗi bước thì tốn hơn chính phép tính)
+                steps += 1
+                if deadline is not None and steps % 64 == 0 and self._expired(deadline):
+                    interrupted = True
+                    break
+                
+                similar_users.add(other_user)
+                
+                # Tính similarity
+                similarity = min(weight_ua, weight_other)
+                
+                # Tính user confidence (users mua nhiều → tin hơn)
+                user_confidence = self._get_user_confidence(other_user)
+                
+                # Lấy sản phẩm của other_user
+                if other_user not in self.user_to_products:
+                    continue
+                
+                other_user_products = self.user_to_products[other_user]
+                
+                for product_b, weight_b in other_user_products.items():
+                    if product_b in exclude:
+                        continue
+                    
+                    # Tính điểm CÓ user confidence
+                    score = similarity * weight_b * user_confidence
+                    candidate_scores[product_b] += score
+            
+            if interrupted:
+                break
+        
+        if interrupted:
+            self._mark_tier("COLLAB", "truncated")
+            self._log(f"   ⏱️ Hết giờ → dừng CF sau {steps} users, dùng top-k tạm thời")
+        if similar_users:
+            self._log(f"   👥 {len(similar_users)} users tương tự")
+        
+        # Sắp xếp
+        sorted_candidates = sorted(
+            candidate_scores.items(),
+            key=lambda x: x[1],
+            reverse=True
+        )
+        
+        return [(p, s, "COLLAB") for p, s in sorted_candidates[:5]]  # Top 5
+    
+    def _collaborative_filtering_candidates(
+        self,
+        username: str,
+        exclude: Set[str],
+        neighbours: List[str],
+        deadline: Optional[float] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        CF giống _collaborative_filtering_optimized nhưng chỉ trên `neighbours`:
+            score(b) = Σ_v similarity(u,v) × w(v,b) × confidence(v)
+            similarity(u,v) = Σ_a∈chung min(w(u,a), w(v,a))
+        Không duyệt danh sách users của từng sản phẩm → sản phẩm bán chạy không làm chậm
+        """
+        user_products = self.user_to_products[username]
+        candidate_scores = defaultdict(float)
+        n_similar = 0
+        
+        for i, other_user in enumerate(neighbours, 1):
+            if deadline is not None and i % 64 == 0 and self._expired(deadline):
+                self._mark_tier("COLLAB", "truncated")
+                self._log(f"   ⏱️ Hết giờ → dừng CF sau {i - 1} users, dùng top-k tạm thời")
+                break
+            
+            other_user_products = self.user_to_products.get(other_user)
+            if not other_user_products or other_user == username:
+                continue
+            
+            # Duyệt tập nhỏ hơn để tìm sản phẩm chung
+            small, large = user_products, other_user_products
+            if len(small) > len(large):
+                small, large = large, small
+            common = [a for a in small if a in large]
+            if not common:
+                continue
+            n_similar += 1
+            
+            similarity = sum(min(user_products[a], other_user_products[a]) for a in common)
+            user_confidence = self._get_user_confidence(other_user)
+            
+            for product_b, weight_b in other_user_products.items():
+                if product_b in exclude:
+                    continue
+                candidate_scores[product_b] += similarity * weight_b * user_confidence
+        
+        if n_similar:
+            self._log(f"   👥 {n_similar} users tương tự")
+        
+        sorted_candidates = sorted(
+            candidate_scores.items(),
+            key=lambda x: x[1],
+            reverse=True
+        )
+        
+        return [(p, s, "COLLAB") for p, s in sorted_candidates[:5]]  # Top 5
+    
+    def _get_user_confidence(self, username: str) -> float:
+        """
+        Tính độ tin cậy của user
+        
+        Users mua nhiều → đề xuất đáng tin hơn
+        Users chỉ view → ít tin hơn
+        """
+        if self.profile_store is not None:
+            return self.profile_store.confidence(username)
+        
+        if username not in self.user_to_products:
+            return 1.0
+        
+        user_products = self.user_to_products[username]
+        
+        # Đếm số lượng purchase
+        purchase_count = 0
+        for product, weight in user_products.items():
+            if weight >= 0.9:  # Purchase weight ≈ 0.975
+                purchase_count += 1
+        
+        # Tính confidence
+        if purchase_count >= 5:
+            return 1.5  # Heavy buyer: +50%
+        elif purchase_count >= 2:
+            return 1.2  # Regular buyer: +20%
+        else:
+            return 1.0  # Window shopper: normal
+    
+    def _get_discovery_recommendations(
+        self,
+        username: str,
+        exclude: Set[str]
+    ) -> List[Tuple[str, float, str]]:
+        """
+        TẦNG 3: Discovery (Content-Based + Popularity)
+        
+        Ưu tiên Content-Based, fallback sang Popularity
+        """
+        # Thử Content-Based trước
+        content_results = self._content_based_filtering_optimized(username, exclude)
+        
+        if len(content_results) >= 3:
+            return content_results[:3]
+        
+        # Nếu không đủ, thêm Popularity
+        popularity_results = self._get_profile_popularity(username, 5, exclude)
+        return self._combine_discovery(content_results, popularity_results)
+    
+    def _combine_discovery(
+        self,
+        content_results: List[Tuple[str, float, str]],
+        popularity_results: List[Tuple[str, float]],
+        limit: int = 3
+    ) -> List[Tuple[str, float, str]]:
+        """Content trước, thiếu thì thêm Popularity (loại trùng), lấy `limit` sản phẩm"""
+        if len(content_results) >= limit:
+            return content_results[:limit]
+        
+        popularity_tagged = [(p, s, "POPULAR") for p, s in popularity_results]
+        
+        # Kết hợp
+        combined = content_results + popularity_tagged
+        
+        # Loại trùng
+        seen = set()
+        unique = []
+        for p, s, t in combined:
+            if p not in seen:
+                seen.add(p)
+                unique.append((p, s, t))
+        
+        return unique[:limit]
+    
+    def _get_top_categories(self, username: str, n: int = 2) -> List[Tuple[str, float]]:
+        """n category ưa thích nhất [(category, điểm)] theo tổng trọng số tương tác"""
+        if self.profile_store is not None:
+            category_scores = self.profile_store.category_scores(username)
+        else:
+            user_products = self.user_to_products.get(username, {})
+            
+            # Đếm category
+            category_scores = defaultdict(float)
+            for product_name, weight in user_products.items():
+                product_obj = self._find_product_by_name(product_name)
+                if product_obj:
+                    category_scores[product_obj.category] += weight
+        
+        return sorted(
+            category_scores.items(),
+            key=lambda x: x[1],
+            reverse=True
+        )[:n]
+    
+    def _content_based_filtering_optimized(
+        self,
+        username: str,
+        exclude: Set[str],
+        per_category: int = 5,
+        deadline: Optional[float] = None
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Content-Based CẢI TIẾN:
+        
+        KHÔNG random - Tính điểm kết hợp:
+        1. Category score (60%)
+        2. Popularity score (30%)
+        3. Price similarity (10%)
+        
+        per_category: số sản phẩm lấy mỗi category
+        deadline: hết giờ giữa 2 category → trả phần đã tính (đánh dấu "truncated")
+        """
+        top_categories = self._get_top_categories(username)
+        if not top_categories:
+            return []
+        
+        self._log(f"   📂 Top categories: {[cat for cat, _ in top_categories]}")
+        
+        # Tính giá trung bình user quan tâm
+        avg_price = self._get_user_avg_price(username)
+        
+        recommendations = []
+        
+        # Catalog dạng cột → tính điểm cả category 1 lần bằng NumPy
+        table = getattr(self.product_manager, 'table', None)
+        excluded_rows = self.product_manager.rows_of_names(exclude) if table is not None else None
+        
+        for category, cat_score in top_categories:
+            if recommendations and self._expired(deadline):
+                self._mark_tier("CONTENT", "truncated")
+                break
+            
+            if table is not None:
+                for product, score in self._score_category_vectorized(
+                    table, category, cat_score, avg_price, excluded_rows, per_category
+                ):
+                    recommendations.append((product.name, score, "CONTENT"))
+                continue
+            
+            # Lấy sản phẩm cùng category
+            category_products = [
+                p for p in self.product_manager.get_products_by_category(category)
+                if p.name not in exclude
+            ]
+            
+            # TÍNH ĐIỂM KẾT HỢP (KHÔNG random!)
+            scored_products = []
+            for product in category_products:
+                # 1. Category score (60%)
+                base_score = cat_score * self.CATEGORY_WEIGHT
+                
+                # 2. Popularity score (30%)
+                # Normalize: 500 sold = max
+                popularity = min(1.0, product.sold_count / 500)
+                popularity_score = popularity * self.POPULARITY_WEIGHT
+                
+                # 3. Price similarity (10%)
+                if avg_price > 0:
+                    price_diff = abs(product.price - avg_price) / avg_price
+                    price_similarity = 1 - min(1.0, price_diff)
+                else:
+                    price_similarity = 0.5
+                
+                price_score = price_similarity * self.PRICE_SIMILARITY_WEIGHT
+                
+                # Tổng điểm
+                final_score = base_score + popularity_score + price_score
+                scored_products.append((product, final_score))
+            
+            # SẮP XẾP theo điểm (KHÔNG random!)
+            scored_products.sort(key=lambda x: x[1], reverse=True)
+            
+            # Lấy top per_category (mặc định 5) mỗi category
+            for product, score in scored_products[:per_category]:
+                recommendations.append((product.name, score, "CONTENT"))
+        
+        # Sắp xếp tổng thể
+        recommendations.sort(key=lambda x: x[1], reverse=True)
+        
+        return recommendations
+    
+    def _score_category_vectorized(
+        self,
+        table,
+        category: str,
+        cat_score: float,
+        avg_price: float,
+        excluded_rows: np.ndarray,
+        k: int = 5
+    ) -> List[Tuple[object, float]]:
+        """
+        Cùng công thức với vòng lặp trong _content_based_filtering_optimized,
+        tính trên cột price / sold_count cho mọi sản phẩm của category.
+        Thứ tự phép tính giữ nguyên → điểm và xếp hạng (kể cả khi bằng điểm) trùng khớp.
+        """
+        products, rows = self.product_manager.category_rows(category)
+        keep = ~np.isin(rows, excluded_rows)
+        positions = np.flatnonzero(keep)
+        if len(positions) == 0:
+            return []
+        rows = rows[positions]
+        
+        base_score = cat_score * self.CATEGORY_WEIGHT
+        popularity = np.minimum(1.0, table.sold_count[rows] / 500)
+        popularity_score = popularity * self.POPULARITY_WEIGHT
+        
+        if avg_price > 0:
+            price_diff = np.abs(table.price[rows] - avg_price) / avg_price
+            price_similarity = 1 - np.minimum(1.0, price_diff)
+        else:
+            price_similarity = np.full(len(rows), 0.5)
+        
+        price_score = price_similarity * self.PRICE_SIMILARITY_WEIGHT
+        final_score = base_score + popularity_score + price_score
+        
+        # Top-k: argpartition lấy ngưỡng, giữ mọi phần tử bằng ngưỡng rồi
+        # sắp xếp ổn định (điểm giảm dần, bằng điểm → thứ tự catalog) như list.sort
+        candidates = np.arange(len(final_score))
+        if len(final_score) > k:
+            threshold = final_score[np.argpartition(-final_score, k - 1)[k - 1]]
+            candidates = np.flatnonzero(final_score >= threshold)
+        order = candidates[np.lexsort((candidates, -final_score[candidates]))][:k]
+        
+        return [(products[positions[i]], float(final_score[i])) for i in order]
+    
+    def _get_user_avg_price(self, username: str) -> float:
+        """Tính giá trung bình sản phẩm user quan tâm"""
+        if self.profile_store is not None:
+            return self.profile_store.avg_price(username)
+        
+        user_products = self.user_to_products.get(username, {})
+        if not user_products:
+            return 500000  # Default
+        
+        prices = []
+        for product_name in user_products.keys():
+            product = self._find_product_by_name(product_name)
+            if product:
+                prices.append(product.price)
+        
+        return sum(prices) / len(prices) if prices else 500000
+    
+    def _get_popularity_recommendations(
+        self,
+        top_n: int,
+        exclude: Set[str],
+        category: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Popularity-Based fallback (category → chỉ xét sản phẩm bán chạy trong category đó)"""
+        if category is None:
+            top_selling = self.product_manager.get_top_selling(50)
+        else:
+            top_selling = self.product_manager.get_top_selling_by_category(category, 50)
+        
+        recommendations = []
+        for product in top_selling:
+            if product.name not in exclude:
+                score = min(0.3, product.sold_count / 2000)
+                recommendations.append((product.name, score))
+        
+        return recommendations[:top_n]
+    
+    def _get_profile_popularity(
+        self,
+        username: str,
+        top_n: int,
+        exclude: Set[str]
+    ) -> List[Tuple[str, float]]:
+        """
+        Popularity theo sở thích: bán chạy trong các category ưa thích của user trước
+        (theo thứ tự ưa thích), thiếu thì lấp bằng bán chạy toàn catalog.
+        User chưa có category nào → giống _get_popularity_recommendations.
+        """
+        recommendations: List[Tuple[str, float]] = []
+        seen = set(exclude)
+        categories = [category for category, _ in self._get_top_categories(username)]
+        for category in categories + [None]:
+            if len(recommendations) >= top_n:
+                break
+            for product_name, score in self._get_popularity_recommendations(top_n, seen, category):
+                recommendations.append((product_name, score))
+                seen.add(product_name)
+        return recommendations[:top_n]
+    
+    def _balance_recommendations(
+        self,
+        warm: List[Tuple[str, float, str]],
+        collab: List[Tuple[str, float, str]],
+        discovery: List[Tuple[str, float, str]],
+        top_n: int
+    ) -> List[Tuple[str, float, str]]:
+        """
+        Cân bằng đề xuất theo chiến lược 3 tầng
+        
+        Mục tiêu:
+        - Vị trí 1-3: WARM (nếu có)
+        - Vị trí 4-7: COLLAB (nếu có)
+        - Vị trí 8-10: DISCOVERY
+        """
+        final = []
+        
+        # TẦNG 1: WARM (tối đa 3)
+        final.extend(warm[:3])
+        
+        # TẦNG 2: COLLAB (tối đa 5, điền đủ top_n nếu thiếu)
+        remaining = top_n - len(final)
+        if remaining > 0:
+            final.extend(collab[:min(5, remaining)])
+        
+        # TẦNG 3: DISCOVERY (điền cho đủ)
+        remaining = top_n - len(final)
+        if remaining > 0:
+            final.extend(discovery[:remaining])
+        
+        return final[:top_n]
+    
+    def weighted_bfs(
+        self,
+        username: str,
+        top_n: int = 10,
+        purchased_products: Optional[Set[str]] = None,
+        max_hops: int = 3,
+        max_frontier: int = 2000,
+        max_fanout: int = 200,
+        min_score: float = 1e-6
+    ) -> List[Tuple[str, float]]:
+        """
+        Đề xuất bằng duyệt đồ thị nhiều bước có trọng số (xem GraphTraversal.WeightedBFS).
+        Không đề xuất lại sản phẩm user đã tương tác / đã mua.
+        
+        Returns:
+            List[(product_name, score)]
+        """
+        exclude = set(self.user_to_products.get(username, {}))
+        if purchased_products:
+            exclude |= purchased_products
+        
+        traversal = self.traversal
+        if traversal is None or traversal.max_fanout != max_fanout:
+            # Không có traversal dùng chung (hoặc khác max_fanout) → cache cạnh chỉ sống 1 lần gọi
+            traversal = WeightedBFS(self.user_to_products, self.product_to_users, max_fanout=max_fanout)
+        results = traversal.run(
+            username, top_n, exclude,
+            max_hops=max_hops, max_frontier=max_frontier, min_score=min_score
+        )
+        
+        stats = traversal.last_stats
+        self._log(f"\n🔎 Duyệt đồ thị cho {username}: {stats['expanded']} nodes, "
+                  f"{stats['candidates']} ứng viên, {stats['ms']:.1f}ms")
+        return results
+    
+    def _find_product_by_name(self, product_name: str):
+        """Tìm product object từ tên"""
+        return self.product_manager.get_product_by_name(product_name)
+    
+    def explain_recommendation(self, username: str, product_name: str) -> str:
+        """
+        Giải thích CẢI TIẾN - Có tag nguồn gốc
+        """
+        if username not in self.user_to_products:
+            return f"❌ User '{username}' chưa có tương tác"
+        
+        explanation = []
+        explanation.append(f"\n{'='*70}")
+        explanation.append(f"📊 GIẢI THÍCH: Tại sao đề xuất '{product_name}'?")
+        explanation.append(f"{'='*70}\n")
+        
+        user_products = self.user_to_products[username]
+        
+        # Kiểm tra WARM
+        if product_name in user_products:
+            weight = user_products[product_name]
+            interaction_type = self._guess_interaction_type(weight)
+            explanation.append(f"🔥 WARM Product (Bạn đã tương tác)")
+            explanation.append(f"   ✓ Bạn đã {interaction_type} sản phẩm này")
+            explanation.append(f"   ✓ Điểm gốc: {weight:.3f}")
+            explanation.append(f"   ✓ Điểm sau boost (+50%): {weight * 1.5:.3f}")
+            explanation.append(f"   💡 Nhắc nhở: Bạn quan tâm nhưng chưa mua!")
+            explanation.append("")
+        
+        # Kiểm tra Collaborative
+        collab_score = 0.0
+        collab_paths = []
+        
+        for product_a, weight_ua in user_products.items():
+            if product_a in self.product_to_users:
+                other_users = self.product_to_users[product_a]
+                
+                for other_user, weight_other in other_users.items():
+                    if other_user == username:
+                        continue
+                    
+                    similarity = min(weight_ua, weight_other)
+                    confidence = self._get_user_confidence(other_user)
+                    
+                    if other_user in self.user_to_products:
+                        other_products = self.user_to_products[other_user]
+                        
+                        if product_name in other_products:
+                            score = similarity * other_products[product_name] * confidence
+                            collab_score += score
+                            
+                            confidence_label = "Heavy buyer" if confidence >= 1.5 else "Regular buyer" if confidence >= 1.2 else "User"
+                            
+                            collab_paths.append(
+                                f"  ✓ {confidence_label} '{other_user}' (tương tự qua '{product_a}') "
+                                f"→ '{product_name}' (+{score:.3f})"
+                            )
+        
+        if collab_score > 0:
+            explanation.append(f"🤝 Collaborative Score: {collab_score:.3f}")
+            for path in collab_paths[:5]:
+                explanation.append(path)
+            explanation.append("")
+        
+        # Kiểm tra Content-Based
+        product_obj = self._find_product_by_name(product_name)
+        if product_obj:
+            user_same_category = []
+            for p in user_products.keys():
+                obj = self._find_product_by_name(p)
+                if obj and obj.category == product_obj.category:
+                    user_same_category.append(p)
+            
+            if user_same_category and product_name not in user_products:
+                explanation.append(f"📂 Content-Based: Category '{product_obj.category}'")
+                explanation.append(f"  ✓ Bạn quan tâm đến {len(user_same_category)} sản phẩm cùng category")
+                explanation.append(f"  ✓ Popularity: {product_obj.sold_count} đã bán")
+                
+                avg_price = self._get_user_avg_price(username)
+                price_diff_pct = abs(product_obj.price - avg_price) / avg_price * 100
+                explanation.append(f"  ✓ Giá phù hợp: {product_obj.price:,}đ (chênh {price_diff_pct:.0f}% so với sở thích)")
+                explanation.append("")
+        
+        if not collab_score and product_name not in user_products:
+            explanation.append("⭐ Sản phẩm phổ biến (Top bán chạy)")
+        
+        explanation.append(f"{'='*70}")
+        
+        return "\n".join(explanation)
+    
+    def _guess_interaction_type(self, weight: float) -> str:
+        """Đoán loại tương tác từ weight"""
+        if weight >= 0.9:
+            return "MUA"
+        elif weight >= 0.7:
+            return "THÊM VÀO GIỎ"
+        elif weight >= 0.5:
+            return "THÍCH"
+        elif weight >= 0.3:
+            return "XEM"
+        else:
             return "BỎ QUA"
\ No newline at end of file
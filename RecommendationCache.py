@@ -0,0 +1,158 @@
+from typing import Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+from collections import OrderedDict
+import time
+
+# (username, top_n, tập sản phẩm đã mua, strategy)
+CacheKey = Tuple[str, int, FrozenSet[str], str]
+
+
+class RecommendationCache:
+    """
+    Cache kết quả Recommendation.get_recommendations (LRU + TTL).
+
+    - Khoá: (username, top_n, frozenset(purchased_products), strategy)
+    - Vượt max_entries → loại mục ít dùng nhất; quá ttl giây → coi như hết hạn
+    - Là listener của InteractionTracker: tương tác mới của user u
+      → xoá cache của u và của các user có chung sản phẩm với u
+        (u là hàng xóm CF của họ); strategy PPR nhìn xa hơn 2 bước
+        nên phần ảnh hưởng xa hơn chỉ được làm mới theo ttl
+    - OrderManager.checkout gọi invalidate_user() cho người mua và bump_popularity():
+      sold_count đổi → điểm POPULAR / CONTENT của MỌI user đổi. Mỗi mục lưu kèm
+      popularity_version lúc tính; lệch version → coi như hết hạn (xoá toàn bộ O(1))
+    """
+
+    def __init__(self, graph=None, max_entries: int = 1024, ttl: float = 300.0):
+        """
+        graph: InteractionGraph / dict graph_data để tìm hàng xóm khi invalidate
+               (None → chỉ xoá cache của chính user)
+        """
+        if graph is not None and hasattr(graph, 'as_graph_data'):
+            graph = graph.as_graph_data()
+        self.graph = graph
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # khoá → (thời điểm lưu, popularity_version lúc lưu, kết quả)
+        self._entries: "OrderedDict[CacheKey, Tuple[float, int, List]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[CacheKey]] = {}
+        self.popularity_version = 0
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "stale": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(
+        username: str,
+        top_n: int,
+        purchased_products: Optional[Set[str]],
+        strategy: str = "tiered"
+    ) -> CacheKey:
+        return (username, top_n, frozenset(purchased_products or ()), strategy)
+
+    def get(self, key: CacheKey) -> Optional[List]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        stored_at, version, results = entry
+        if version != self.popularity_version:
+            self._drop(key)
+            self.stats["stale"] += 1
+            self.stats["misses"] += 1
+            return None
+        if time.monotonic() - stored_at > self.ttl:
+            self._drop(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return list(results)
+
+    def put(self, key: CacheKey, results: List):
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (time.monotonic(), self.popularity_version, list(results))
+        self._keys_by_user.setdefault(key[0], set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats["evictions"] += 1
+
+    def _drop(self, key: CacheKey):
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def invalidate_user(self, username: str) -> int:
+        keys = self._keys_by_user.pop(username, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        if keys:
+            self.stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def invalidate_neighbours(self, username: str, extra_products: Tuple[Hashable, ...] = ()) -> int:
+        """
+        Xoá cache của user và mọi user đang có cache mà có chung sản phẩm với user.
+        Chỉ duyệt các user đang có cache (≤ max_entries) → không phụ thuộc độ lớn của hub.
+        """
+        removed = self.invalidate_user(username)
+        if self.graph is None:
+            return removed
+
+        user_to_products = self.graph['user_to_products']
+        products = set(user_to_products.get(username, {}))
+        products.update(extra_products)
+        if not products:
+            return removed
+
+        for other in list(self._keys_by_user):
+            if not products.isdisjoint(user_to_products.get(other, {})):
+                removed += self.invalidate_user(other)
+        return removed
+
+    def bump_popularity(self):
+        """sold_count thay đổi → mọi mục hiện có thành cũ (xoá dần khi bị tra cứu / LRU đẩy ra)"""
+        self.popularity_version += 1
+
+    def clear(self):
+        if self._entries:
+            self.stats["invalidations"] += len(self._entries)
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def get_stats(self) -> Dict[str, float]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._entries),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
+
+    # ===== Listener của InteractionTracker =====
+
+    def on_interaction_added(self, username: str, record: Tuple[str, str, int, str, str]):
+        self.invalidate_neighbours(username, (record[1],))
+
+    def on_interaction_removed(self, username: str, record: Tuple[str, str, int, str, str]):
+        # Cạnh có thể đã bị xoá khỏi đồ thị → thêm chính sản phẩm đó để tìm hàng xóm cũ
+        self.invalidate_neighbours(username, (record[1],))
+
+    def on_interactions_reloaded(self, tracker):
+        self.clear()
\ No newline at end of file
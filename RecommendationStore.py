@@ -0,0 +1,141 @@
+from typing import Dict, List, Optional, Set, Tuple
+import hashlib
+import json
+import os
+
+RECOMMENDATION_FILE = "recommendations.jsonl"
+
+
+def interaction_fingerprint(items: List[Tuple[str, str]]) -> str:
+    """Dấu vân tay danh sách [(product_name, interaction_type)] của 1 user lúc materialize"""
+    data = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+class RecommendationStore:
+    """
+    Kho đề xuất đã tính sẵn (materialized) - đọc từ file JSONL của BatchRecommender.
+
+    - get(username): tra cứu O(1), trả None nếu user chưa có trong kho
+      hoặc đã bị đánh dấu dirty (có tương tác mới sau lần materialize)
+    - load(tracker): user có tương tác thay đổi từ lúc materialize → dirty ngay.
+      Sự kiện không có thời điểm nên so dấu vân tay lịch sử tương tác của user
+      (BatchRecommender ghi kèm mỗi dòng); file cũ không có dấu vân tay → so
+      mtime của log tương tác với materialized_at
+    - Là listener của InteractionTracker → tự đánh dấu dirty theo từng user
+      (attach() = load + đăng ký listener, dùng trong process phục vụ)
+    - put(): lưu kết quả tính trực tiếp (fallback) để lần sau dùng lại
+    """
+
+    def __init__(self, path: str = RECOMMENDATION_FILE):
+        self.path = path
+        self._lists: Dict[str, List[Tuple[str, float, str]]] = {}
+        self._dirty: Set[str] = set()
+        self._fingerprints: Dict[str, str] = {}
+        self.materialized_at: Optional[float] = None
+        self.stats = {"hits": 0, "misses": 0, "dirty": 0}
+
+    @classmethod
+    def attach(cls, tracker, path: str = RECOMMENDATION_FILE) -> "RecommendationStore":
+        """Nạp kho, đánh dấu users đã đổi so với tracker hiện tại và đăng ký nhận cập nhật"""
+        store = cls(path)
+        store.load(tracker)
+        tracker.add_listener(store)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._lists)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._lists
+
+    def load(self, tracker=None) -> int:
+        """
+        Đọc lại toàn bộ file; trả về số users đã nạp.
+        tracker: InteractionTracker hiện tại → đánh dấu dirty users đã đổi từ lúc materialize
+        """
+        self._lists.clear()
+        self._dirty.clear()
+        self._fingerprints.clear()
+        if not os.path.exists(self.path):
+            print(f"⚠️ Chưa có file đề xuất {self.path} - sẽ tính trực tiếp")
+            return 0
+
+        bad_lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    self._lists[row["username"]] = [
+                        (item["product_name"], item["score"], item["source"])
+                        for item in row["recommendations"]
+                    ]
+                    if "fingerprint" in row:
+                        self._fingerprints[row["username"]] = row["fingerprint"]
+                except (ValueError, KeyError, TypeError):
+                    bad_lines += 1
+
+        self.materialized_at = os.path.getmtime(self.path)
+        print(f"✅ Đã load đề xuất tính sẵn cho {len(self._lists)} users từ {self.path}")
+        if bad_lines:
+            print(f"⚠️ Bỏ qua {bad_lines} dòng lỗi")
+        if tracker is not None:
+            self.mark_changed_since_materialized(tracker)
+        return len(self._lists)
+
+    def mark_changed_since_materialized(self, tracker) -> int:
+        """Đánh dấu dirty users có lịch sử tương tác khác lúc materialize; trả về số users"""
+        current = tracker.get_all_interactions_for_recommendation()
+        try:
+            log_changed = os.path.getmtime(tracker._data_file) > (self.materialized_at or 0.0)
+        except OSError:
+            log_changed = False
+
+        before = len(self._dirty)
+        for username in self._lists:
+            fingerprint = self._fingerprints.get(username)
+            if fingerprint is None:
+                changed = log_changed
+            else:
+                changed = fingerprint != interaction_fingerprint(current.get(username, []))
+            if changed:
+                self._dirty.add(username)
+        marked = len(self._dirty) - before
+        if marked:
+            print(f"ℹ️ {marked} users có tương tác mới sau lần materialize - sẽ tính trực tiếp")
+        return marked
+
+    def get(self, username: str) -> Optional[List[Tuple[str, float, str]]]:
+        if username in self._dirty:
+            self.stats["dirty"] += 1
+            return None
+        results = self._lists.get(username)
+        if results is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return list(results)
+
+    def put(self, username: str, results: List[Tuple[str, float, str]]):
+        self._lists[username] = list(results)
+        self._dirty.discard(username)
+
+    def mark_dirty(self, username: str):
+        self._dirty.add(username)
+
+    def is_dirty(self, username: str) -> bool:
+        return username in self._dirty
+
+    # ===== Listener của InteractionTracker =====
+
+    def on_interaction_added(self, username: str, record: Tuple[str, str, int, str, str]):
+        self.mark_dirty(username)
+
+    def on_interaction_removed(self, username: str, record: Tuple[str, str, int, str, str]):
+        self.mark_dirty(username)
+
+    def on_interactions_reloaded(self, tracker):
+        # Dữ liệu có thể đã thay đổi toàn bộ → không tin kết quả cũ nữa
+        self._dirty.update(self._lists)
\ No newline at end of file
@@ -0,0 +1,117 @@
+from typing import Dict, List, Optional, Set
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_text(text: str) -> str:
+    """Bỏ dấu tiếng Việt + chữ thường: "Áo Khoác Đỏ" → "ao khoac do" """
+    text = unicodedata.normalize("NFD", str(text))
+    text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    return text.replace("đ", "d").replace("Đ", "D").lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold_text(text))
+
+
+class SearchIndex:
+    """
+    Inverted index tìm kiếm sản phẩm (không phân biệt dấu).
+
+    - Mỗi token của name / category / sizes / colors được đánh index theo
+      mọi tiền tố (edge n-gram): "khoac" → k, kh, kho, khoa, khoac
+    - Posting list: tiền tố → {product_id: điểm trường}
+    - Truy vấn: mỗi token truy vấn là 1 tiền tố, giao các posting list
+      (bắt đầu từ list ngắn nhất), xếp hạng theo tổng điểm, hoà điểm → sold_count
+    - add / remove / update cập nhật tăng dần, không dựng lại toàn bộ
+    """
+
+    FIELD_WEIGHTS = {
+        'name': 3.0,
+        'category': 2.0,
+        'sizes': 1.0,
+        'colors': 1.0,
+    }
+    EXACT_BONUS = 1.5   # Khớp trọn token ("ao" với "ao") > khớp tiền tố ("ao" với "aopolo")
+
+    def __init__(self, products=None):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._keys: Dict[str, Set[str]] = {}      # product_id → các tiền tố đã index
+        self._products: Dict[str, object] = {}
+        self._seq: Dict[str, int] = {}            # thứ tự thêm → hoà điểm ổn định
+        self._counter = 0
+
+        for p in products or []:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._products
+
+    def _field_terms(self, product) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field, weight in self.FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(product, field, "") or ""):
+                for end in range(1, len(token) + 1):
+                    prefix = token[:end]
+                    score = weight * self.EXACT_BONUS if end == len(token) else weight
+                    if score > terms.get(prefix, 0.0):
+                        terms[prefix] = score
+        return terms
+
+    def add(self, product):
+        """Thêm hoặc cập nhật 1 sản phẩm"""
+        if product.id in self._products:
+            self.remove(product.id)
+
+        terms = self._field_terms(product)
+        for prefix, score in terms.items():
+            self._postings.setdefault(prefix, {})[product.id] = score
+
+        self._keys[product.id] = set(terms)
+        self._products[product.id] = product
+        self._seq[product.id] = self._counter
+        self._counter += 1
+
+    def remove(self, product_id: str):
+        for prefix in self._keys.pop(product_id, ()):
+            posting = self._postings[prefix]
+            del posting[product_id]
+            if not posting:
+                del self._postings[prefix]
+        self._products.pop(product_id, None)
+        self._seq.pop(product_id, None)
+
+    def update(self, product):
+        self.add(product)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List:
+        """Danh sách Product khớp mọi token của query, đã xếp hạng"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        postings = []
+        for token in tokens:
+            posting = self._postings.get(token)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        first, rest = postings[0], postings[1:]
+        scored = []
+        for pid, score in first.items():
+            if all(pid in posting for posting in rest):
+                total = score + sum(posting[pid] for posting in rest)
+                scored.append((pid, total))
+
+        products = self._products
+        scored.sort(key=lambda x: (-x[1], -products[x[0]].sold_count, self._seq[x[0]]))
+        if limit is not None:
+            scored = scored[:limit]
+        return [products[pid] for pid, _ in scored]
\ No newline at end of file
@@ -0,0 +1,270 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections.abc import Mapping
+import sys
+
+import numpy as np
+
+from WeightNormalizer import WeightNormalizer
+
+
+class _SparseRowView(Mapping):
+    """1 hàng CSR nhìn như dict {tên đỉnh kề: trọng số} (chỉ đọc)"""
+
+    __slots__ = ("_names", "_ids", "_indices", "_data")
+
+    def __init__(self, names: List[str], ids: Dict[str, int], indices: np.ndarray, data: np.ndarray):
+        self._names = names
+        self._ids = ids
+        self._indices = indices
+        self._data = data
+
+    def _position(self, name: str) -> int:
+        idx = self._ids.get(name)
+        if idx is None:
+            return -1
+        hits = np.flatnonzero(self._indices == idx)
+        return int(hits[0]) if len(hits) else -1
+
+    def __getitem__(self, name: str) -> float:
+        pos = self._position(name)
+        if pos < 0:
+            raise KeyError(name)
+        return float(self._data[pos])
+
+    def __contains__(self, name) -> bool:
+        return self._position(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._names
+        return (names[i] for i in self._indices.tolist())
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def items(self):
+        names = self._names
+        return [(names[i], w) for i, w in zip(self._indices.tolist(), self._data.tolist())]
+
+
+class _SparseAdjacencyView(Mapping):
+    """Ma trận CSR nhìn như dict {tên: {tên kề: trọng số}} - giống dict của build_graph()"""
+
+    __slots__ = ("_row_names", "_row_ids", "_col_names", "_col_ids", "_indptr", "_indices", "_data")
+
+    def __init__(self, row_names, row_ids, col_names, col_ids, indptr, indices, data):
+        self._row_names = row_names
+        self._row_ids = row_ids
+        self._col_names = col_names
+        self._col_ids = col_ids
+        self._indptr = indptr
+        self._indices = indices
+        self._data = data
+
+    def _row(self, name: str) -> int:
+        idx = self._row_ids.get(name)
+        # Đỉnh không có cạnh nào không xuất hiện trong dict của build_graph()
+        if idx is None or self._indptr[idx] == self._indptr[idx + 1]:
+            return -1
+        return idx
+
+    def __getitem__(self, name: str) -> _SparseRowView:
+        idx = self._row(name)
+        if idx < 0:
+            raise KeyError(name)
+        start, end = self._indptr[idx], self._indptr[idx + 1]
+        return _SparseRowView(self._col_names, self._col_ids, self._indices[start:end], self._data[start:end])
+
+    def __contains__(self, name) -> bool:
+        return self._row(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        lengths = np.diff(self._indptr)
+        names = self._row_names
+        return (names[i] for i in np.flatnonzero(lengths).tolist())
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(np.diff(self._indptr)))
+
+
+class SparseGraph:
+    """
+    Biểu diễn gọn của đồ thị user-product (thay cho dict lồng dict).
+
+    - Users / products được intern thành id int liên tục (0..n-1),
+      tra cứu 2 chiều qua user_ids/user_names và product_ids/product_names
+    - Cạnh lưu ở 2 ma trận CSR: user×product (up_*) và product×user (pu_*)
+    - Trong mỗi hàng, cạnh giữ đúng thứ tự chèn như dict của build_graph()
+      → các scorer duyệt cùng thứ tự, xếp hạng (kể cả khi bằng điểm) trùng khớp
+    - as_graph_data() trả về view dạng dict → Recommendation dùng trực tiếp
+    """
+
+    def __init__(
+        self,
+        user_names: List[str],
+        product_names: List[str],
+        rows: np.ndarray,
+        cols: np.ndarray,
+        weights: np.ndarray
+    ):
+        self.user_names = user_names
+        self.product_names = product_names
+        self.user_ids: Dict[str, int] = {name: i for i, name in enumerate(user_names)}
+        self.product_ids: Dict[str, int] = {name: i for i, name in enumerate(product_names)}
+
+        n_users, n_products = len(user_names), len(product_names)
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        weights = np.asarray(weights, dtype=np.float64)
+
+        self.up_indptr, self.up_indices, self.up_data = self._to_csr(rows, cols, weights, n_users)
+        self.pu_indptr, self.pu_indices, self.pu_data = self._to_csr(cols, rows, weights, n_products)
+
+    @staticmethod
+    def _to_csr(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, n_rows: int):
+        # Sắp xếp ổn định theo hàng → trong hàng vẫn giữ thứ tự cạnh ban đầu
+        order = np.argsort(rows, kind='stable')
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return indptr, cols[order], weights[order]
+
+    @classmethod
+    def from_interactions(
+        cls,
+        normalizer: WeightNormalizer,
+        user_interactions: Dict[str, List[Tuple[str, str]]]
+    ) -> "SparseGraph":
+        """Dựng trực tiếp từ tương tác (cộng dồn trọng số giống GraphEngine.build_graph)"""
+        user_ids: Dict[str, int] = {}
+        product_ids: Dict[str, int] = {}
+        edges: Dict[Tuple[int, int], float] = {}
+
+        for user, interactions in user_interactions.items():
+            if not interactions:
+                continue
+            uid = user_ids.setdefault(user, len(user_ids))
+            for product, interaction_type in interactions:
+                pid = product_ids.setdefault(product, len(product_ids))
+                key = (uid, pid)
+                edges[key] = edges.get(key, 0.0) + normalizer.get_weight(interaction_type)
+
+        return cls._from_edge_dict(list(user_ids), list(product_ids), edges)
+
+    @classmethod
+    def from_graph_data(cls, graph_data: Dict) -> "SparseGraph":
+        """Chuyển từ dict của GraphEngine.build_graph() / InteractionGraph.as_graph_data()"""
+        user_ids: Dict[str, int] = {}
+        product_ids: Dict[str, int] = {}
+        edges: Dict[Tuple[int, int], float] = {}
+
+        for user, products in graph_data['user_to_products'].items():
+            uid = user_ids.setdefault(user, len(user_ids))
+            for product, weight in products.items():
+                pid = product_ids.setdefault(product, len(product_ids))
+                edges[(uid, pid)] = weight
+
+        return cls._from_edge_dict(list(user_ids), list(product_ids), edges)
+
+    @classmethod
+    def _from_edge_dict(cls, user_names, product_names, edges) -> "SparseGraph":
+        if edges:
+            rows, cols = zip(*edges.keys())
+            weights = list(edges.values())
+        else:
+            rows, cols, weights = (), (), ()
+        return cls(user_names, product_names, rows, cols, weights)
+
+    @property
+    def n_users(self) -> int:
+        return len(self.user_names)
+
+    @property
+    def n_products(self) -> int:
+        return len(self.product_names)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.up_data)
+
+    def user_id(self, name: str) -> Optional[int]:
+        return self.user_ids.get(name)
+
+    def product_id(self, name: str) -> Optional[int]:
+        return self.product_ids.get(name)
+
+    def user_row(self, uid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(product ids, trọng số) của 1 user"""
+        start, end = self.up_indptr[uid], self.up_indptr[uid + 1]
+        return self.up_indices[start:end], self.up_data[start:end]
+
+    def product_column(self, pid: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(user ids, trọng số) của 1 product"""
+        start, end = self.pu_indptr[pid], self.pu_indptr[pid + 1]
+        return self.pu_indices[start:end], self.pu_data[start:end]
+
+    def as_graph_data(self) -> Dict:
+        user_to_products = _SparseAdjacencyView(
+            self.user_names, self.user_ids, self.product_names, self.product_ids,
+            self.up_indptr, self.up_indices, self.up_data
+        )
+        product_to_users = _SparseAdjacencyView(
+            self.product_names, self.product_ids, self.user_names, self.user_ids,
+            self.pu_indptr, self.pu_indices, self.pu_data
+        )
+        return {
+            'user_to_products': user_to_products,
+            'product_to_users': product_to_users,
+            'users': user_to_products.keys(),
+            'products': product_to_users.keys()
+        }
+
+    # ===== Đo bộ nhớ =====
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Số byte: mảng CSR + bảng tra cứu id↔tên (chuỗi tên được tính 1 lần)"""
+        arrays = sum(a.nbytes for a in (
+            self.up_indptr, self.up_indices, self.up_data,
+            self.pu_indptr, self.pu_indices, self.pu_data
+        ))
+        tables = (
+            sys.getsizeof(self.user_names) + sys.getsizeof(self.product_names)
+            + sys.getsizeof(self.user_ids) + sys.getsizeof(self.product_ids)
+            + sum(sys.getsizeof(i) for i in self.user_ids.values())
+            + sum(sys.getsizeof(i) for i in self.product_ids.values())
+        )
+        strings = sum(sys.getsizeof(n) for n in self.user_names) + sum(sys.getsizeof(n) for n in self.product_names)
+        return {"arrays": arrays, "lookup_tables": tables, "strings": strings,
+                "total": arrays + tables + strings}
+
+    @staticmethod
+    def dict_memory_usage(graph_data: Dict) -> Dict[str, int]:
+        """Số byte của dạng dict lồng dict (build_graph), tính theo cùng cách"""
+        containers = 0
+        floats = 0
+        names = set()
+        for key in ('user_to_products', 'product_to_users'):
+            outer = graph_data[key]
+            containers += sys.getsizeof(outer)
+            for name, inner in outer.items():
+                names.add(name)
+                containers += sys.getsizeof(inner)
+                for other, weight in inner.items():
+                    names.add(other)
+                    floats += sys.getsizeof(weight)
+        containers += sys.getsizeof(graph_data['users']) + sys.getsizeof(graph_data['products'])
+        strings = sum(sys.getsizeof(n) for n in names)
+        return {"containers": containers, "floats": floats, "strings": strings,
+                "total": containers + floats + strings}
+
+    def print_memory_report(self, graph_data: Dict):
+        sparse = self.memory_usage()
+        dense = self.dict_memory_usage(graph_data)
+        ratio = dense["total"] / sparse["total"] if sparse["total"] else 0.0
+
+        print(f"\n{'='*70}")
+        print(f"💾 BỘ NHỚ ĐỒ THỊ ({self.n_users} users, {self.n_products} products, {self.nnz} cạnh)")
+        print(f"{'='*70}")
+        print(f"   Dict lồng dict : {dense['total'] / 1024:>10,.1f} KB")
+        print(f"   CSR + intern   : {sparse['total'] / 1024:>10,.1f} KB "
+              f"(mảng {sparse['arrays'] / 1024:,.1f} KB)")
+        print(f"   Tiết kiệm      : {ratio:>10.1f}x")
+        print(f"{'='*70}\n")
@@ -0,0 +1,87 @@
+from typing import Dict, List, Optional, Tuple
+import bisect
+
+# (-sold_count, seq, product_id): nhỏ hơn = bán chạy hơn, bằng nhau → thứ tự catalog
+_Key = Tuple[int, int, str]
+
+
+class TopSellingIndex:
+    """
+    Bảng xếp hạng bán chạy được duy trì liên tục (thay cho sort mỗi lần gọi).
+
+    - Danh sách khoá đã sắp xếp (bisect) cho toàn catalog + 1 danh sách mỗi category
+    - Bán hàng → update(product): gỡ khoá cũ, chèn khoá mới; bisect tìm vị trí O(log n)
+      nhưng chèn/xoá trong list phải dời phần tử phía sau → O(n) mỗi lần cập nhật
+      (dời bộ nhớ liên tục, vẫn rẻ hơn nhiều so với sort lại cả catalog)
+    - top(k) / top_by_category(category, k): cắt k phần tử đầu, O(k)
+    - Bằng sold_count giữ thứ tự thêm vào → trùng với sorted(..., reverse=True) ổn định
+    """
+
+    def __init__(self, products=None):
+        self._ranking: List[_Key] = []
+        self._by_category: Dict[str, List[_Key]] = {}
+        self._entries: Dict[str, Tuple[_Key, str]] = {}   # product_id → (khoá, category)
+        self._products: Dict[str, object] = {}
+        self._seq: Dict[str, int] = {}                     # giữ nguyên khi cập nhật
+        self._counter = 0
+
+        for p in products or []:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _discard(keys: List[_Key], key: _Key):
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def add(self, product):
+        """Thêm hoặc cập nhật 1 sản phẩm"""
+        pid = product.id
+        if pid in self._entries:
+            self.remove(pid)
+
+        seq = self._seq.get(pid)
+        if seq is None:
+            seq = self._seq[pid] = self._counter
+            self._counter += 1
+
+        key = (-product.sold_count, seq, pid)
+        bisect.insort(self._ranking, key)
+        bisect.insort(self._by_category.setdefault(product.category, []), key)
+        self._entries[pid] = (key, product.category)
+        self._products[pid] = product
+
+    def remove(self, product_id: str):
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        key, category = entry
+        self._discard(self._ranking, key)
+        bucket = self._by_category[category]
+        self._discard(bucket, key)
+        if not bucket:
+            del self._by_category[category]
+        del self._products[product_id]
+
+    def update(self, product):
+        """Gọi khi sold_count / category thay đổi; không đổi thì bỏ qua"""
+        entry = self._entries.get(product.id)
+        if entry and entry[0][0] == -product.sold_count and entry[1] == product.category:
+            return
+        self.add(product)
+
+    def top(self, k: int = 10) -> List:
+        return [self._products[pid] for _, _, pid in self._ranking[:k]]
+
+    def top_by_category(self, category: str, k: int = 10) -> List:
+        return [self._products[pid] for _, _, pid in self._by_category.get(category, [])[:k]]
+
+    def rank_of(self, product_id: str) -> Optional[int]:
+        """Thứ hạng (bắt đầu từ 1) trong toàn catalog"""
+        entry = self._entries.get(product_id)
+        if entry is None:
+            return None
+        return bisect.bisect_left(self._ranking, entry[0]) + 1
\ No newline at end of file
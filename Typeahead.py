@@ -0,0 +1,135 @@
+from typing import Dict, List, Tuple
+import bisect
+import heapq
+
+from SearchIndex import tokenize
+
+# (-sold_count, seq, product_id): nhỏ hơn = bán chạy hơn
+_Key = Tuple[int, int, str]
+
+
+class _TrieNode:
+    __slots__ = ("children", "terminal", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.terminal: Dict[str, _Key] = {}   # sản phẩm có chuỗi kết thúc tại node này
+        self.top: List[_Key] = []             # top-K của cả cây con, đã sắp xếp
+
+
+class PrefixTrie:
+    """
+    Trie gợi ý tên sản phẩm (typeahead), không phân biệt dấu.
+
+    - Chèn tên đã bỏ dấu và mọi hậu tố bắt đầu từ 1 từ:
+      "ao khoac da" → "ao khoac da", "khoac da", "da"
+      → gõ "khoac" cũng gợi ý được "Áo khoác dạ"
+    - Mỗi node cache sẵn top-K (K = cache_size) sản phẩm theo sold_count của cả cây con
+      → suggest(k <= cache_size) chỉ đi theo tiền tố: O(len(prefix)), không phụ thuộc
+      catalog; k lớn hơn thì duyệt cây con (chậm hơn nhưng không bị cắt ở K)
+    - Xoá / cập nhật: tính lại top-K dọc đường đi từ các node con
+    """
+
+    def __init__(self, products=None, cache_size: int = 10):
+        self.cache_size = cache_size
+        self._root = _TrieNode()
+        self._entries: Dict[str, Tuple[_Key, List[str], str]] = {}  # pid → (key, chuỗi đã chèn, tên)
+        self._counter = 0
+
+        for p in products or []:
+            self.add(p)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _suffixes(name: str) -> List[str]:
+        tokens = tokenize(name)
+        return list(dict.fromkeys(" ".join(tokens[i:]) for i in range(len(tokens))))
+
+    def add(self, product):
+        """Thêm hoặc cập nhật 1 sản phẩm"""
+        if product.id in self._entries:
+            self.remove(product.id)
+
+        key = (-product.sold_count, self._counter, product.id)
+        self._counter += 1
+        suffixes = self._suffixes(product.name)
+        self._entries[product.id] = (key, suffixes, product.name)
+
+        for text in suffixes:
+            node = self._root
+            self._push(node, key)
+            for ch in text:
+                node = node.children.setdefault(ch, _TrieNode())
+                self._push(node, key)
+            node.terminal[product.id] = key
+
+    def _push(self, node: _TrieNode, key: _Key):
+        top = node.top
+        if any(k[2] == key[2] for k in top):
+            return
+        if len(top) < self.cache_size or key < top[-1]:
+            bisect.insort(top, key)
+            del top[self.cache_size:]
+
+    def remove(self, product_id: str):
+        entry = self._entries.pop(product_id, None)
+        if entry is None:
+            return
+        key, suffixes, _ = entry
+
+        for text in suffixes:
+            path = [self._root]
+            for ch in text:
+                path.append(path[-1].children[ch])
+            path[-1].terminal.pop(product_id, None)
+
+            # Tính lại top-K từ dưới lên; node rỗng thì cắt khỏi cây
+            for depth in range(len(path) - 1, -1, -1):
+                node = path[depth]
+                if depth > 0 and not node.children and not node.terminal:
+                    del path[depth - 1].children[text[depth - 1]]
+                    continue
+                if any(k[2] == product_id for k in node.top):
+                    self._recompute(node)
+
+    def _recompute(self, node: _TrieNode):
+        candidates: Dict[str, _Key] = dict(node.terminal)
+        for child in node.children.values():
+            for k in child.top:
+                candidates[k[2]] = k
+        node.top = heapq.nsmallest(self.cache_size, candidates.values())
+
+    def update(self, product):
+        """Cập nhật khi sold_count (hoặc tên) thay đổi"""
+        entry = self._entries.get(product.id)
+        if entry and entry[0][0] == -product.sold_count and entry[2] == product.name:
+            return
+        self.add(product)
+
+    def suggest(self, prefix: str, k: int = 5) -> List[str]:
+        """
+        Top-k tên sản phẩm bắt đầu (theo từ) bằng prefix, bán chạy nhất trước.
+
+        k <= cache_size: đọc top-K đã cache ở node, O(len(prefix)).
+        k > cache_size: cache không đủ → duyệt cả cây con của prefix, O(kích thước cây con).
+        """
+        node = self._root
+        for ch in " ".join(tokenize(prefix)):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        top = node.top[:k] if k <= self.cache_size else self._subtree_top(node, k)
+        return [self._entries[pid][2] for _, _, pid in top]
+
+    @staticmethod
+    def _subtree_top(node: _TrieNode, k: int) -> List[_Key]:
+        # 1 sản phẩm có thể nằm ở nhiều hậu tố trong cùng cây con → gộp theo product_id
+        candidates: Dict[str, _Key] = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            candidates.update(current.terminal)
+            stack.extend(current.children.values())
+        return heapq.nsmallest(k, candidates.values())
\ No newline at end of file
@@ -1,4 +1,4 @@
-class User:
-    def __init__(self, username, password_hash):
-        self.username = username
+class User:
+    def __init__(self, username, password_hash):
+        self.username = username
         self.password_hash = password_hash
\ No newline at end of file
@@ -0,0 +1,343 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import math
+import random
+import time
+import zlib
+
+import numpy as np
+
+_PRIME = (1 << 31) - 1
+_EMPTY = np.uint32(_PRIME)      # lớn hơn mọi giá trị hash → chữ ký của tập rỗng
+
+
+class UserLSH:
+    """
+    Chỉ mục LSH tìm users tương tự (ứng viên cho Collaborative Filtering).
+
+    - Mỗi user = tập sản phẩm đã tương tác; chữ ký MinHash num_perm giá trị:
+          sig[i] = min_{p ∈ tập} h_i(p),  h_i(x) = (a_i·x + b_i) mod (2³¹−1)
+      P(sig_u[i] == sig_v[i]) = Jaccard(u, v)
+    - Banding: chia chữ ký thành `bands` dải × r = `num_perm/bands` hàng; 2 users vào
+      cùng bucket ở ít nhất 1 dải → là ứng viên. Ngưỡng Jaccard ≈ (1/bands)^(1/r):
+      mặc định 64 × 2 → ≈ 0.125 (tập sản phẩm của users nhỏ, Jaccard hàng xóm thật
+      thấp; 32 × 4 / 16 × 8 làm recall hàng xóm tụt xuống < 0.25)
+    - Ngưỡng thấp → users ít sản phẩm cùng mua 1 sản phẩm bán chạy rơi chung bucket:
+      bucket lớn hơn max_bucket_size bị bỏ qua khi query (không phân biệt được ai
+      giống ai, mà chi phí hợp + so chữ ký là O(|bucket|·num_perm)); các bucket còn
+      lại hợp từ nhỏ đến lớn, dừng khi vượt max_union users
+      → query() O(bands + max_union·num_perm) bất kể hub
+    - query(): hợp các bucket, vượt max_candidates → giữ users có chữ ký giống nhất;
+      thống kê lần gọi gần nhất ở self.last_stats
+    - Là listener của InteractionGraph: thêm cạnh → cập nhật chữ ký O(num_perm);
+      gỡ cạnh → tính lại chữ ký của riêng user đó
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 64,
+        max_candidates: int = 200,
+        max_bucket_size: int = 500,
+        max_union: int = 2000,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm phải chia hết cho bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.max_candidates = max_candidates
+        self.max_bucket_size = max_bucket_size
+        self.max_union = max_union
+        self.last_stats: Dict = {}
+
+        rng = random.Random(seed)
+        self._a = np.array([rng.randrange(1, _PRIME) for _ in range(num_perm)], dtype=np.int64)
+        self._b = np.array([rng.randrange(0, _PRIME) for _ in range(num_perm)], dtype=np.int64)
+        self._product_hashes: Dict[str, np.ndarray] = {}
+
+        self._items: Dict[str, Set[str]] = {}
+        self._row_of: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._signatures = np.full((0, num_perm), _EMPTY, dtype=np.uint32)
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+
+    @classmethod
+    def attach(cls, graph, **options) -> "UserLSH":
+        """Dựng từ InteractionGraph hiện tại và đăng ký nhận cập nhật"""
+        index = cls(**options)
+        index.rebuild(graph.as_graph_data())
+        graph.add_listener(index)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._items
+
+    # ===== Chữ ký =====
+
+    def _hashes(self, product: str) -> np.ndarray:
+        hashes = self._product_hashes.get(product)
+        if hashes is None:
+            x = zlib.crc32(product.encode("utf-8")) % _PRIME
+            hashes = ((self._a * x + self._b) % _PRIME).astype(np.uint32)
+            self._product_hashes[product] = hashes
+        return hashes
+
+    def _signature(self, products: Iterable[str]) -> np.ndarray:
+        signature = np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        for product in products:
+            np.minimum(signature, self._hashes(product), out=signature)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        r = self.rows_per_band
+        return [signature[i * r:(i + 1) * r].tobytes() for i in range(self.bands)]
+
+    def _row(self, username: str) -> int:
+        row = self._row_of.get(username)
+        if row is None:
+            row = len(self._names)
+            if row == len(self._signatures):
+                grown = np.full((max(16, 2 * row), self.num_perm), _EMPTY, dtype=np.uint32)
+                grown[:row] = self._signatures
+                self._signatures = grown
+            self._row_of[username] = row
+            self._names.append(username)
+        return row
+
+    def _set_signature(self, username: str, signature: np.ndarray):
+        row = self._row(username)
+        old = self._signatures[row]
+        old_keys = self._band_keys(old) if old[0] != _EMPTY else [None] * self.bands
+        new_keys = self._band_keys(signature) if signature[0] != _EMPTY else [None] * self.bands
+
+        for band, (old_key, new_key) in enumerate(zip(old_keys, new_keys)):
+            if old_key == new_key:
+                continue
+            buckets = self._buckets[band]
+            if old_key is not None:
+                members = buckets[old_key]
+                members.discard(username)
+                if not members:
+                    del buckets[old_key]
+            if new_key is not None:
+                buckets.setdefault(new_key, set()).add(username)
+        self._signatures[row] = signature
+
+    # ===== Cập nhật =====
+
+    def add(self, username: str, product: str):
+        items = self._items.setdefault(username, set())
+        if product in items:
+            return
+        items.add(product)
+        row = self._row(username)
+        self._set_signature(username, np.minimum(self._signatures[row], self._hashes(product)))
+
+    def remove(self, username: str, product: str):
+        items = self._items.get(username)
+        if not items or product not in items:
+            return
+        items.discard(product)
+        if not items:
+            del self._items[username]
+        self._set_signature(username, self._signature(items))
+
+    def rebuild(self, graph_data: Dict):
+        self._items.clear()
+        self._row_of.clear()
+        self._names.clear()
+        self._signatures = np.full((0, self.num_perm), _EMPTY, dtype=np.uint32)
+        self._buckets = [{} for _ in range(self.bands)]
+        for user, products in graph_data['user_to_products'].items():
+            if products:
+                self._items[user] = set(products)
+                self._set_signature(user, self._signature(products))
+
+    # ===== Tra cứu =====
+
+    def query(self, username: str, max_candidates: Optional[int] = None) -> List[str]:
+        """Users có khả năng tương tự (không gồm chính user), tối đa max_candidates"""
+        row = self._row_of.get(username)
+        if row is None or username not in self._items:
+            self.last_stats = {"union": 0, "skipped_buckets": 0, "ms": 0.0}
+            return []
+        start = time.perf_counter()
+        limit = self.max_candidates if max_candidates is None else max_candidates
+        signature = self._signatures[row]
+
+        buckets = []
+        skipped = 0
+        for band, key in enumerate(self._band_keys(signature)):
+            members = self._buckets[band].get(key)
+            if not members:
+                continue
+            if len(members) > self.max_bucket_size:
+                skipped += 1
+                continue
+            buckets.append(members)
+
+        # Bucket nhỏ (cụ thể hơn) trước; hợp đủ max_union users thì dừng
+        candidates: Set[str] = set()
+        for members in sorted(buckets, key=len):
+            candidates |= members
+            if len(candidates) > self.max_union:
+                break
+        candidates.discard(username)
+        self.last_stats = {"union": len(candidates), "skipped_buckets": skipped}
+        if len(candidates) <= limit:
+            result = sorted(candidates, key=self._row_of.__getitem__)
+            self.last_stats["ms"] = (time.perf_counter() - start) * 1000
+            return result
+
+        # Quá nhiều → giữ users có tỉ lệ trùng chữ ký (≈ Jaccard) cao nhất
+        rows = np.fromiter((self._row_of[u] for u in candidates), dtype=np.int64, count=len(candidates))
+        agreement = (self._signatures[rows] == signature).sum(axis=1)
+        top = np.argpartition(-agreement, limit - 1)[:limit]
+        top = top[np.lexsort((rows[top], -agreement[top]))]
+        result = [self._names[r] for r in rows[top]]
+        self.last_stats["ms"] = (time.perf_counter() - start) * 1000
+        return result
+
+    def estimated_jaccard(self, user_a: str, user_b: str) -> float:
+        if user_a not in self._items or user_b not in self._items:
+            return 0.0
+        sig_a = self._signatures[self._row_of[user_a]]
+        sig_b = self._signatures[self._row_of[user_b]]
+        return float((sig_a == sig_b).mean())
+
+    # ===== Listener của InteractionGraph =====
+
+    def on_edge_changed(self, user: str, product: str, old: Optional[float], new: Optional[float]):
+        if old is None and new is not None:
+            self.add(user, product)
+        elif new is None:
+            self.remove(user, product)
+
+    def on_graph_reset(self, graph):
+        self.rebuild(graph.as_graph_data())
+
+
+def evaluate(
+    recommender,
+    index: UserLSH,
+    users: Iterable[str],
+    k: int = 50
+) -> Dict[str, float]:
+    """
+    So sánh CF đầy đủ với CF chỉ trên ứng viên LSH.
+
+    - neighbour_recall: tỉ lệ k hàng xóm thật (theo similarity của CF:
+      Σ_a min(w(u,a), w(v,a))) nằm trong tập ứng viên LSH
+    - collab_overlap: tỉ lệ top-5 COLLAB trùng nhau giữa 2 cách
+    - speedup: thời gian CF đầy đủ / thời gian CF dùng LSH (gồm cả query)
+    - query_p90_ms / union_p90: p90 thời gian query() và số users trong hợp các bucket
+    """
+    user_to_products = recommender.user_to_products
+    product_to_users = recommender.product_to_users
+
+    recall_sum, overlap_sum, n = 0.0, 0.0, 0
+    exact_seconds, lsh_seconds = 0.0, 0.0
+    query_ms: List[float] = []
+    unions: List[int] = []
+    saved_index = recommender.neighbor_index
+    try:
+        for user in users:
+            if user not in user_to_products:
+                continue
+            similarity: Dict[str, float] = {}
+            for product, weight_u in user_to_products[user].items():
+                for other, weight_v in product_to_users.get(product, {}).items():
+                    if other != user:
+                        similarity[other] = similarity.get(other, 0.0) + min(weight_u, weight_v)
+            true_neighbours = sorted(similarity, key=lambda v: (-similarity[v], v))[:k]
+
+            recommender.neighbor_index = None
+            start = time.perf_counter()
+            exact = recommender._collaborative_filtering_optimized(user, set())
+            exact_seconds += time.perf_counter() - start
+
+            recommender.neighbor_index = index
+            start = time.perf_counter()
+            approx = recommender._collaborative_filtering_optimized(user, set())
+            lsh_seconds += time.perf_counter() - start
+
+            candidates = set(index.query(user))
+            query_ms.append(index.last_stats["ms"])
+            unions.append(index.last_stats["union"])
+            if true_neighbours:
+                recall_sum += sum(v in candidates for v in true_neighbours) / len(true_neighbours)
+            else:
+                recall_sum += 1.0
+            exact_names = {p for p, _, _ in exact}
+            overlap_sum += len(exact_names & {p for p, _, _ in approx}) / len(exact_names) if exact_names else 1.0
+            n += 1
+    finally:
+        recommender.neighbor_index = saved_index
+
+    return {
+        "users": n,
+        "neighbour_recall": recall_sum / n if n else 0.0,
+        "collab_overlap": overlap_sum / n if n else 0.0,
+        "exact_ms": exact_seconds / n * 1000 if n else 0.0,
+        "lsh_ms": lsh_seconds / n * 1000 if n else 0.0,
+        "speedup": exact_seconds / lsh_seconds if lsh_seconds > 0 else 0.0,
+        "query_p90_ms": _p90(query_ms),
+        "union_p90": _p90(unions),
+    }
+
+
+def _p90(values: List[float]) -> float:
+    values = sorted(values)
+    # nearest-rank: phần tử thứ ⌈0.9·n⌉
+    return float(values[math.ceil(0.9 * len(values)) - 1]) if values else 0.0
+
+
+def main():
+    import argparse
+    from DataAccess import DataAccess
+    from ProductManager import ProductManager
+    from InteractionTracker import InteractionTracker
+    from GraphEngine import GraphEngine
+    from WeightNormalizer import WeightNormalizer
+    from Recommendation import Recommendation
+
+    parser = argparse.ArgumentParser(description="Đánh giá LSH cho ứng viên CF (recall hàng xóm, tăng tốc)")
+    parser.add_argument("--users", type=int, default=200, help="số users đánh giá")
+    parser.add_argument("--num-perm", type=int, default=128, help="độ dài chữ ký MinHash")
+    parser.add_argument("--bands", type=int, default=64, help="số dải")
+    parser.add_argument("--max-candidates", type=int, default=200, help="số ứng viên tối đa")
+    parser.add_argument("--max-bucket-size", type=int, default=500, help="bỏ qua bucket lớn hơn khi query")
+    parser.add_argument("--max-union", type=int, default=2000, help="số users tối đa khi hợp các bucket")
+    parser.add_argument("--k", type=int, default=50, help="số hàng xóm thật dùng để tính recall")
+    args = parser.parse_args()
+
+    product_manager = ProductManager(DataAccess().load_products())
+    tracker = InteractionTracker(refresh="manual")
+    try:
+        user_interactions = tracker.get_all_interactions_for_recommendation()
+    finally:
+        tracker.close()
+
+    graph_data = GraphEngine(WeightNormalizer()).build_graph(user_interactions, verbose=False)
+    start = time.perf_counter()
+    index = UserLSH(args.num_perm, args.bands, args.max_candidates, args.max_bucket_size, args.max_union)
+    index.rebuild(graph_data)
+    print(f"✅ Dựng LSH cho {len(index)} users trong {time.perf_counter() - start:.2f}s")
+
+    recommender = Recommendation(graph_data, product_manager, verbose=False)
+    users = random.Random(42).sample(sorted(graph_data['user_to_products']),
+                                     min(args.users, len(graph_data['user_to_products'])))
+    report = evaluate(recommender, index, users, k=args.k)
+    print(f"\n📊 {report['users']} users | recall hàng xóm@{args.k} {report['neighbour_recall']:.3f} | "
+          f"trùng top-5 COLLAB {report['collab_overlap']:.3f}")
+    print(f"⚡ CF đầy đủ {report['exact_ms']:.2f}ms → LSH {report['lsh_ms']:.2f}ms "
+          f"(nhanh hơn {report['speedup']:.1f}×)")
+    print(f"🔍 query() p90 {report['query_p90_ms']:.2f}ms | hợp bucket p90 {report['union_p90']:.0f} users")
+
+
+if __name__ == "__main__":
+    main()
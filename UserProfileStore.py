@@ -0,0 +1,239 @@
+from typing import Dict, List, Optional, Set, Tuple
+import math
+
+
+class UserProfile:
+    """Tổng hợp của 1 user, cập nhật tăng dần theo từng cạnh của đồ thị"""
+
+    __slots__ = ("edges", "info", "category_scores", "category_counts",
+                 "price_sum", "price_count", "purchase_count", "updates")
+
+    def __init__(self):
+        self.edges: Dict[str, float] = {}       # product → trọng số cạnh hiện tại
+        # product → (category, price) đang được cộng vào tổng (None nếu không có trong catalog)
+        # → gỡ cạnh trừ đúng giá trị đã cộng
+        self.info: Dict[str, Optional[Tuple[str, int]]] = {}
+        self.category_scores: Dict[str, float] = {}
+        self.category_counts: Dict[str, int] = {}
+        self.price_sum = 0
+        self.price_count = 0
+        self.purchase_count = 0
+        self.updates = 0                        # số lần cộng dồn kể từ lần tính lại gần nhất
+
+    def __repr__(self) -> str:
+        return (f"UserProfile({len(self.edges)} products, "
+                f"{len(self.category_scores)} categories, {self.purchase_count} purchases)")
+
+
+class UserProfileStore:
+    """
+    Hồ sơ user (category affinity, giá trung bình, số lần mua) luôn sẵn sàng.
+
+    - Là listener của InteractionGraph: mỗi cạnh đổi trọng số → cập nhật O(1)
+    - Recommendation đọc trực tiếp thay vì quét lại toàn bộ sản phẩm của user
+      (và của từng user hàng xóm trong vòng lặp CF) ở mỗi request
+    - Cùng quy tắc với Recommendation:
+        category_scores  = Σ trọng số cạnh theo category
+        avg_price        = trung bình giá các sản phẩm có trong catalog
+        purchase_count   = số cạnh có trọng số ≥ PURCHASE_THRESHOLD
+    - category_scores cộng dồn `+= new − old` nên sai số float tích luỹ dần:
+      sau RECOMPUTE_EVERY lần cập nhật, hồ sơ được tính lại từ các cạnh (O(1) khấu hao)
+    - Là listener của ProductManager: sản phẩm đổi category / giá / tên → tính lại
+      hồ sơ của đúng những users có cạnh tới sản phẩm đó
+    """
+
+    PURCHASE_THRESHOLD = 0.9
+    DEFAULT_AVG_PRICE = 500000
+    RECOMPUTE_EVERY = 256
+
+    def __init__(self, product_manager):
+        self.product_manager = product_manager
+        self._profiles: Dict[str, UserProfile] = {}
+        self._users_of: Dict[str, Set[str]] = {}     # product → users có cạnh tới nó
+
+    @classmethod
+    def attach(cls, graph, product_manager) -> "UserProfileStore":
+        """Dựng từ InteractionGraph hiện tại và đăng ký nhận cập nhật (đồ thị + catalog)"""
+        store = cls(product_manager)
+        store.rebuild(graph.as_graph_data())
+        graph.add_listener(store)
+        if hasattr(product_manager, 'add_listener'):
+            product_manager.add_listener(store)
+        return store
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def __contains__(self, username: str) -> bool:
+        return username in self._profiles
+
+    def rebuild(self, graph_data: Dict):
+        self._profiles.clear()
+        self._users_of.clear()
+        for user, products in graph_data['user_to_products'].items():
+            for product, weight in products.items():
+                self.on_edge_changed(user, product, None, weight)
+
+    def _product_info(self, product: str) -> Optional[Tuple[str, int]]:
+        product_obj = self.product_manager.get_product_by_name(product)
+        return (product_obj.category, product_obj.price) if product_obj else None
+
+    def recompute(self, username: str, refresh_info: bool = False):
+        """
+        Tính lại tổng của 1 user từ các cạnh (bỏ sai số cộng dồn).
+        refresh_info: đọc lại category / giá hiện tại từ catalog.
+        """
+        profile = self._profiles.get(username)
+        if profile is None:
+            return
+        if refresh_info:
+            profile.info = {product: self._product_info(product) for product in profile.edges}
+
+        category_scores: Dict[str, float] = {}
+        category_counts: Dict[str, int] = {}
+        price_sum = price_count = 0
+        for product, weight in profile.edges.items():
+            info = profile.info[product]
+            if info is None:
+                continue
+            category, price = info
+            category_scores[category] = category_scores.get(category, 0.0) + weight
+            category_counts[category] = category_counts.get(category, 0) + 1
+            price_sum += price
+            price_count += 1
+
+        profile.category_scores = category_scores
+        profile.category_counts = category_counts
+        profile.price_sum = price_sum
+        profile.price_count = price_count
+        profile.updates = 0
+
+    # ===== Listener của InteractionGraph =====
+
+    def on_edge_changed(self, user: str, product: str, old: Optional[float], new: Optional[float]):
+        profile = self._profiles.get(user)
+        if profile is None:
+            if new is None:
+                return
+            profile = self._profiles[user] = UserProfile()
+
+        if old is None:
+            info = profile.info[product] = self._product_info(product)
+            self._users_of.setdefault(product, set()).add(user)
+            if info is not None:
+                category, price = info
+                profile.category_counts[category] = profile.category_counts.get(category, 0) + 1
+                profile.category_scores.setdefault(category, 0.0)
+                profile.price_sum += price
+                profile.price_count += 1
+        else:
+            info = profile.info.get(product)
+
+        if info is not None:
+            category = info[0]
+            profile.category_scores[category] += (new or 0.0) - (old or 0.0)
+
+        threshold = self.PURCHASE_THRESHOLD
+        profile.purchase_count += (new is not None and new >= threshold) - (old is not None and old >= threshold)
+
+        if new is None:
+            profile.edges.pop(product, None)
+            profile.info.pop(product, None)
+            users = self._users_of.get(product)
+            if users is not None:
+                users.discard(user)
+                if not users:
+                    del self._users_of[product]
+            if info is not None:
+                category, price = info
+                profile.category_counts[category] -= 1
+                if not profile.category_counts[category]:
+                    del profile.category_counts[category]
+                    del profile.category_scores[category]
+                profile.price_sum -= price
+                profile.price_count -= 1
+            if not profile.edges:
+                del self._profiles[user]
+                return
+        else:
+            profile.edges[product] = new
+
+        if old is not None:
+            profile.updates += 1
+            if profile.updates >= self.RECOMPUTE_EVERY:
+                self.recompute(user)
+
+    def on_graph_reset(self, graph):
+        self.rebuild(graph.as_graph_data())
+
+    # ===== Listener của ProductManager =====
+
+    def on_product_changed(self, old_name: Optional[str], product):
+        names = {old_name, product.name if product is not None else None} - {None}
+        users = set()
+        for name in names:
+            users |= self._users_of.get(name, set())
+        for user in users:
+            self.recompute(user, refresh_info=True)
+
+    # ===== Kiểm tra =====
+
+    def check_consistency(self, graph_data: Dict, tolerance: float = 1e-9, repair: bool = True) -> List[str]:
+        """
+        So sánh với hồ sơ dựng lại từ đầu (category / giá đọc lại từ catalog).
+        repair: user lệch được tính lại từ cạnh + catalog hiện tại.
+
+        Returns:
+            Danh sách khác biệt (rỗng = nhất quán)
+        """
+        expected = UserProfileStore(self.product_manager)
+        expected.rebuild(graph_data)
+        problems = []
+
+        for user in set(self._profiles) | set(expected._profiles):
+            actual, wanted = self._profiles.get(user), expected._profiles.get(user)
+            if actual is None or wanted is None:
+                problems.append(f"{user!r}: thiếu ở một phía")
+                continue
+            mismatch = (
+                actual.purchase_count != wanted.purchase_count
+                or actual.price_sum != wanted.price_sum
+                or actual.price_count != wanted.price_count
+                or set(actual.category_scores) != set(wanted.category_scores)
+                or any(not math.isclose(actual.category_scores[c], score, rel_tol=tolerance, abs_tol=tolerance)
+                       for c, score in wanted.category_scores.items())
+            )
+            if mismatch:
+                problems.append(f"{user!r}: {actual.category_scores} != {wanted.category_scores}")
+                if repair:
+                    self.recompute(user, refresh_info=True)
+
+        return problems
+
+    # ===== Truy vấn =====
+
+    def get_profile(self, username: str) -> Optional[UserProfile]:
+        return self._profiles.get(username)
+
+    def category_scores(self, username: str) -> Dict[str, float]:
+        profile = self._profiles.get(username)
+        return dict(profile.category_scores) if profile else {}
+
+    def avg_price(self, username: str) -> float:
+        profile = self._profiles.get(username)
+        if profile is None or not profile.price_count:
+            return self.DEFAULT_AVG_PRICE
+        return profile.price_sum / profile.price_count
+
+    def purchase_count(self, username: str) -> int:
+        profile = self._profiles.get(username)
+        return profile.purchase_count if profile else 0
+
+    def confidence(self, username: str) -> float:
+        """Giống Recommendation._get_user_confidence"""
+        purchase_count = self.purchase_count(username)
+        if purchase_count >= 5:
+            return 1.5
+        elif purchase_count >= 2:
+            return 1.2
+        return 1.0
\ No newline at end of file
@@ -0,0 +1,157 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from SparseGraph import SparseGraph
+
+
+class VectorizedCF:
+    """
+    Collaborative Filtering vector hoá trên SparseGraph.
+
+    Cùng công thức với Recommendation._collaborative_filtering_optimized:
+        score(b) = Σ_a Σ_v  min(w(u,a), w(v,a)) × w(v,b) × confidence(v)
+    nhưng gom lại thành 2 phép "nhân ma trận thưa":
+        1. s(v)     = Σ_a min(w(u,a), w(v,a))        (u → product → v)
+        2. score(b) = Σ_v s(v) × confidence(v) × w(v,b)  (v → product)
+    Mỗi bước là gather + np.bincount, không còn vòng lặp Python lồng nhau.
+    """
+
+    def __init__(self, graph: SparseGraph):
+        self.graph = graph
+
+        # Confidence của mọi user tính 1 lần (giống _get_user_confidence)
+        row_ids = np.repeat(np.arange(graph.n_users), np.diff(graph.up_indptr))
+        purchase_count = np.bincount(
+            row_ids, weights=(graph.up_data >= 0.9), minlength=graph.n_users
+        )
+        self.confidence = np.where(
+            purchase_count >= 5, 1.5, np.where(purchase_count >= 2, 1.2, 1.0)
+        )
+
+    @staticmethod
+    def _gather(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vị trí phẳng của các phần tử thuộc những hàng `rows` + độ dài mỗi hàng"""
+        starts = indptr[rows]
+        lengths = indptr[rows + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), lengths
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return offsets + np.arange(total), lengths
+
+    def score_vector(self, uid: int, neighbour_ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        neighbour_ids: user ids được phép làm hàng xóm (vd. từ UserLSH); None → mọi user chung sản phẩm
+
+        Returns:
+            (điểm cho mọi product, mask product được chạm tới, số users tương tự)
+        """
+        g = self.graph
+        products, weights_u = g.user_row(uid)
+
+        if neighbour_ids is None:
+            # Bước 1: u → product a → v
+            pos, lengths = self._gather(g.pu_indptr, products)
+            others = g.pu_indices[pos]
+            similarity = np.minimum(np.repeat(weights_u, lengths), g.pu_data[pos])
+            keep = others != uid
+            others, similarity = others[keep], similarity[keep]
+
+            user_sim = np.bincount(others, weights=similarity, minlength=g.n_users)
+            neighbours = np.flatnonzero(np.bincount(others, minlength=g.n_users))
+            neighbour_sim = user_sim[neighbours]
+        else:
+            # Bước 1 chỉ trên ứng viên: duyệt hàng của từng ứng viên v, so với sản phẩm của u
+            allowed = np.unique(neighbour_ids)
+            allowed = allowed[allowed != uid]
+            dense_u = np.zeros(g.n_products)
+            dense_u[products] = weights_u
+            touched = np.zeros(g.n_products, dtype=bool)
+            touched[products] = True
+
+            pos, lengths = self._gather(g.up_indptr, allowed)
+            owner = np.repeat(np.arange(len(allowed)), lengths)
+            items = g.up_indices[pos]
+            similarity = np.minimum(dense_u[items], g.up_data[pos])
+            shared = np.bincount(owner, weights=touched[items], minlength=len(allowed)) > 0
+            allowed_sim = np.bincount(owner, weights=similarity, minlength=len(allowed))
+            neighbours, neighbour_sim = allowed[shared], allowed_sim[shared]
+
+        # Bước 2: v → product b
+        coefficient = neighbour_sim * self.confidence[neighbours]
+        pos, lengths = self._gather(g.up_indptr, neighbours)
+        candidates = g.up_indices[pos]
+        contribution = np.repeat(coefficient, lengths) * g.up_data[pos]
+
+        scores = np.bincount(candidates, weights=contribution, minlength=g.n_products)
+        reached = np.bincount(candidates, minlength=g.n_products) > 0
+        return scores, reached, len(neighbours)
+
+    def _rank(self, scores: np.ndarray, reached: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """
+        Top-k product được chạm tới, giảm dần theo điểm.
+
+        Bằng điểm → product id nhỏ trước (thứ tự product xuất hiện lần đầu khi dựng
+        SparseGraph). Bản Python thuần (_collaborative_filtering_optimized) giữ thứ tự
+        chèn của dict điểm nên 2 cách có thể xếp khác nhau giữa các product bằng điểm.
+        """
+        candidates = np.flatnonzero(reached)
+        if len(candidates) > k:
+            # argpartition chọn tuỳ ý giữa các điểm bằng nhau ở biên → giữ mọi product
+            # bằng điểm thứ k rồi mới cắt, để thứ tự theo id được tôn trọng
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth]
+
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        names = self.graph.product_names
+        return [(names[i], float(scores[i])) for i in candidates[order]]
+
+    def _excluded_ids(self, exclude: Optional[Set[str]]) -> List[int]:
+        if not exclude:
+            return []
+        return [self.graph.product_ids[p] for p in exclude if p in self.graph.product_ids]
+
+    def top_k(
+        self,
+        username: str,
+        exclude: Optional[Set[str]] = None,
+        k: int = 5,
+        neighbours: Optional[Iterable[str]] = None
+    ) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        neighbours: tên users ứng viên (vd. UserLSH.query); None → mọi user chung sản phẩm
+
+        Returns:
+            ([(product_name, score)] top-k giảm dần, số users tương tự)
+        """
+        uid = self.graph.user_id(username)
+        if uid is None or k <= 0:
+            return [], 0
+
+        neighbour_ids = None
+        if neighbours is not None:
+            ids = [self.graph.user_ids[v] for v in neighbours if v in self.graph.user_ids]
+            neighbour_ids = np.array(ids, dtype=np.int64)
+        scores, reached, n_similar = self.score_vector(uid, neighbour_ids)
+        reached[self._excluded_ids(exclude)] = False
+        return self._rank(scores, reached, k), n_similar
+
+    def top_k_per_user(
+        self,
+        usernames: Iterable[str],
+        exclude: Optional[Dict[str, Set[str]]] = None,
+        k: int = 5
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Gọi top_k lần lượt cho từng user (confidence và cấu trúc CSR dùng chung).
+
+        Không gộp cả khối users thành 1 phép nhân ma trận thưa: mỗi user vẫn phải
+        duyệt đúng chừng ấy cạnh, và khoá (user, cột) gộp làm mảng trung gian lớn
+        hơn nên bản theo khối đo được còn chậm hơn vòng lặp này.
+        """
+        exclude = exclude or {}
+        return {
+            username: self.top_k(username, exclude.get(username), k)[0]
+            for username in usernames
+        }
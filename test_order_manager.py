@@ -0,0 +1,43 @@
+from CartManager import CartManager
+from OrderManager import OrderManager
+from Product import Product
+from ProductManager import ProductManager
+from ProductTable import ProductTable
+
+
+def _catalog():
+    table = ProductTable()
+    return ProductManager([
+        Product("P1", "Áo thun", "Áo", 100000, 50, "S,M", "Đỏ", sold_count=30, table=table),
+        Product("P2", "Áo sơ mi", "Áo", 200000, 50, "M,L", "Trắng", sold_count=20, table=table),
+        Product("P3", "Quần jean", "Quần", 300000, 50, "L", "Xanh", sold_count=10, table=table),
+    ])
+
+
+def _checkout(product_manager, pid, quantity):
+    cart_manager = CartManager()
+    # OrderManager không được truyền product_manager
+    order_manager = OrderManager(cart_manager)
+    product = product_manager.get_product_by_id(pid)
+    ok, _ = cart_manager.add_to_cart(
+        "u1", {"id": pid, "name": product.name, "price": product.price, "stock": product.stock}, quantity
+    )
+    assert ok
+    ok, message = order_manager.checkout("u1", product_manager.products_by_id)
+    assert ok, message
+
+
+def test_checkout_updates_top_selling_without_product_manager():
+    product_manager = _catalog()
+    _checkout(product_manager, "P3", 25)
+
+    assert [p.id for p in product_manager.get_top_selling(3)] == ["P3", "P1", "P2"]
+    assert [p.id for p in product_manager.get_top_selling_by_category("Quần")] == ["P3"]
+    assert [p.id for p in product_manager.get_top_selling_by_category("Áo")] == ["P1", "P2"]
+
+
+def test_checkout_updates_typeahead_order():
+    product_manager = _catalog()
+    _checkout(product_manager, "P2", 15)
+
+    assert product_manager.suggest("áo", 2) == ["Áo sơ mi", "Áo thun"]